@@ -0,0 +1,145 @@
+import argparse
+import asyncio
+import json
+import logging
+import time
+from datetime import datetime
+from pathlib import Path
+
+import main as debate
+from config_utils import get_settings
+from utilities.client_pool import set_provider_limits
+from utilities.log_setup import log_context
+from utilities.stage_timer import StageTimings
+from utilities.text_generator import token_usage
+
+"""
+This file runs many AI-vs-AI debates overnight on one event loop.
+
+Motions come from a text file (one motion per line, # for comments) or a JSONL file
+(one {"motion": "..."} object or JSON string per line). Debates run headless with a cap on
+how many are in flight and optional per-provider request limits. Motions that already have
+a file in debate_history are skipped, so an interrupted batch can simply be started again.
+
+    python batch.py motions.txt --concurrency 4 --provider-limit openrouter=8
+"""
+
+logger = logging.getLogger(__name__)
+
+
+def load_motions(path: Path) -> list[str]:
+    """Read motions from a text or JSONL file, dropping blanks and duplicates."""
+    motions = []
+    with path.open("r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            if path.suffix == ".jsonl":
+                entry = json.loads(line)
+                line = entry["motion"] if isinstance(entry, dict) else str(entry)
+            motions.append(line.strip())
+    return list(dict.fromkeys(motions))
+
+
+def completed_motions(history_dir: Path) -> set[str]:
+    """Motions that already have a saved debate."""
+    done = set()
+    for history_file in history_dir.glob("*.json"):
+        try:
+            with history_file.open("r", encoding="utf-8") as f:
+                done.add(json.load(f)["motion"])
+        except (OSError, ValueError, KeyError, TypeError):
+            logger.warning(f"Skipping unreadable history file {history_file}")
+    return done
+
+
+def parse_provider_limits(values: list[str]) -> dict:
+    limits = {}
+    for value in values or []:
+        provider, _, limit = value.partition("=")
+        if not limit.isdigit():
+            raise argparse.ArgumentTypeError(f"Invalid provider limit '{value}', expected provider=N")
+        limits[provider.strip().lower()] = int(limit)
+    return limits
+
+
+async def run_batch(motions: list[str], concurrency: int = 4) -> dict:
+    """
+    Run headless debates for all motions with at most `concurrency` in flight.
+
+    Returns:
+        dict: Aggregate summary with throughput and per-stage latency
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    timings = StageTimings()
+    failures = []
+    completed = 0
+
+    async def run_one(index, motion):
+        nonlocal completed
+        async with semaphore:
+            logger.info(f"[{index + 1}/{len(motions)}] Starting: {motion}")
+            debate_timings = StageTimings()
+            try:
+                # every log line of this debate is tagged with it, debates run interleaved
+                with log_context(debate=motion):
+                    history_path = await debate.main(motion, mode="headless", timings=debate_timings)
+            except Exception as e:
+                logger.error(f"Debate failed for '{motion}': {e}", exc_info=True)
+                failures.append({"motion": motion, "error": str(e)})
+                return
+            timings.merge(debate_timings)
+            completed += 1
+            logger.info(f"[{index + 1}/{len(motions)}] Finished: {motion} -> {history_path}")
+
+    started = time.perf_counter()
+    await asyncio.gather(*(run_one(index, motion) for index, motion in enumerate(motions)))
+    elapsed = time.perf_counter() - started
+
+    return {
+        "motions": len(motions),
+        "completed": completed,
+        "failed": failures,
+        "concurrency": concurrency,
+        "elapsed_seconds": round(elapsed, 1),
+        "debates_per_hour": round(completed / elapsed * 3600, 2) if elapsed > 0 else 0.0,
+        "stages": timings.summary(),
+        "tokens": token_usage.summary(),
+    }
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Run headless AI-vs-AI debates for a file of motions.")
+    parser.add_argument("motions", type=Path, help="text file with one motion per line, or a .jsonl file")
+    parser.add_argument("--concurrency", type=int, default=4, help="debates in flight at once")
+    parser.add_argument("--provider-limit", action="append", metavar="PROVIDER=N",
+                        help="max concurrent requests to a provider, may be repeated")
+    parser.add_argument("--no-resume", action="store_true", help="also rerun motions already in debate_history")
+    parser.add_argument("--set", action="append", metavar="KEY=VALUE",
+                        help="override a config.json value, e.g. --set TEAM_AI_MODEL=openai/gpt-4o, may be repeated")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    get_settings().set_overrides(args.set)
+    debate.setup_logging("batch")
+    set_provider_limits(parse_provider_limits(args.provider_limit))
+
+    motions = load_motions(args.motions)
+    if not args.no_resume:
+        history_dir = Path(debate.__file__).resolve().parent / "debate_history"
+        done = completed_motions(history_dir)
+        skipped = [motion for motion in motions if motion in done]
+        motions = [motion for motion in motions if motion not in done]
+        logger.info(f"Skipping {len(skipped)} motions already in debate_history")
+
+    summary = asyncio.run(run_batch(motions, concurrency=args.concurrency))
+    # kept in a subdirectory so summaries are never mistaken for debates
+    summary_path = Path(debate.__file__).resolve().parent / "debate_history" / "batches" / f"{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    summary_path.parent.mkdir(parents=True, exist_ok=True)
+    with summary_path.open("w", encoding="utf-8") as f:
+        json.dump(summary, f, indent=4)
+    print(json.dumps(summary, indent=4))
+    logger.info(f"Batch summary saved to {summary_path}")
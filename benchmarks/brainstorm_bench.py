@@ -0,0 +1,64 @@
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from debater.team_brainstorm import BrainStormer
+from utilities import client_pool
+
+"""
+Latency of one team brainstorm in "single" mode (one long prompt) against "parallel" mode
+(independent sub-prompts run concurrently and merged), using the TEAM_AI_PROVIDER and
+TEAM_AI_MODEL from config.json. The response cache and the prep library are bypassed so every
+run hits the provider.
+
+    python benchmarks/brainstorm_bench.py --motion "THW legalize marijuana" --runs 3
+"""
+
+
+async def run(brainstormer: BrainStormer, mode: str, motion: str, team: str) -> tuple[float, int]:
+    brainstormer.mode = mode
+    start = time.perf_counter()
+    # straight to the provider, the prep library would answer every run after the first
+    clue = await brainstormer.abrain_storm_now(motion, team)
+    return time.perf_counter() - start, len(clue)
+
+
+def report(name: str, samples: list[tuple[float, int]]) -> None:
+    seconds = [elapsed for elapsed, _ in samples]
+    chars = [length for _, length in samples]
+    print(f"{name:>8}: mean {statistics.mean(seconds):6.1f} s, "
+          f"median {statistics.median(seconds):6.1f} s, "
+          f"max {max(seconds):6.1f} s, clue {statistics.mean(chars):7.0f} chars")
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark single vs parallel team brainstorming")
+    parser.add_argument("--motion", default="This house would legalize marijuana.")
+    parser.add_argument("--team", default="Opening Government")
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    os.environ["RESPONSE_CACHE_MODE"] = "bypass"
+    brainstormer = BrainStormer()
+    results = {"single": [], "parallel": []}
+    # alternate the modes so provider load changes affect both equally
+    for _ in range(args.runs):
+        for mode in results:
+            results[mode].append(await run(brainstormer, mode, args.motion, args.team))
+
+    print(f"{args.runs} runs for {args.team} on '{args.motion}'")
+    for mode, samples in results.items():
+        report(mode, samples)
+    saved = statistics.median(t for t, _ in results["single"]) - statistics.median(t for t, _ in results["parallel"])
+    print(f"saved per brainstorm (median): {saved:.1f} s")
+    client_pool.close_all()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
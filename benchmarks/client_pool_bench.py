@@ -0,0 +1,65 @@
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from openai import OpenAI
+from utilities import client_pool
+
+"""
+Per-call latency of a fresh OpenAI client (what every Responder / BrainStormer / Interaction
+call used to do) against the pooled keep-alive client from utilities/client_pool.py.
+
+The request is a cheap authenticated GET /models so the numbers are dominated by connection
+setup rather than generation time. Needs network access and the provider's API key.
+
+    python benchmarks/client_pool_bench.py --provider openrouter --calls 10
+"""
+
+
+def fresh_call(provider: str, api_key_env: str | None) -> float:
+    kwargs = client_pool._client_kwargs(provider, api_key_env)
+    start = time.perf_counter()
+    with OpenAI(**kwargs) as client:
+        client.models.list()
+    return time.perf_counter() - start
+
+
+def pooled_call(provider: str, api_key_env: str | None) -> float:
+    start = time.perf_counter()
+    client_pool.get_client(provider, api_key_env).models.list()
+    return time.perf_counter() - start
+
+
+def report(name: str, samples: list[float]) -> None:
+    print(f"{name:>8}: mean {statistics.mean(samples) * 1000:7.1f} ms, "
+          f"median {statistics.median(samples) * 1000:7.1f} ms, "
+          f"min {min(samples) * 1000:7.1f} ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark pooled vs fresh provider clients")
+    parser.add_argument("--provider", default="openai", choices=sorted(client_pool.PROVIDERS))
+    parser.add_argument("--api-key-env", default=None, help="environment variable holding the API key")
+    parser.add_argument("--calls", type=int, default=10)
+    args = parser.parse_args()
+
+    # the first pooled call pays for the handshake, exactly like a warm-up would
+    pooled_call(args.provider, args.api_key_env)
+
+    fresh = [fresh_call(args.provider, args.api_key_env) for _ in range(args.calls)]
+    pooled = [pooled_call(args.provider, args.api_key_env) for _ in range(args.calls)]
+
+    print(f"{args.calls} calls to {args.provider}")
+    report("fresh", fresh)
+    report("pooled", pooled)
+    saved = statistics.median(fresh) - statistics.median(pooled)
+    print(f"saved per call (median): {saved * 1000:.1f} ms")
+    client_pool.close_all()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+"""
+Startup time of main.py: `python main.py --help` and a bare `import main` (what batch.py,
+headless runs and every test pay before any work starts), each run in a fresh interpreter.
+
+Each is timed over several runs against a target. One extra run with `python -X importtime`
+lists the slowest imports, and the modules that must stay off the startup path (the audio
+stack, numpy and the openai client) are checked. Exits with 1 if a target is missed or one
+of them was imported. Needs no network, API key or audio device.
+
+    python benchmarks/startup_bench.py --runs 10 --target 0.3
+"""
+
+SCENARIOS = {
+    "--help": [str(ROOT / "main.py"), "--help"],
+    "import main": ["-c", "import main"],
+}
+# imported on the code path that needs them, never by importing main
+HEAVY_MODULES = ("numpy", "soundfile", "sounddevice", "openai", "httpx")
+
+
+def run_once(args: list[str]) -> float:
+    start = time.perf_counter()
+    subprocess.run([sys.executable, *args], cwd=ROOT, check=True, stdout=subprocess.DEVNULL)
+    return time.perf_counter() - start
+
+
+def import_times(args: list[str]) -> list[tuple[int, int, str]]:
+    """
+    Returns:
+        list[tuple[int, int, str]]: (self µs, cumulative µs, module) for every import, as -X importtime reports them
+    """
+    result = subprocess.run([sys.executable, "-X", "importtime", *args], cwd=ROOT, check=True,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    times = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        own, cumulative, module = line[len("import time:"):].split("|")
+        times.append((int(own), int(cumulative), module.strip()))
+    return times
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the startup time of main.py")
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--target", type=float, default=0.3, help="median seconds each scenario has to stay under")
+    parser.add_argument("--top", type=int, default=10, help="slowest imports to list")
+    args = parser.parse_args()
+
+    failed = False
+    print(f"{'scenario':<12} {'median':>8} {'min':>8} {'max':>8} {'target':>8}")
+    for name, command in SCENARIOS.items():
+        # the first run also compiles the bytecode
+        run_once(command)
+        samples = [run_once(command) for _ in range(args.runs)]
+        median = statistics.median(samples)
+        status = "ok" if median <= args.target else "SLOW"
+        failed |= median > args.target
+        print(f"{name:<12} {median:>7.3f}s {min(samples):>7.3f}s {max(samples):>7.3f}s {args.target:>7.3f}s  {status}")
+
+    times = import_times(SCENARIOS["import main"])
+    print(f"\nSlowest imports of `import main` (cumulative, {sum(own for own, _, _ in times) / 1e6:.3f}s in total):")
+    for _, cumulative, module in sorted(times, key=lambda entry: entry[1], reverse=True)[:args.top]:
+        print(f"  {cumulative / 1000:>8.1f} ms  {module}")
+
+    loaded = {module.split(".")[0] for _, _, module in times}
+    heavy = [module for module in HEAVY_MODULES if module in loaded]
+    if heavy:
+        failed = True
+        print(f"\nImported on startup but should be lazy: {', '.join(heavy)}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import soundfile as sf
+from utilities import client_pool
+from utilities.interaction import Interaction
+
+"""
+Transcription latency of one upload (Interaction.stt_samples) against chunks cut at silences
+and sent concurrently (Interaction.stt_parallel), for the first 1, 4 and 7 minutes of a
+recording. Both upload 16 kHz FLAC from memory. Needs a recording of at least the longest length (a real speech works best)
+and the INTERACTION_KEY API key.
+
+    python benchmarks/stt_bench.py speech.wav --minutes 1 4 7 --concurrency 4
+"""
+
+
+def timed(function, *args, **kwargs) -> tuple[float, str]:
+    start = time.perf_counter()
+    text = function(*args, **kwargs)
+    return time.perf_counter() - start, text
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark single-request vs parallel chunked STT")
+    parser.add_argument("audio", type=Path, help="a long recording, e.g. a full speech")
+    parser.add_argument("--minutes", type=float, nargs="+", default=[1, 4, 7])
+    parser.add_argument("--concurrency", type=int, default=4)
+    args = parser.parse_args()
+
+    samples, samplerate = sf.read(args.audio, dtype="float32", always_2d=True)
+    interaction = Interaction()
+    print(f"{'length':>8} {'single':>9} {'parallel':>9} {'speed-up':>9} {'words':>13}")
+    for minutes in args.minutes:
+        length = int(minutes * 60 * samplerate)
+        if length > len(samples):
+            print(f"{minutes:>6.0f} m  skipped, the recording is only {len(samples) / samplerate / 60:.1f} minutes")
+            continue
+        single, single_text = timed(interaction.stt_samples, samples[:length], samplerate)
+        parallel, parallel_text = timed(interaction.stt_parallel, samples[:length], samplerate, concurrency=args.concurrency)
+        print(f"{minutes:>6.0f} m {single:>8.1f}s {parallel:>8.1f}s {single / parallel:>8.1f}x "
+              f"{len(single_text.split()):>6}/{len(parallel_text.split()):<6}")
+    client_pool.close_all()
+
+
+if __name__ == "__main__":
+    main()
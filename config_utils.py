@@ -1,28 +1,309 @@
+import copy
 import json
+import logging
 import os
+import threading
+from collections.abc import Mapping
 from pathlib import Path
+from types import MappingProxyType
+
+"""
+This file loads config.json once per process and hands out its values.
+
+The file is parsed and validated on first use and parsed again only when its modification
+time changes, so editing it mid-run takes effect on the next lookup while every other
+lookup is a dict access. An edit that fails validation is logged and the previous version
+stays in use.
+
+Values can be overridden without editing the file, later sources winning:
+    config.json < environment variables < command line (--set)
+An environment variable DEBATE__KEY__SUBKEY=value sets config["KEY"]["SUBKEY"], and
+`--set KEY.SUBKEY=value` does the same from the command line. Values are read as JSON where
+possible (1.5, true, null, {...}) and as plain strings otherwise.
+
+get_settings() returns the process-wide Config, whose typed properties (team_model,
+party, stt, playback, ...) are meant for code that reads settings often; get_config(key)
+remains for everything else. Sections are handed out as read-only views of the cached
+configuration, so reading one copies nothing and no caller can change it for the others.
+"""
+
+logger = logging.getLogger(__name__)
+
+CONFIG_PATH = Path(__file__).resolve().parent / "config.json"
+ENV_PREFIX = "DEBATE__"
+
+# must match utilities.client_pool.PROVIDERS
+PROVIDERS = ("openai", "openrouter")
+ROLES = ("Prime Minister", "Leader of Opposition", "Deputy Prime Minister", "Deputy Leader of Opposition",
+         "Member of Government", "Member of Opposition", "Government Whip", "Opposition Whip")
+PARTIES = ("AI", "Human")
+# settings every run needs
+REQUIRED_STRINGS = ("speaker_tone", "debater_tone", "TEAM_AI_PROVIDER", "TEAM_AI_MODEL",
+                    "INDIVIDUAL_AI_PROVIDER", "INDIVIDUAL_AI_MODEL", "INTERACTION_PROVIDER")
+# optional sections, each an object when present
+SECTIONS = ("STT", "VAD", "RECORDING", "PLAYBACK", "RESPONSE_CACHE", "AUDIO_CACHE", "CONTEXT", "BRAINSTORM",
+            "PREP_LIBRARY", "PROVIDER_PROXIES", "PROVIDER_LIMITS", "LOGGING")
+
+
+class ConfigError(ValueError):
+    pass
+
 
 def load_config():
     """
     Load configuration from config.json file
-    
+
     Returns:
         dict: Configuration dictionary
     """
-    config_path = Path(__file__).resolve().parent / "config.json"
-    with open(config_path, "r") as f:
+    with open(CONFIG_PATH, "r") as f:
         return json.load(f)
 
+
+def validate_config(config: dict) -> list[str]:
+    """
+    Returns:
+        list[str]: Every problem found, empty when the configuration is usable
+    """
+    if not isinstance(config, dict):
+        return ["the configuration has to be a JSON object"]
+    problems = []
+    for key in REQUIRED_STRINGS:
+        if not isinstance(config.get(key), str) or not config[key].strip():
+            problems.append(f"{key} has to be a non-empty string")
+    for key in ("TEAM_AI_PROVIDER", "INDIVIDUAL_AI_PROVIDER", "INTERACTION_PROVIDER"):
+        value = config.get(key)
+        if isinstance(value, str) and value.strip().lower() not in PROVIDERS:
+            problems.append(f"{key} is '{value}', valid providers are {', '.join(PROVIDERS)}")
+    party = config.get("PARTY")
+    if not isinstance(party, dict):
+        problems.append("PARTY has to map every role to \"AI\" or \"Human\"")
+    else:
+        missing = [role for role in ROLES if role not in party]
+        unknown = [role for role in party if role not in ROLES]
+        if missing:
+            problems.append(f"PARTY is missing {', '.join(missing)}")
+        if unknown:
+            problems.append(f"PARTY has unknown roles: {', '.join(unknown)}")
+        problems.extend(f"PARTY[{role}] is '{value}', expected \"AI\" or \"Human\"" for role, value in party.items() if value not in PARTIES)
+    for key in SECTIONS:
+        if config.get(key) is not None and not isinstance(config[key], dict):
+            problems.append(f"{key} has to be an object")
+    return problems
+
+
+def parse_value(text: str):
+    """Read an override value as JSON, falling back to the plain string."""
+    try:
+        return json.loads(text)
+    except ValueError:
+        return text
+
+
+def parse_assignment(assignment: str) -> tuple[list[str], object]:
+    """
+    Args:
+        assignment (str): "KEY.SUBKEY=value" as given to --set
+
+    Returns:
+        tuple[list[str], object]: The key path and the parsed value
+    """
+    path, separator, value = assignment.partition("=")
+    if not separator or not path.strip():
+        raise ConfigError(f"Invalid override '{assignment}', expected KEY=VALUE or KEY.SUBKEY=VALUE")
+    return [part.strip() for part in path.split(".")], parse_value(value)
+
+
+def _apply(config: dict, path: list[str], value) -> None:
+    target = config
+    for key in path[:-1]:
+        if not isinstance(target.get(key), dict):
+            target[key] = {}
+        target = target[key]
+    target[path[-1]] = value
+
+
+class Config:
+    def __init__(self, path=CONFIG_PATH, environ=None):
+        """
+        Args:
+            path: The JSON file to read
+            environ (Mapping): Where DEBATE__ overrides are read from, os.environ by default
+        """
+        self.path = Path(path)
+        self.environ = os.environ if environ is None else environ
+        self._cli_overrides = []
+        self._lock = threading.Lock()
+        self._mtime = None
+        self._data = None
+
+    def set_overrides(self, assignments) -> None:
+        """Apply command line overrides ("KEY.SUBKEY=value") on top of the file and environment."""
+        overrides = [parse_assignment(assignment) for assignment in assignments or ()]
+        with self._lock:
+            self._cli_overrides = overrides
+            # rebuilt on the next lookup
+            self._mtime = None
+
+    @property
+    def data(self) -> dict:
+        """The merged configuration, reloaded first if the file changed."""
+        try:
+            mtime = self.path.stat().st_mtime_ns
+        except OSError:
+            mtime = None
+        if self._data is not None and mtime == self._mtime:
+            return self._data
+        with self._lock:
+            if self._data is None or mtime != self._mtime:
+                self._reload(mtime)
+            return self._data
+
+    def _reload(self, mtime) -> None:
+        try:
+            with self.path.open("r", encoding="utf-8") as f:
+                config = json.load(f)
+        except (OSError, ValueError) as e:
+            if self._data is None:
+                raise ConfigError(f"Cannot read {self.path}: {e}") from e
+            logger.error(f"Cannot read {self.path}, keeping the previous configuration: {e}")
+            self._mtime = mtime
+            return
+        config = copy.deepcopy(config)
+        for name, value in sorted(self.environ.items()):
+            if name.startswith(ENV_PREFIX) and len(name) > len(ENV_PREFIX):
+                _apply(config, name[len(ENV_PREFIX):].split("__"), parse_value(value))
+        for path, value in self._cli_overrides:
+            _apply(config, path, value)
+        problems = validate_config(config)
+        if problems:
+            message = f"Invalid configuration in {self.path}: " + "; ".join(problems)
+            if self._data is None:
+                raise ConfigError(message)
+            logger.error(f"{message}. Keeping the previous configuration.")
+        else:
+            if self._data is not None:
+                logger.info(f"Reloaded configuration from {self.path}")
+            self._data = config
+        self._mtime = mtime
+
+    def get(self, key, default=None):
+        """A copy of the value, changing it does not change the configuration every other caller sees."""
+        return copy.deepcopy(self.data.get(key, default))
+
+    def section(self, name: str) -> Mapping:
+        """A read-only view of an optional section, empty when it is missing or null."""
+        return MappingProxyType(self.data.get(name) or {})
+
+    @property
+    def speaker_tone(self) -> str:
+        return self.data["speaker_tone"]
+
+    @property
+    def debater_tone(self) -> str:
+        return self.data["debater_tone"]
+
+    @property
+    def team_provider(self) -> str:
+        return self.data["TEAM_AI_PROVIDER"].strip().lower()
+
+    @property
+    def team_model(self) -> str:
+        return self.data["TEAM_AI_MODEL"]
+
+    @property
+    def individual_provider(self) -> str:
+        return self.data["INDIVIDUAL_AI_PROVIDER"].strip().lower()
+
+    @property
+    def individual_model(self) -> str:
+        return self.data["INDIVIDUAL_AI_MODEL"]
+
+    @property
+    def interaction_provider(self) -> str:
+        return self.data["INTERACTION_PROVIDER"].strip().lower()
+
+    @property
+    def party(self) -> dict[str, str]:
+        """Role -> "AI" or "Human", in speaking order."""
+        party = self.data["PARTY"]
+        return {role: party[role] for role in ROLES}
+
+    @property
+    def human_roles(self) -> list[str]:
+        return [role for role, side in self.party.items() if side == "Human"]
+
+    @property
+    def stt(self) -> Mapping:
+        return self.section("STT")
+
+    @property
+    def vad(self) -> Mapping:
+        return self.section("VAD")
+
+    @property
+    def recording(self) -> Mapping:
+        return self.section("RECORDING")
+
+    @property
+    def playback(self) -> Mapping:
+        return self.section("PLAYBACK")
+
+    @property
+    def response_cache(self) -> Mapping:
+        return self.section("RESPONSE_CACHE")
+
+    @property
+    def audio_cache(self) -> Mapping:
+        return self.section("AUDIO_CACHE")
+
+    @property
+    def context(self) -> Mapping:
+        return self.section("CONTEXT")
+
+    @property
+    def brainstorm(self) -> Mapping:
+        return self.section("BRAINSTORM")
+
+    @property
+    def prep_library(self) -> Mapping:
+        return self.section("PREP_LIBRARY")
+
+    @property
+    def provider_proxies(self) -> Mapping:
+        return self.section("PROVIDER_PROXIES")
+
+    @property
+    def provider_limits(self) -> Mapping:
+        return self.section("PROVIDER_LIMITS")
+
+    @property
+    def logging(self) -> Mapping:
+        return self.section("LOGGING")
+
+
+_settings = None
+_settings_lock = threading.Lock()
+
+
+def get_settings() -> Config:
+    """The process-wide configuration."""
+    global _settings
+    with _settings_lock:
+        if _settings is None:
+            _settings = Config()
+        return _settings
+
+
 def get_config(key, default=None):
     """
     Get configuration value from config.json
-    
+
     Args:
         key (str): Configuration key
         default: Default value if key not found
-        
+
     Returns:
         Value from config or default if not found
     """
-    config = load_config()
-    return config.get(key, default)
+    return get_settings().get(key, default)
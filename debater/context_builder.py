@@ -0,0 +1,116 @@
+import asyncio
+import logging
+from utilities.text_generator import Responder
+from config_utils import get_settings
+
+"""
+This file builds the "previous speakers" part of a debater's prompt within a token budget.
+
+The most recent speech(es) are kept word for word; earlier ones are replaced by short
+summaries. Summaries are requested in the background as soon as a speech lands, so by the
+time a later speaker needs them they are usually ready. If one is not ready yet, the start
+of the speech is used instead rather than waiting on the critical path.
+"""
+
+logger = logging.getLogger(__name__)
+
+SPEAKING_ORDER = ["Prime Minister", "Leader of Opposition", "Deputy Prime Minister", "Deputy Leader of Opposition", "Member of Government", "Member of Opposition", "Government Whip", "Opposition Whip"]
+
+SUMMARY_PROMPT = "Summarize this British Parliamentary debate speech by the {role} in at most {words} words. Keep every argument, rebuttal and key example it makes, as terse bullet points, no introduction:\n\n{speech}"
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (about four characters per token for English)."""
+    return len(text) // 4 + 1
+
+
+def _role(index: int) -> str:
+    return SPEAKING_ORDER[index] if index < len(SPEAKING_ORDER) else f"Speaker {index + 1}"
+
+
+class ContextBuilder:
+    def __init__(self, token_budget: int = 6000, verbatim_recent: int = 1, summary_words: int = 150, responder: Responder = None):
+        """
+        Args:
+            token_budget (int): Target size of the speech log part of the prompt, 0 or None keeps everything verbatim
+            verbatim_recent (int): How many of the latest speeches are always kept word for word
+            summary_words (int): Length of each summary
+            responder (Responder): Used to write the summaries, defaults to the debaters' provider
+        """
+        self.token_budget = token_budget
+        self.verbatim_recent = verbatim_recent
+        self.summary_words = summary_words
+        self.responder = responder if responder else Responder()
+        # speech index -> summary text
+        self.summaries = {}
+        # speech index -> task writing its summary
+        self._tasks = {}
+
+    @classmethod
+    def from_config(cls) -> "ContextBuilder":
+        settings = get_settings().context
+        return cls(
+            token_budget=settings.get("token_budget", 6000),
+            verbatim_recent=settings.get("verbatim_recent", 1),
+            summary_words=settings.get("summary_words", 150),
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.token_budget)
+
+    def speech_added(self, index: int, speech: str) -> None:
+        """Start summarizing a speech in the background as soon as it is in the log."""
+        if not self.enabled or not speech or index in self._tasks:
+            return
+        if len(speech.split()) <= self.summary_words:
+            # already shorter than a summary would be
+            self.summaries[index] = speech
+            return
+        self._tasks[index] = asyncio.create_task(self._summarize(index, speech))
+
+    async def _summarize(self, index: int, speech: str) -> None:
+        prompt = SUMMARY_PROMPT.format(role=_role(index), words=self.summary_words, speech=speech)
+        try:
+            self.summaries[index] = await self.responder.arespond_to(prompt)
+            logger.debug(f"Summary of speech {index + 1} ready ({estimate_tokens(speech)} -> {estimate_tokens(self.summaries[index])} tokens)")
+        except Exception as e:
+            logger.warning(f"Summarizing speech {index + 1} failed, its opening will be used instead: {e}")
+
+    def _excerpt(self, speech: str) -> str:
+        words = speech.split()
+        if len(words) <= self.summary_words:
+            return speech
+        return " ".join(words[:self.summary_words]) + " ..."
+
+    def build(self, speech_log: list) -> str:
+        """
+        Returns:
+            str: The speech log text to put in the prompt
+        """
+        full_text = "\n".join(speech_log)
+        if not self.enabled or estimate_tokens(full_text) <= self.token_budget:
+            return full_text
+
+        first_verbatim = max(0, len(speech_log) - self.verbatim_recent)
+        parts = []
+        for index, speech in enumerate(speech_log[:first_verbatim]):
+            if not speech:
+                continue
+            if index in self.summaries:
+                parts.append(f"[Summary of the {_role(index)}'s speech]\n{self.summaries[index]}")
+            else:
+                parts.append(f"[Opening of the {_role(index)}'s speech]\n{self._excerpt(speech)}")
+        for index in range(first_verbatim, len(speech_log)):
+            parts.append(f"[The {_role(index)}'s speech]\n{speech_log[index]}")
+
+        # still too long: drop the oldest condensed speeches first
+        while len(parts) > self.verbatim_recent and estimate_tokens("\n\n".join(parts)) > self.token_budget:
+            parts.pop(0)
+        return "\n\n".join(parts)
+
+    async def aclose(self) -> None:
+        """Cancel summaries that are still running."""
+        for task in self._tasks.values():
+            task.cancel()
+        await asyncio.gather(*self._tasks.values(), return_exceptions=True)
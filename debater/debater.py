@@ -1,11 +1,11 @@
-from openai import OpenAI, AsyncOpenAI
-from openai.helpers import LocalAudioPlayer
 import os
+import logging
 from debater import debater_speech_structure
+from debater.context_builder import ContextBuilder, estimate_tokens
 import asyncio
 from utilities.text_generator import Responder
 import json
-from config_utils import get_config
+from typing import AsyncIterator
 
 
 """
@@ -15,33 +15,40 @@ There should be one def prompt_loader() that uses a general way of combining the
 
 """
 
-debater_tone = get_config("debater_tone")
+logger = logging.getLogger(__name__)
 
+# position, [speech template], team. The debater tone is applied when a speech is voiced
+# (see main.play_ai_speech), so nothing here reads config.json at import time.
 speaker_with_prompt = [
-    ["Prime Minister", [debater_speech_structure.prime_minister_speech, debater_tone], "OG"],
-    ["Leader of Opposition", [debater_speech_structure.leader_of_opposition_speech, debater_tone], "OO"],
-    ["Deputy Prime Minister", [debater_speech_structure.deputy_prime_minister_speech, debater_tone], "OG"],
-    ["Deputy Leader of Opposition", [debater_speech_structure.deputy_leader_of_opposition_speech, debater_tone], "OO"],
-    ["Member of Government", [debater_speech_structure.member_of_government_speech, debater_tone], "CG"],
-    ["Member of Opposition", [debater_speech_structure.member_of_opposition_speech, debater_tone], "CO"],
-    ["Government Whip", [debater_speech_structure.government_whip_speech, debater_tone], "CG"],
-    ["Opposition Whip", [debater_speech_structure.opposition_whip_speech, debater_tone], "CO"]
+    ["Prime Minister", [debater_speech_structure.prime_minister_speech], "OG"],
+    ["Leader of Opposition", [debater_speech_structure.leader_of_opposition_speech], "OO"],
+    ["Deputy Prime Minister", [debater_speech_structure.deputy_prime_minister_speech], "OG"],
+    ["Deputy Leader of Opposition", [debater_speech_structure.deputy_leader_of_opposition_speech], "OO"],
+    ["Member of Government", [debater_speech_structure.member_of_government_speech], "CG"],
+    ["Member of Opposition", [debater_speech_structure.member_of_opposition_speech], "CO"],
+    ["Government Whip", [debater_speech_structure.government_whip_speech], "CG"],
+    ["Opposition Whip", [debater_speech_structure.opposition_whip_speech], "CO"]
 ]
 
 
-def prompt_loader(motion: str, position: str, speech_log: list, clue: str) -> str:
+def prompt_loader(motion: str, position: str, speech_log: list, clue: str) -> list[dict]:
     """
     This function is to structure the final_prompt to be passed in the text generator.
-    
+
+    The parts that stay the same across calls come first: the motion, stated once (shared by
+    all eight speakers), the team's clue (shared by both speakers of a team) and the speech
+    template. Everything that changes from one speaker to the next, including the rolling
+    summaries of earlier speeches, is in the last message only, after that stable prefix, so
+    providers with prompt caching can reuse the prefix.
+
     Args:
         motion (str): The motion of the debate.
         position (str): The position of the speaker.
-        speech_log (list): The list of previous speakers' conversations.
-    
-    Returns:
-        str: The final_prompt to be passed in the text generator.
+        speech_log (list): The list of previous speakers' conversations, or the already built text.
+        clue (str): The clue prepared by the speaker's team.
 
-    TODO: The Prime Minister has no previous speaker, this should be optimized.
+    Returns:
+        list[dict]: The chat messages to be passed in the text generator.
     """
     # find the speech template based on position
     speech_template = None
@@ -53,23 +60,31 @@ def prompt_loader(motion: str, position: str, speech_log: list, clue: str) -> st
         raise ValueError(f"Unknown position in prompt_loader: {position}")
     # format speech_log as string
     speech_log_text = "\n".join(speech_log) if isinstance(speech_log, list) else str(speech_log)
-    final_prompt = (
-        f"{speech_template}\n\n"
-        f"The motion reads: {motion}\n\n"
-        f"The previous speakers conversation: {speech_log_text}\n\n"
-        f"Here are the clues you've prepared:\n\n{clue}"
-    )
-    return final_prompt
+    if speech_log_text.strip():
+        speech_log_prompt = f"The previous speakers conversation: {speech_log_text}"
+    else:
+        speech_log_prompt = "There are no previous speakers yet, deliver your speech now."
+    return [
+        {"role": "system", "content": f"The motion reads: {motion}\n\nHere are the clues you've prepared:\n\n{clue}"},
+        {"role": "system", "content": speech_template},
+        {"role": "user", "content": speech_log_prompt},
+    ]
+
+
+def prompt_text(messages: list[dict]) -> str:
+    return "\n\n".join(message["content"] for message in messages)
 
 class Debater:
-    def __init__(self, motion: str, position: str, speech_log: list, clue: dict[str, str]):
+    def __init__(self, motion: str, position: str, speech_log: list, clue: dict[str, str], context: ContextBuilder = None):
         self.motion = motion
         self.position = position
         self.speech_log = speech_log
         self.clue = clue
+        # condenses earlier speeches to keep the prompt within budget, None sends the full log
+        self.context = context
         self.responder = Responder()
 
-    def deliver_speech(self) -> str:
+    def _final_prompt(self) -> list[dict]:
         # Find the team for the current position
         debaterTeam = None
         for speaker in speaker_with_prompt:
@@ -81,10 +96,27 @@ class Debater:
             raise ValueError(f"Unknown position: {self.position}")
             
         clue = self.clue[debaterTeam]
-        final_prompt = prompt_loader(self.motion, self.position, self.speech_log, clue)
-        response = self.responder.respond_to(final_prompt)
+        if self.context is None:
+            return prompt_loader(self.motion, self.position, self.speech_log, clue)
+        full_prompt = prompt_loader(self.motion, self.position, self.speech_log, clue)
+        final_prompt = prompt_loader(self.motion, self.position, self.context.build(self.speech_log), clue)
+        logger.info(f"{self.position} prompt size: ~{estimate_tokens(prompt_text(full_prompt))} tokens with the full speech log, ~{estimate_tokens(prompt_text(final_prompt))} with the rolling context")
+        return final_prompt
+
+    def deliver_speech(self) -> str:
+        return self.responder.respond_to(self._final_prompt())
+
+    async def adeliver_speech(self) -> str:
+        final_prompt = self._final_prompt()
+        response = await self.responder.arespond_to(final_prompt)
         return response
 
+    async def astream_speech(self) -> AsyncIterator[str]:
+        """Yield the speech text piece by piece while it is being generated."""
+        final_prompt = self._final_prompt()
+        async for delta in self.responder.astream_respond_to(final_prompt):
+            yield delta
+
 
 if __name__ == "__main__":
     debater = Debater(motion="THBT civil rights movement should use violanve to advance its cause", position="Prime Minister", speech_log=[], clue={"OG": "", "OO": "", "CG": "", "CO": ""})
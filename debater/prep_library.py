@@ -0,0 +1,135 @@
+import hashlib
+import json
+import logging
+import os
+import re
+import tempfile
+import threading
+import time
+from pathlib import Path
+from config_utils import get_settings
+
+"""
+This file keeps every team's brainstorm (clue) on disk, indexed by the normalized motion,
+so popular motions are only prepared once.
+
+"This house would legalize marijuana.", "THW legalize marijuana" and "this House would
+legalize marijuana!" all differ, so motions are folded before lookup: lower case, the usual
+"TH..." abbreviations spelled out, punctuation and extra whitespace dropped.
+
+A stored clue is fresh when it was made by the same provider, model and brainstorm mode
+within max_age_days;
+a fresh clue replaces the brainstorm entirely. Any stored clue, fresh or not, is used as a
+fallback when the provider fails or takes longer than fallback_after seconds.
+"""
+
+logger = logging.getLogger(__name__)
+
+# abbreviation -> spelled out, longest first so "THBT" is not read as "TH" + "BT"
+ABBREVIATIONS = [
+    ("thbt", "this house believes that"),
+    ("thw", "this house would"),
+    ("ths", "this house supports"),
+    ("tho", "this house opposes"),
+    ("thr", "this house regrets"),
+    ("thp", "this house prefers"),
+    ("th", "this house"),
+]
+
+
+def normalize_motion(motion: str) -> str:
+    text = motion.lower().replace("’", "'")
+    text = re.sub(r"[^\w\s']", " ", text).replace("'", "")
+    words = text.split()
+    for abbreviation, expansion in ABBREVIATIONS:
+        if words and words[0] == abbreviation:
+            words[:1] = expansion.split()
+            break
+    return " ".join(words)
+
+
+class PrepLibrary:
+    def __init__(self, directory, max_age: float = 14 * 24 * 3600, fallback_after: float = 60, enabled: bool = True):
+        """
+        Args:
+            directory: Where the entries are stored, one file per normalized motion
+            max_age (float): Seconds after which a stored clue is no longer fresh, None for no limit
+            fallback_after (float): Seconds to wait for the provider before a stored clue is used, None to always wait
+            enabled (bool): A disabled library never finds or stores anything
+        """
+        self.directory = Path(directory)
+        self.max_age = max_age
+        self.fallback_after = fallback_after
+        self.enabled = enabled
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(motion: str) -> str:
+        return hashlib.sha256(normalize_motion(motion).encode("utf-8")).hexdigest()
+
+    def _path(self, motion: str) -> Path:
+        return self.directory / f"{self.key(motion)}.json"
+
+    def _load(self, motion: str) -> dict:
+        try:
+            with self._path(motion).open("r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {"motion": motion, "normalized": normalize_motion(motion), "teams": {}}
+
+    def lookup(self, motion: str, team: str) -> dict | None:
+        """
+        Returns:
+            dict | None: The stored entry for the team (clue, provider, model, mode, created), or None
+        """
+        if not self.enabled:
+            return None
+        return self._load(motion)["teams"].get(team)
+
+    def is_fresh(self, entry: dict, provider: str, model: str, mode: str) -> bool:
+        if entry.get("provider") != provider or entry.get("model") != model or entry.get("mode") != mode:
+            return False
+        return self.max_age is None or time.time() - entry.get("created", 0) <= self.max_age
+
+    def store(self, motion: str, team: str, clue: str, provider: str, model: str, mode: str) -> None:
+        """Store a team's clue, atomically replacing the motion's file."""
+        if not self.enabled or not clue:
+            return
+        with self._lock:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            library_entry = self._load(motion)
+            library_entry["motion"] = motion
+            library_entry["teams"][team] = {"clue": clue, "provider": provider, "model": model, "mode": mode, "created": time.time()}
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    json.dump(library_entry, f, ensure_ascii=False, indent=4)
+                os.replace(tmp_path, self._path(motion))
+            except OSError:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+        logger.debug(f"Stored {team} clue for '{normalize_motion(motion)}' in the prep library")
+
+
+_library = None
+_library_lock = threading.Lock()
+
+
+def get_prep_library() -> PrepLibrary:
+    """The process-wide library configured by PREP_LIBRARY in config.json."""
+    global _library
+    with _library_lock:
+        if _library is None:
+            settings = get_settings().prep_library
+            directory = Path(settings.get("directory", "cache/prep"))
+            if not directory.is_absolute():
+                directory = Path(__file__).resolve().parent.parent / directory
+            max_age_days = settings.get("max_age_days", 14)
+            _library = PrepLibrary(
+                directory,
+                max_age=max_age_days * 24 * 3600 if max_age_days is not None else None,
+                fallback_after=settings.get("fallback_after", 60),
+                enabled=settings.get("enabled", True),
+            )
+        return _library
@@ -1,53 +1,165 @@
-from openai import OpenAI
-import os
+import asyncio
+import logging
+import time
 from utilities.text_generator import Responder
-from config_utils import get_config
+from utilities.client_pool import get_async_client, provider_slot, run_sync
+from utilities.response_cache import get_response_cache
+from debater.prep_library import get_prep_library
+from config_utils import get_settings
 
 """
 This file is for generating group discussion of each team.
 We use thinking models to stimulate the process and result of group discussion during prep time.
 TODO: Restructure and use text_generator to provide texts.
+
+abrain_storm is the native asyncio implementation; brain_storm is a blocking wrapper around it
+that closes the async clients of its short-lived event loop when it returns.
+
+In "parallel" mode (BRAINSTORM.mode in config.json) the single long prompt is split into
+independent sub-tasks that run at the same time and are merged into one clue. Each sub-task
+has its own timeout, a branch that fails or times out is left out rather than holding up the team.
+
+Finished clues go to the prep library (debater/prep_library.py): a fresh stored clue for the
+same motion skips the brainstorm, an older one stands in when the provider is slow or failing.
+A brainstorm that is outlasted by the fallback keeps running in the background and still
+refreshes the library when it finishes, so a slow model does not leave the old clue in place
+for good.
 """
 
+logger = logging.getLogger(__name__)
+
+BRAINSTORM_MODES = ("single", "parallel")
+
+# name -> (heading in the merged clue, prompt)
+SUBTASKS = {
+    "analysis": ("Motion analysis", "You are a professional debater, now you are in a debate, the motion is {motion}, and you are brainstorming for the {team} team. Provide only the motion analysis: the key terms and how to define them, the central clash, and what your team has to prove. Reason as detailly as possible."),
+    "arguments": ("Our arguments", "You are a professional debater, now you are in a debate, the motion is {motion}, and you are brainstorming for the {team} team. Provide only the possible arguments for your team, as many as possible, each with its reasoning, mechanism and examples."),
+    "opponents": ("Arguments from other teams", "You are a professional debater, now you are in a debate, the motion is {motion}, and you are brainstorming for the {team} team. Provide only the arguments the other teams are likely to make, including the other team on your own side of the house, each with its reasoning."),
+    "rebuttals": ("Counter arguments", "You are a professional debater, now you are in a debate, the motion is {motion}, and you are brainstorming for the {team} team. Provide only counter arguments: the strongest attacks other teams could make against your side and how to respond to each, and how to rebut the other side's most likely arguments."),
+}
+
 class BrainStormer:
     def __init__(self, service: str = None):
+        config = get_settings()
         # Get the service from config or use the provided one
-        self.service = service if service else get_config("TEAM_AI_PROVIDER")
-        # Strip any whitespace that might be in the environment variable
-        if self.service:
-            self.service = self.service.strip().lower()
+        self.service = service.strip().lower() if service else config.team_provider
         print(f"Using AI service: {self.service}")
+        settings = config.brainstorm
+        self.mode = settings.get("mode", "single")
+        if self.mode not in BRAINSTORM_MODES:
+            raise ValueError(f"Invalid brainstorm mode: '{self.mode}'. Valid options are {', '.join(repr(m) for m in BRAINSTORM_MODES)}")
+        self.subtask_timeout = settings.get("subtask_timeout", 120)
+        self.model = config.team_model
+        # brainstorms still refreshing the prep library after their fallback was used
+        self._refreshing = set()
         self.text = "You are a professional debater, now you are in a debate, the motion is {}, and you are now going to brainstorm for the {} team, you should provide motion analysis, possible arguments, and possible arguments from other teams and counter arguments. Think as many arguments as possible for your team, always reason as detailly as possible."
 
     def brain_storm(self, motion, team) -> str:
+        return run_sync(self.abrain_storm(motion, team))
+
+    async def abrain_storm(self, motion, team) -> str:
+        library = get_prep_library()
+        entry = library.lookup(motion, team)
+        if entry is not None and library.is_fresh(entry, self.service, self.model, self.mode):
+            logger.info(f"{team} clue for this motion found in the prep library, skipping the brainstorm")
+            return entry["clue"]
+
+        brainstorm = asyncio.create_task(self._brainstorm_and_store(library, motion, team))
+        if entry is None or library.fallback_after is None:
+            return await brainstorm
+        done, _ = await asyncio.wait({brainstorm}, timeout=library.fallback_after)
+        # a provider call can also end in a CancelledError, which exception() would raise
+        if done and not brainstorm.cancelled() and brainstorm.exception() is None:
+            return brainstorm.result()
+        age_days = (time.time() - entry.get("created", 0)) / 86400
+        if done:
+            reason = "was cancelled" if brainstorm.cancelled() else f"failed ({brainstorm.exception()!r})"
+            logger.warning(f"{team} brainstorm {reason}, using the prep library clue from {age_days:.1f} days ago")
+        else:
+            logger.warning(f"{team} brainstorm did not finish within {library.fallback_after}s, using the prep library clue from "
+                           f"{age_days:.1f} days ago; it keeps running to refresh the library")
+            # keep a reference, the event loop only holds tasks weakly
+            self._refreshing.add(brainstorm)
+            brainstorm.add_done_callback(self._refreshed)
+        return entry["clue"]
+
+    async def _brainstorm_and_store(self, library, motion, team) -> str:
+        clue = await self.abrain_storm_now(motion, team)
+        await asyncio.to_thread(library.store, motion, team, clue, self.service, self.model, self.mode)
+        return clue
+
+    def _refreshed(self, task: asyncio.Task) -> None:
+        self._refreshing.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning(f"Background brainstorm for the prep library failed: {task.exception()!r}")
+
+    async def abrain_storm_now(self, motion, team) -> str:
+        """Brainstorm with the provider, without looking at the prep library."""
+        if self.mode == "parallel":
+            return await self.aparallel_brain_storm(motion, team)
+        return await self.ask(self.text.format(motion, team))
+
+    async def aparallel_brain_storm(self, motion, team) -> str:
+        """
+        Run the brainstorm sub-tasks concurrently and merge them into one clue.
+
+        Returns:
+            str: One section per sub-task that finished in time, in the order of SUBTASKS
+        """
+        started = time.perf_counter()
+
+        async def run_subtask(name, prompt):
+            subtask_started = time.perf_counter()
+            try:
+                result = await asyncio.wait_for(self.ask(prompt.format(motion=motion, team=team)), self.subtask_timeout)
+            except asyncio.TimeoutError:
+                logger.warning(f"{team} brainstorm '{name}' timed out after {self.subtask_timeout}s, leaving it out")
+                return None
+            except Exception as e:
+                logger.warning(f"{team} brainstorm '{name}' failed, leaving it out: {e}")
+                return None
+            logger.debug(f"{team} brainstorm '{name}' took {time.perf_counter() - subtask_started:.2f}s")
+            return result
+
+        results = await asyncio.gather(*(run_subtask(name, prompt) for name, (_, prompt) in SUBTASKS.items()))
+        sections = [f"## {heading}\n\n{result}" for (heading, _), result in zip(SUBTASKS.values(), results) if result]
+        if not sections:
+            raise RuntimeError(f"Every brainstorm sub-task failed for {team}")
+        logger.info(f"{team} parallel brainstorm took {time.perf_counter() - started:.2f}s ({len(sections)}/{len(SUBTASKS)} sub-tasks)")
+        return "\n\n".join(sections)
+
+    async def ask(self, prompt: str) -> str:
+        """Send one prompt to the team model, going through the response cache."""
         if not self.service:
             raise ValueError(f"No AI service specified. Please set TEAM_AI_PROVIDER in your config.json file.")
-        
-        if self.service == "openrouter":
-            return self.openrouter_brainstormer(motion, team)
-        elif self.service == "openai":
-            return self.openai_brainstormer(motion, team)
-        else:
-            raise ValueError(f"Invalid service: '{self.service}'. Valid options are 'openrouter' or 'openai'")
 
-    def openrouter_brainstormer(self, motion, team) -> str:
-        # Temporarily unset proxy environment variables
-        original_http_proxy = os.environ.pop('http_proxy', None)
-        original_https_proxy = os.environ.pop('https_proxy', None)
-        
+        cache = get_response_cache()
+        cached = await cache.aget(self.service, self.model, prompt)
+        if cached is not None:
+            return cached
+
+        async with provider_slot(self.service):
+            if self.service == "openrouter":
+                response = await self.aopenrouter_brainstormer(prompt)
+            elif self.service == "openai":
+                response = await self.aopenai_brainstormer(prompt)
+            else:
+                raise ValueError(f"Invalid service: '{self.service}'. Valid options are 'openrouter' or 'openai'")
+        await cache.aput(self.service, self.model, prompt, response)
+        return response
+
+    async def aopenrouter_brainstormer(self, prompt: str) -> str:
+        # the pooled OpenRouter client bypasses http_proxy/https_proxy on its own
         try:
-            client = OpenAI(
-                base_url="https://openrouter.ai/api/v1",
-                api_key=os.environ.get("OPENROUTER_API_KEY"),
-            )
+            client = get_async_client("openrouter")
 
             print("Making API call to OpenRouter...")
-            completion = client.chat.completions.create(
-                model=get_config("TEAM_AI_MODEL"),   
+            completion = await client.chat.completions.create(
+                model=self.model,   
                 messages=[
                     {
                         "role": "user",
-                        "content": self.text.format(motion, team)
+                        "content": prompt
                     }
                 ]
             )
@@ -56,19 +168,13 @@ class BrainStormer:
         except Exception as e:
             print(f"Error calling OpenRouter API: {e}")
             raise
-        finally:
-            # Restore proxy settings
-            if original_http_proxy:
-                os.environ['http_proxy'] = original_http_proxy
-            if original_https_proxy:
-                os.environ['https_proxy'] = original_https_proxy
-
-    def openai_brainstormer(self, motion, team) -> str:
-        client = OpenAI(api_key=os.environ.get("OPENAI_API_KEY"))
-        response = client.chat.completions.create(
-            model=get_config("TEAM_AI_MODEL"),
+
+    async def aopenai_brainstormer(self, prompt: str) -> str:
+        client = get_async_client("openai")
+        response = await client.chat.completions.create(
+            model=self.model,
             messages=[
-                {"role": "user", "content": self.text.format(motion, team)}
+                {"role": "user", "content": prompt}
             ]
         )
         return response.choices[0].message.content
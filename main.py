@@ -1,113 +1,87 @@
 import asyncio
 import logging
-import os
 from pathlib import Path
 from datetime import datetime
 import json
-import sounddevice as sd
-import soundfile as sf
-import tempfile
-import numpy as np
-import queue
-import threading
+import argparse
+import time
+from functools import partial
 from utilities.interaction import Interaction
-from config_utils import get_config
+from utilities.sentence_stream import SpeechChunker
+from config_utils import get_settings
 from debater.team_brainstorm import BrainStormer
 from speaker.speaker import Speaker
-from debater.debater import Debater
-from speaker.progress_tracker import get_tracker_instance
-
-# ensure logs directory exists
-log_dir = Path(__file__).resolve().parent / "logs"
-log_dir.mkdir(exist_ok=True)
-# create a new log file for each run using timestamp
-timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-log_file = log_dir / f"main_{timestamp}.log"
-
-logging.basicConfig(
-    level=logging.DEBUG,
-    format="%(asctime)s [%(levelname)s] %(name)s: %(message)s",
-    datefmt="%Y-%m-%d %H:%M:%S",
-    handlers=[
-        logging.StreamHandler(),
-        logging.FileHandler(log_file)
-    ]
-)
-logger = logging.getLogger(__name__)
-
-
+from debater.debater import Debater, speaker_with_prompt
+from debater.context_builder import ContextBuilder
+from utilities.response_cache import get_response_cache
+from utilities.text_generator import token_usage
+from utilities.stage_timer import StageTimings
+from utilities.task_graph import TaskGraph
+from utilities.log_setup import configure_logging, log_artifact, log_context
 
-# --- Audio Recording Helper Function ---
-def record_and_save_audio(role: str, samplerate=44100) -> str | None:
-    """Records audio from microphone and saves to a temporary WAV file."""
-    q = queue.Queue()
-    audio_data = []
-    temp_file_path = None
-    recording_event = threading.Event()
-
-    def callback(indata, frames, time, status):
-        """This is called (from a separate thread) for each audio block."""
-        if status:
-            logger.warning(f"Audio recording status: {status}")
-        if recording_event.is_set():
-            q.put(indata.copy())
+logger = logging.getLogger(__name__)
 
+MODES = ("audio", "headless")
+RECORDING_SAMPLERATE = 44100
+TEAMS = {"OG": "Opening Government", "OO": "Opening Opposition", "CG": "Closing Government", "CO": "Closing Opposition"}
+# position -> team key
+TEAM_OF = {position: team for position, _, team in speaker_with_prompt}
+LOG_DIR = Path(__file__).resolve().parent / "logs"
+
+
+async def generate_ai_speech(role: str, debater_obj: Debater, chunks: asyncio.Queue | None = None) -> str:
+    """
+    Generate an AI speech, handing finished sentences to the chunks queue as they are streamed.
+
+    A None is put on the queue once generation ends, whether it succeeded or not.
+    Without a queue (headless mode) the speech is only generated.
+
+    Returns:
+        str: The full speech text
+    """
+    started = time.perf_counter()
+    chunker = SpeechChunker()
+    parts = []
+    if chunks is None:
+        parts.append(await debater_obj.adeliver_speech())
+        logger.info(f"{role} speech generated in {time.perf_counter() - started:.2f}s")
+        return "".join(parts)
     try:
-        input(f"Press Enter to start recording for {role}... ")
-        logger.info(f"Starting recording for {role}...")
-        recording_event.set() # Signal recording start
-
-        # Start the stream in a non-blocking way
-        with sd.InputStream(samplerate=samplerate, channels=1, callback=callback):
-            # Wait for user to stop recording
-            input("Press Enter again to stop recording... ")
-            recording_event.clear() # Signal recording stop
-            logger.info("Recording stopped.")
-
-    except sd.PortAudioError as e:
-        logger.error(f"PortAudio error during stream setup/operation: {e}", exc_info=True)
-         # Check for common issues
-        if "Invalid device ID" in str(e) or "No Default Input Device Available" in str(e):
-            logger.error("No microphone detected or selected. Please check your system audio settings.")
-        elif "Device unavailable" in str(e):
-            logger.error("Microphone might be in use by another application.")
-        return None # Exit early if stream fails
-    except Exception as e: # Catch other potential errors during stream setup/input
-        logger.error(f"Unexpected error during recording phase: {e}", exc_info=True)
-        return None # Exit early
-
-    # --- Data retrieval and saving separated ---    
+        async for delta in debater_obj.astream_speech():
+            parts.append(delta)
+            for chunk in chunker.feed(delta):
+                chunks.put_nowait(chunk)
+        tail = chunker.flush()
+        if tail:
+            chunks.put_nowait(tail)
+    finally:
+        chunks.put_nowait(None)
+    logger.info(f"{role} speech generated in {time.perf_counter() - started:.2f}s")
+    return "".join(parts)
+
+
+async def play_ai_speech(role: str, interaction: Interaction, chunks: asyncio.Queue, tone: str) -> None:
+    """
+    Queue the chunks of an AI speech for playback as they arrive, logging the time to first audio.
+
+    Returns once the whole speech is synthesized, usually long before it has been heard,
+    so whatever comes next is fetched while the speech is still playing.
+    """
+    started = time.perf_counter()
     try:
-        # Retrieve data from queue
-        while not q.empty():
-            audio_data.append(q.get())
-
-        if not audio_data:
-            logger.warning("No audio data recorded.")
-            return None
-
-        # Concatenate blocks and save
-        audio_np = np.concatenate(audio_data, axis=0)
-        with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as tmp_f:
-            temp_file_path = tmp_f.name
-            # --- Write the file --- 
-            sf.write(temp_file_path, audio_np, samplerate)
-            logger.info(f"Audio saved temporarily to {temp_file_path}")
-        return temp_file_path
-
-    except Exception as e: # Catch errors during queue processing, concatenation, file writing
-        logger.error(f"Error during audio processing/saving: {e}", exc_info=True)
-        if temp_file_path and os.path.exists(temp_file_path):
-            try:
-                os.remove(temp_file_path)
-                logger.debug(f"Cleaned up failed temporary file: {temp_file_path}")
-            except OSError as del_e:
-                 logger.error(f"Error deleting failed temporary file {temp_file_path}: {del_e}")
-        return None
- 
- # --- End Audio Recording Helper ---
+        first_audio = await interaction.tts_stream(tone=tone, chunks=chunks, wait=False, label=f"the {role}'s speech")
+        if first_audio is not None:
+            logger.info(f"Time to first audio for {role}: {first_audio:.2f}s")
+    except Exception as e:
+        logger.error(f"TTS failed for {role}: {e}", exc_info=True)
+    logger.info(f"{role} speech synthesized in {time.perf_counter() - started:.2f}s")
 
 
+async def timed(timings: StageTimings, stage: str, awaitable):
+    """Await something and record how long it took under the given stage, which is also added to its log lines."""
+    with timings.measure(stage), log_context(stage=stage):
+        return await awaitable
+
 
 def debate_history_saver(motion, speech_log, speaker_info=None):
     """Save debate history to a JSON file."""
@@ -124,7 +98,13 @@ def debate_history_saver(motion, speech_log, speaker_info=None):
     if speaker_info and len(speaker_info) == len(speech_log):
         history["speaker_info"] = speaker_info
     
-    history_file_path = history_dir / f"{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    # debates finishing within the same second (batch runs) get a numbered suffix
+    stem = datetime.now().strftime('%Y%m%d_%H%M%S')
+    history_file_path = history_dir / f"{stem}.json"
+    suffix = 1
+    while history_file_path.exists():
+        history_file_path = history_dir / f"{stem}_{suffix}.json"
+        suffix += 1
     
     with history_file_path.open("w") as f:
         json.dump(history, f, indent=4)
@@ -134,23 +114,51 @@ def debate_history_saver(motion, speech_log, speaker_info=None):
 
 
 
-async def main(motion: str) -> None:
+async def main(motion: str, mode: str = "audio", timings: StageTimings = None) -> Path:
+    """
+    Run a full debate.
+
+    Args:
+        motion (str): The motion of the debate
+        mode (str): "audio" speaks and records through the audio stack, "headless" only
+            produces the transcript and never imports the audio libraries
+        timings (StageTimings): Collects per-stage durations, a new one is used if not given
+
+    Returns:
+        Path: The saved debate history file
+    """
+    if mode not in MODES:
+        raise ValueError(f"Invalid mode: '{mode}'. Valid options are {', '.join(repr(m) for m in MODES)}")
+    headless = mode == "headless"
+    timings = timings if timings is not None else StageTimings()
+    started = time.perf_counter()
     logger.debug("Configuration loaded from config.json")
-    logger.info(f"Starting debate with motion: {motion}")
-    speaker = Speaker(motion)
+    logger.info(f"Starting debate with motion: {motion} ({mode} mode)")
+    speaker = Speaker(motion, headless=headless)
     logger.debug("Speaker initialized")
     speech_log = []
     speaker_info = []  # Initialize list to track AI or human player information
     brainstormer = BrainStormer()
     logger.debug("BrainStormer initialized")
-    interaction = Interaction()
+    interaction = None if headless else Interaction()
+    settings = get_settings()
+    debater_tone = settings.debater_tone
+    # read once, a debate keeps the settings it started with
+    stt_settings, vad_settings, recording_settings = settings.stt, settings.vad, settings.recording
     logger.debug("Interaction initialized")
     
     # Detect human players and collect nicknames
     human_nicknames = {}
-    human_positions = [pos for pos, party in get_config("PARTY").items() if party == "Human"]
+    # read once, the debate keeps the line-up it started with
+    party = settings.party
+    human_positions = [pos for pos, side in party.items() if side == "Human"]
+    if human_positions and headless:
+        raise ValueError(f"Headless mode cannot record human speeches, set these positions to AI: {', '.join(human_positions)}")
     
     if human_positions:
+        # the microphone stack is only needed when someone has to be recorded
+        from utilities.recording import record_audio
+        from utilities.streaming_stt import StreamingTranscriber
         print("\n=== Human Players Detected ===")
         print("Please enter nicknames for progress tracking:")
         for position in human_positions:
@@ -161,115 +169,227 @@ async def main(motion: str) -> None:
             logger.info(f"Human player '{nickname}' will play as {position}")
         print("===============================\n")
 
-    await speaker.announce_motion()
-    logger.info("Motion announced")
-
-    teams = ["Opening Government", "Opening Opposition", "Closing Government", "Closing Opposition"]
-    speaking_order = speaker.speaking_order
-
-    # Brainstorm for all teams concurrently
-    tasks = []
-    for team in teams:
-        # run blocking brainstorm sync function in thread pool
-        task = asyncio.to_thread(brainstormer.brain_storm, motion, team)
-        tasks.append(task)
-
-    # wait for all tasks and collect results
-    results = await asyncio.gather(*tasks)
-    logger.info("Brainstorming tasks completed")
-    # log individual brainstorming outputs
-    logger.debug("Team brainstorming outputs:")
-    for idx, team in enumerate(teams):
-        logger.debug(f"{team} output:\n{results[idx]}")
-    # map results to clue keys in the original order
-    clue = {"OG": results[0], "OO": results[1], "CG": results[2], "CO": results[3]}
+    # clues are filled in as each team finishes, every debater only reads its own team's
+    clue = {}
+    # earlier speeches are summarized in the background as they land
+    context = ContextBuilder.from_config()
+
+    def log_speech(role: str, speaker_type: str, speech: str) -> None:
+        log_artifact(logger, f"{role} speech by {speaker_type} ({len(speech)} characters)", "speech", speech)
+        speech_log.append(speech)
+        speaker_info.append({"role": role, "speaker": speaker_type})
+        context.speech_added(len(speech_log) - 1, speech)
+
+    async def brainstorm(key: str, team: str) -> None:
+        with log_context(stage="brainstorm", role=team):
+            clue[key] = await timed(timings, "brainstorm", brainstormer.abrain_storm(motion, team))
+            log_artifact(logger, f"{team} finished brainstorming", "clue", clue[key])
+
+    async def ai_speech(role: str, debater_obj: Debater, chunks: asyncio.Queue | None) -> None:
+        with log_context(stage="speech", role=role):
+            logger.info(f"{role} is delivering speech")
+            speech = await timed(timings, "speech", generate_ai_speech(role, debater_obj, chunks))
+            log_speech(role, "AI", speech)
+
+    async def playback(role: str, chunks: asyncio.Queue) -> None:
+        with log_context(stage="playback", role=role):
+            await timed(timings, "playback", play_ai_speech(role, interaction, chunks, debater_tone))
+
+    async def announce(role: str, next_role: str) -> None:
+        # a failed announcement must not stop the debate
+        with log_context(stage="announce", role=next_role):
+            try:
+                await speaker.announce_next_speaker(role, next_role, wait=False)
+            except Exception as e:
+                logger.error(f"Announcement failed: {e}", exc_info=True)
+
+    async def human_speech(role: str) -> None:
+        with log_context(stage="speech", role=role):
+            await record_human_speech(role)
+
+    async def record_human_speech(role: str) -> None:
+        # Get the human nickname for this position
+        speaker_type = human_nicknames.get(role, "Human")
+        # nothing may still be playing while the human speaks
+        await interaction.drain()
+        logger.info(f"Waiting for human input from {role} ({speaker_type}) via microphone.")
+        # transcribe in the background while the speech is being recorded (STT), silence is
+        # trimmed before upload and optionally ends the recording (VAD)
+        threshold_db = vad_settings.get("threshold_db", -45)
+        trim = {"max_pause_seconds": vad_settings.get("max_pause_seconds", 1.0), "threshold_db": threshold_db} if vad_settings.get("enabled", True) else {}
+        transcriber = None
+        if stt_settings.get("streaming", True):
+            transcriber = StreamingTranscriber(
+                interaction.stt_chunk,
+                samplerate=RECORDING_SAMPLERATE,
+                min_chunk_seconds=stt_settings.get("min_chunk_seconds", 8),
+                max_chunk_seconds=stt_settings.get("max_chunk_seconds", 15),
+                overlap_seconds=stt_settings.get("overlap_seconds", 0.5),
+                **trim,
+            )
+        # the recording stays in memory, nothing is written to disk
+        recording = await timed(timings, "recording", asyncio.to_thread(
+            record_audio, role, samplerate=RECORDING_SAMPLERATE, on_block=transcriber.feed if transcriber else None,
+            auto_stop_seconds=vad_settings.get("auto_stop_seconds"), threshold_db=threshold_db,
+            in_subprocess=recording_settings.get("subprocess", False)))
+        speech = None
+
+        if recording is not None:
+            try:
+                logger.info(f"Converting speech to text for {role}...")
+                if transcriber is not None:
+                    speech = await timed(timings, "stt", asyncio.to_thread(transcriber.finish))
+                    if transcriber.failed_chunks or not speech:
+                        logger.warning(f"Streaming transcription of {role} is incomplete, transcribing the whole recording instead.")
+                        speech = None
+                if not speech and stt_settings.get("parallel", True):
+                    speech = await timed(timings, "stt", asyncio.to_thread(
+                        interaction.stt_parallel, recording, RECORDING_SAMPLERATE, concurrency=stt_settings.get("concurrency", 4), **trim))
+                elif not speech:
+                    speech = await timed(timings, "stt", asyncio.to_thread(interaction.stt_samples, recording, RECORDING_SAMPLERATE, **trim))
+                if speech:
+                    log_speech(role, speaker_type, speech)
+                    logger.info(f"{role} speech captured via STT (length={len(speech)})")
+                else:
+                    logger.warning(f"STT returned empty result for {role}.")
+            except Exception as e:
+                logger.error(f"STT failed for {role}: {e}", exc_info=True)
+        else:
+            logger.warning(f"No audio recorded for {role}, skipping speech.")
+            if transcriber is not None:
+                await asyncio.to_thread(transcriber.finish)
 
-    await speaker.start_debate()
-    logger.info("Debate session started")
+        # keep the slot in the log even without a speech
+        if not speech:
+            logger.debug(f"{role} speech skipped (no audio or STT failed). Adding empty entry to log.")
+            log_speech(role, speaker_type, "") # Add empty string if speech failed
 
     # initialize debaters
     debaters = [
-        ("Prime Minister", Debater(motion, "Prime Minister", speech_log, clue), get_config("PARTY")["Prime Minister"]),
-        ("Leader of Opposition", Debater(motion, "Leader of Opposition", speech_log, clue), get_config("PARTY")["Leader of Opposition"]),
-        ("Deputy Prime Minister", Debater(motion, "Deputy Prime Minister", speech_log, clue), get_config("PARTY")["Deputy Prime Minister"]),
-        ("Deputy Leader of Opposition", Debater(motion, "Deputy Leader of Opposition", speech_log, clue), get_config("PARTY")["Deputy Leader of Opposition"]),
-        ("Member of Government", Debater(motion, "Member of Government", speech_log, clue), get_config("PARTY")["Member of Government"]),
-        ("Member of Opposition", Debater(motion, "Member of Opposition", speech_log, clue), get_config("PARTY")["Member of Opposition"]),
-        ("Government Whip", Debater(motion, "Government Whip", speech_log, clue), get_config("PARTY")["Government Whip"]),
-        ("Opposition Whip", Debater(motion, "Opposition Whip", speech_log, clue), get_config("PARTY")["Opposition Whip"]),
+        ("Prime Minister", Debater(motion, "Prime Minister", speech_log, clue, context), party["Prime Minister"]),
+        ("Leader of Opposition", Debater(motion, "Leader of Opposition", speech_log, clue, context), party["Leader of Opposition"]),
+        ("Deputy Prime Minister", Debater(motion, "Deputy Prime Minister", speech_log, clue, context), party["Deputy Prime Minister"]),
+        ("Deputy Leader of Opposition", Debater(motion, "Deputy Leader of Opposition", speech_log, clue, context), party["Deputy Leader of Opposition"]),
+        ("Member of Government", Debater(motion, "Member of Government", speech_log, clue, context), party["Member of Government"]),
+        ("Member of Opposition", Debater(motion, "Member of Opposition", speech_log, clue, context), party["Member of Opposition"]),
+        ("Government Whip", Debater(motion, "Government Whip", speech_log, clue, context), party["Government Whip"]),
+        ("Opposition Whip", Debater(motion, "Opposition Whip", speech_log, clue, context), party["Opposition Whip"]),
     ]
-    # deliver speeches in order with logging
-    for idx, (role, debater_obj, party) in enumerate(debaters):
+
+    # The debate as a graph of steps. A speech starts as soon as its own team's clue and the
+    # previous speech are ready, so the Prime Minister does not wait for the other three
+    # brainstorms. Audio (announcements and speeches) is chained through `audio`, which keeps
+    # it strictly in order while generation of the following speeches runs ahead of it. Audio
+    # steps finish once their clip is queued on the playback engine, which plays the queue
+    # back to back, so each clip is already fetched while the one before it is still playing.
+    graph = TaskGraph()
+    # render the Speaker's remaining lines in the background while teams prepare
+    graph.add("prerender", speaker.prerender)
+    for key, team in TEAMS.items():
+        graph.add(f"brainstorm {key}", partial(brainstorm, key, team))
+    audio = graph.add("announce motion", partial(speaker.announce_motion, wait=False))
+    # "prep time is over": only once the first team to speak has its clue
+    audio = graph.add("start debate", partial(speaker.start_debate, wait=False), after=[audio, "brainstorm OG"])
+    previous_speech = None
+    for idx, (role, debater_obj, side) in enumerate(debaters):
         next_role = debaters[idx + 1][0] if idx + 1 < len(debaters) else None
-        logger.info(f"{role} is delivering speech")
-        
-        # Track speaker information (AI or human nickname)
-        if party == "AI":
-            speaker_type = "AI"
-            speech = debater_obj.deliver_speech()
-            speech_log.append(speech)
-            speaker_info.append({"role": role, "speaker": speaker_type})
-            try:
-                await interaction.tts(tone=get_config("debater_tone"), input=speech)
-            except Exception as e:
-                logger.error(f"TTS failed for {role}: {e}", exc_info=True)
+        if side == "AI":
+            chunks = None if headless else asyncio.Queue()
+            speech = graph.add(f"speech {role}", partial(ai_speech, role, debater_obj, chunks),
+                               after=[f"brainstorm {TEAM_OF[role]}", previous_speech])
+            if not headless:
+                audio = graph.add(f"playback {role}", partial(playback, role, chunks), after=[audio])
         else:
-            # Get the human nickname for this position
-            speaker_type = human_nicknames.get(role, "Human")
-            logger.info(f"Waiting for human input from {role} ({speaker_type}) via microphone.")
-            temp_audio_file = await asyncio.to_thread(record_and_save_audio, role)
-            speech = None
-
-            if temp_audio_file:
-                try:
-                    logger.info(f"Converting speech to text for {role}...")
-                    speech = await asyncio.to_thread(interaction.stt, audio_file=temp_audio_file)
-                    if speech:
-                        speech_log.append(speech)
-                        speaker_info.append({"role": role, "speaker": speaker_type})
-                        logger.info(f"{role} speech captured via STT (length={len(speech)}). Content: {speech[:100]}...")
-                    else:
-                        logger.warning(f"STT returned empty result for {role}.")
-                except Exception as e:
-                    logger.error(f"STT failed for {role}: {e}", exc_info=True)
-                finally:
-                    # Clean up the temporary audio file
-                    if os.path.exists(temp_audio_file):
-                        os.remove(temp_audio_file)
-                        logger.debug(f"Cleaned up temporary audio file: {temp_audio_file}")
-            else:
-                logger.warning(f"No audio recorded for {role}, skipping speech.")
-
-            # Log the speech if captured, otherwise log absence
-            if speech:
-                logger.debug(f"{role} speech delivered by {speaker_type}, length={len(speech)}")
-                logger.debug(f"{role} speech content:\n{speech}")
-            else:
-                logger.debug(f"{role} speech skipped (no audio or STT failed). Adding empty entry to log.")
-                speech_log.append("") # Add empty string if speech failed
-                speaker_info.append({"role": role, "speaker": speaker_type})
-
+            # the human only starts once everything before them has been heard
+            speech = graph.add(f"speech {role}", partial(human_speech, role), after=[audio, previous_speech])
+            audio = speech
         if next_role:
-            logger.info(f"Announcing next speaker: {role} -> {next_role}")
-            await speaker.announce_next_speaker(role, next_role)
-    logger.info("Debate concluded")
-    await speaker.announce_end()
-    # snapshot all local variables at end of main
-    logger.debug(f"Final local variables: {locals()}")
-    # serialize and log speech mapping as JSON with speaker information
-    speech_map = {}
-    for idx, ((role, _, _), speech) in enumerate(zip(debaters, speech_log)):
-        speaker = speaker_info[idx]["speaker"] if idx < len(speaker_info) else "Unknown"
-        speech_map[role] = {"content": speech, "speaker": speaker}
-    logger.info(f"Speeches JSON: {json.dumps(speech_map, ensure_ascii=False)}")
-    
+            audio = graph.add(f"announce {next_role}", partial(announce, role, next_role), after=[audio, speech])
+        previous_speech = speech
+
+    # clips already synthesized by this process do not count for this debate
+    cache_writes = interaction.audio_cache.writes if interaction is not None else 0
+    # Enter skips the rest of the AI speech being played
+    skip_listener = None
+    if interaction is not None and settings.playback.get("barge_in", True):
+        skip_listener = interaction.listen_for_skips()
+    try:
+        try:
+            await graph.run()
+            if interaction is not None:
+                # audio steps only queue their clips: the last speech is heard (and can be skipped) until here
+                await interaction.drain()
+        finally:
+            if skip_listener is not None:
+                skip_listener.stop()
+        logger.info(f"Debate concluded in {time.perf_counter() - started:.2f}s")
+        logger.info(graph.report())
+        rendered = graph.results["prerender"]
+        if interaction is not None:
+            # the Speaker's Interaction shares this process-wide cache
+            synthesized = interaction.audio_cache.writes - cache_writes
+            logger.info(f"{rendered}/{len(speaker.announcements())} Speaker announcements were rendered ahead of time: "
+                        f"{rendered - synthesized} were already in the audio cache, {synthesized} were synthesized for this debate")
+        logger.info(f"Response cache: {get_response_cache().stats()}")
+        # totals for the whole process, cached_tokens shows how much the provider-side prefix cache saved
+        logger.info(f"Token usage so far: {json.dumps(token_usage.summary())}")
+        if interaction is not None:
+            skipped, saved = interaction.skipped()
+            logger.info(f"{skipped} speeches were skipped, saving {saved:.1f}s of playback")
+        # plays after everything still queued
+        await speaker.announce_end()
+    finally:
+        # also when a step failed: stop the summaries and release the sound device
+        await context.aclose()
+        if interaction is not None:
+            interaction.close()
+
     # Save debate history with speaker information
     history_path = debate_history_saver(motion, speech_log, speaker_info)
     logger.info(f"Debate history saved to: {history_path}")
-    
-
+    timings.record("debate", time.perf_counter() - started)
+    logger.info(f"Stage timings: {json.dumps(timings.summary())}")
+    return history_path
+
+
+
+def setup_logging(name: str = "main") -> Path:
+    """
+    Log through a background thread to the console and to a new JSON Lines file in logs/,
+    with settings from the LOGGING section of config.json. Called by the entry points,
+    importing this module configures nothing.
+
+    Args:
+        name (str): Prefix of the log file name
+
+    Returns:
+        Path: The log file of this run
+    """
+    settings = get_settings().logging
+    return configure_logging(
+        LOG_DIR,
+        name,
+        level=settings.get("level", "DEBUG"),
+        console_level=settings.get("console_level", "INFO"),
+        library_level=settings.get("library_level", "WARNING"),
+        max_file_mb=settings.get("max_file_mb", 10),
+        backup_count=settings.get("backup_count", 3),
+        retention_days=settings.get("retention_days", 14),
+        max_total_mb=settings.get("max_total_mb", 200),
+    )
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Run a British Parliamentary debate.")
+    parser.add_argument("--motion", default="This house would legalize marijuana.", help="the motion to debate")
+    parser.add_argument("--headless", action="store_true", help="text only: no TTS, STT or recording, just the transcript")
+    parser.add_argument("--set", action="append", metavar="KEY=VALUE",
+                        help="override a config.json value, e.g. --set PLAYBACK.rate=1.5, may be repeated")
+    return parser.parse_args(argv)
 
 
 if __name__ == "__main__":
-    motion = "This house would legalize marijuana."
-    asyncio.run(main(motion))
+    args = parse_args()
+    get_settings().set_overrides(args.set)
+    setup_logging()
+    asyncio.run(main(args.motion, mode="headless" if args.headless else "audio"))
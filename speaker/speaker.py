@@ -1,7 +1,9 @@
 import asyncio
+import logging
 from utilities.text_generator import Responder
 from utilities.interaction import Interaction
-from config_utils import get_config
+from utilities.client_pool import warm_up, debate_targets
+from config_utils import get_settings
 
 
 # text = "Ladies and gentlemen, welcome to this debate. The motion reads: {motion}, now you have 1 minute to read the motion and then you will have 15 minutes for prep time.".format(motion=self.motion)
@@ -12,29 +14,64 @@ from config_utils import get_config
 
 
 
+logger = logging.getLogger(__name__)
+
+
 class Speaker():
-    def __init__(self, motion: str):
+    def __init__(self, motion: str, headless: bool = False):
         self.responder = Responder()
-        self.interaction = Interaction()
+        # headless Speakers only log their lines, no TTS at all
+        self.headless = headless
+        self.interaction = None if headless else Interaction()
         self.motion = motion
         self.speaking_order = ["Prime Minister", "Leader of Opposition", "Deputy Prime Minister", "Deputy Leader of Opposition", "Member of Government", "Member of Opposition", "Government Whip", "Opposition Whip"]
-        self.speaker_tone = get_config("speaker_tone")
+        self.speaker_tone = get_settings().speaker_tone
         
-    async def announce_motion(self) -> None:
-        text = "Ladies and gentlemen, welcome to this debate. The motion reads: {motion}, now you have 1 minute to read the motion and then you will have 15 minutes for prep time.".format(motion=self.motion)
-        await self.interaction.tts(tone=self.speaker_tone, input=text)
+    def motion_text(self) -> str:
+        return "Ladies and gentlemen, welcome to this debate. The motion reads: {motion}, now you have 1 minute to read the motion and then you will have 15 minutes for prep time.".format(motion=self.motion)
+
+    def start_text(self) -> str:
+        return "Ladies and gentlemen, the prep time is over. Now let's welcome the Prime Minister to deliver his speech, hear hear."
+
+    def next_speaker_text(self, current_speaker_position: str, next_speaker_position: str) -> str:
+        return "Thank you {} for that very fine speech, now let's welcome {} to deliver his speech, hear hear.".format(current_speaker_position, next_speaker_position)
+
+    def end_text(self) -> str:
+        return "Thank you all for your speeches, please wait for the results."
+
+    def announcements(self) -> list[str]:
+        """Every line the Speaker says during a debate, in order."""
+        transitions = [self.next_speaker_text(current, following) for current, following in zip(self.speaking_order, self.speaking_order[1:])]
+        return [self.motion_text(), self.start_text(), *transitions, self.end_text()]
+
+    async def say(self, text: str, wait: bool = True) -> None:
+        """Speak a line, with wait=False only queue it behind whatever is still playing."""
+        if self.headless:
+            logger.info(f"Speaker: {text}")
+            return
+        await self.interaction.tts(tone=self.speaker_tone, input=text, cached=True, wait=wait)
+
+    async def prerender(self) -> int:
+        """Synthesize any announcement missing from the audio cache so it plays instantly later."""
+        if self.headless:
+            return 0
+        return await self.interaction.prerender(tone=self.speaker_tone, texts=self.announcements())
+
+    async def announce_motion(self, wait: bool = True) -> None:
+        # open the provider connections while the motion is being read out
+        await asyncio.gather(
+            self.say(self.motion_text(), wait=wait),
+            warm_up(debate_targets()),
+        )
 
-    async def start_debate(self) -> None:
-        text = "Ladies and gentlemen, the prep time is over. Now let's welcome the Prime Minister to deliver his speech, hear hear."
-        await self.interaction.tts(tone=self.speaker_tone, input=text)
+    async def start_debate(self, wait: bool = True) -> None:
+        await self.say(self.start_text(), wait=wait)
 
-    async def announce_next_speaker(self, current_speaker_position: str, next_speaker_position: str) -> None:
-        text = "Thank you {} for that very fine speech, now let's welcome {} to deliver his speech, hear hear.".format(current_speaker_position, next_speaker_position)
-        await self.interaction.tts(tone=self.speaker_tone, input=text)
+    async def announce_next_speaker(self, current_speaker_position: str, next_speaker_position: str, wait: bool = True) -> None:
+        await self.say(self.next_speaker_text(current_speaker_position, next_speaker_position), wait=wait)
 
-    async def announce_end(self) -> None:
-        text = "Thank you all for your speeches, please wait for the results."
-        await self.interaction.tts(tone=self.speaker_tone, input=text)
+    async def announce_end(self, wait: bool = True) -> None:
+        await self.say(self.end_text(), wait=wait)
 
     def generate_rankings(speech_log: list) -> list:
         text = f"{judge_prompt}\n\n Based on the previous speakers' debate: {speech_log} + \n\n + Please rank the performances of each team, from best to worst. Afterwards, please explain why you ranked them the way you did."
@@ -0,0 +1,74 @@
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from utilities import audio_cache
+from utilities.audio_cache import AudioCache
+
+PCM = b"\x00\x01" * 2400
+
+
+def test_store_and_load(tmp_path):
+    cache = AudioCache(tmp_path)
+    key = cache.key("Order, order", "calm", "coral", "tts")
+    assert not cache.contains(key)
+    cache.store(key, PCM)
+    assert cache.contains(key)
+    assert cache.load(key).shape == (2400, 1)
+    assert cache.writes == 1
+
+
+def test_least_recently_used_clips_are_evicted(tmp_path):
+    cache = AudioCache(tmp_path)
+    keys = [cache.key(text, "calm", "coral", "tts") for text in ("a", "b", "c")]
+    for age, key in zip((300, 200, 100), keys):
+        cache.store(key, PCM)
+        os.utime(cache._path(key), (time.time() - age, time.time() - age))
+    # loading "a" makes "b" the least recently used clip
+    assert cache.load(keys[0]) is not None
+
+    cache.max_bytes = cache._path(keys[0]).stat().st_size * 2
+    assert cache.evict() == 1
+    assert [cache.contains(key) for key in keys] == [True, False, True]
+
+
+def test_store_evicts_once_over_budget(tmp_path):
+    cache = AudioCache(tmp_path, max_bytes=len(PCM) * 2 + 200)
+    for text in ("a", "b", "c"):
+        cache.store(cache.key(text, "calm", "coral", "tts"), PCM)
+        time.sleep(0.01)
+    assert cache.evictions == 1
+    assert not cache.contains(cache.key("a", "calm", "coral", "tts"))
+
+
+def test_unused_clips_expire(tmp_path):
+    cache = AudioCache(tmp_path, max_age=60)
+    key = cache.key("a", "calm", "coral", "tts")
+    cache.store(key, PCM)
+    os.utime(cache._path(key), (time.time() - 120, time.time() - 120))
+    assert cache.evict() == 1
+    assert not cache.contains(key)
+
+
+def test_prerendered_clips_are_split_into_cached_and_synthesized(tmp_path, monkeypatch):
+    from utilities.interaction import TTS_MODEL, TTS_VOICE, Interaction
+
+    monkeypatch.setattr(audio_cache, "_cache", None)
+    monkeypatch.setattr(audio_cache, "get_settings", lambda: MagicMock(audio_cache={"directory": str(tmp_path)}))
+    # the Speaker and main each have their own Interaction
+    speaker_side, debate_side = Interaction(service="openai"), Interaction(service="openai")
+    assert speaker_side.audio_cache is debate_side.audio_cache
+    cache = debate_side.audio_cache
+    cache.store(cache.key("Order, order", "calm", TTS_VOICE, TTS_MODEL), PCM)
+    writes = cache.writes
+
+    speaker_side.synthesize = AsyncMock(return_value=PCM)
+    rendered = asyncio.run(speaker_side.prerender("calm", ["Order, order", "Hear hear", "Time"]))
+
+    synthesized = debate_side.audio_cache.writes - writes
+    assert (rendered, rendered - synthesized, synthesized) == (3, 1, 2)
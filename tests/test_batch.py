@@ -0,0 +1,58 @@
+import asyncio
+import json
+import sys
+from pathlib import Path
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from batch import load_motions, completed_motions, parse_provider_limits, run_batch
+
+
+def test_load_motions_text_and_jsonl(tmp_path):
+    text_file = tmp_path / "motions.txt"
+    text_file.write_text("# comment\nTHW ban homework.\n\nTHW ban homework.\nTHBT art should be free.\n")
+    assert load_motions(text_file) == ["THW ban homework.", "THBT art should be free."]
+
+    jsonl_file = tmp_path / "motions.jsonl"
+    jsonl_file.write_text(json.dumps({"motion": "THW ban homework."}) + "\n" + json.dumps("THBT art should be free.") + "\n")
+    assert load_motions(jsonl_file) == ["THW ban homework.", "THBT art should be free."]
+
+
+def test_completed_motions_reads_debate_history(tmp_path):
+    (tmp_path / "20250101_000000.json").write_text(json.dumps({"motion": "THW ban homework.", "speech_log": []}))
+    (tmp_path / "broken.json").write_text("{")
+    assert completed_motions(tmp_path) == {"THW ban homework."}
+
+
+def test_parse_provider_limits():
+    assert parse_provider_limits(["openrouter=8", "OpenAI=2"]) == {"openrouter": 8, "openai": 2}
+    assert parse_provider_limits(None) == {}
+
+
+def test_run_batch_respects_concurrency_and_reports_failures():
+    in_flight = 0
+    peak = 0
+
+    async def fake_main(motion, mode, timings):
+        nonlocal in_flight, peak
+        assert mode == "headless"
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        if motion == "bad":
+            raise RuntimeError("provider down")
+        timings.record("speech", 1.0)
+        return Path(f"{motion}.json")
+
+    with patch("batch.debate.main", AsyncMock(side_effect=fake_main)):
+        summary = asyncio.run(run_batch(["a", "b", "bad", "c", "d"], concurrency=2))
+
+    assert peak == 2
+    assert summary["completed"] == 4
+    assert summary["failed"] == [{"motion": "bad", "error": "provider down"}]
+    assert summary["stages"]["speech"]["count"] == 4
+    assert summary["debates_per_hour"] > 0
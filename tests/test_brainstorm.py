@@ -0,0 +1,67 @@
+import asyncio
+import sys
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from debater import team_brainstorm
+from debater.team_brainstorm import BrainStormer
+
+
+def make_brainstormer(mode, subtask_timeout=1, delays=None, failing=()):
+    settings = MagicMock(team_provider="openrouter", team_model="test-model",
+                         brainstorm={"mode": mode, "subtask_timeout": subtask_timeout})
+    with patch("debater.team_brainstorm.get_settings", return_value=settings):
+        brainstormer = BrainStormer()
+    prompts = []
+
+    async def ask(prompt):
+        prompts.append(prompt)
+        # every sub-task prompt ends with its own "Provide only ..." instruction
+        name = next((name for name, (_, text) in team_brainstorm.SUBTASKS.items() if text.split("Provide only")[1] in prompt), "single")
+        await asyncio.sleep((delays or {}).get(name, 0))
+        if name in failing:
+            raise RuntimeError("provider error")
+        return f"{name} notes"
+
+    brainstormer.ask = ask
+    return brainstormer, prompts
+
+
+def test_single_mode_sends_one_prompt():
+    brainstormer, prompts = make_brainstormer("single")
+    assert asyncio.run(brainstormer.abrain_storm_now("THW test", "Opening Government")) == "single notes"
+    assert prompts == [brainstormer.text.format("THW test", "Opening Government")]
+
+
+def test_parallel_mode_merges_sections_in_order():
+    brainstormer, prompts = make_brainstormer("parallel", delays={"analysis": 0.05})
+    clue = asyncio.run(brainstormer.abrain_storm_now("THW test", "Closing Opposition"))
+    assert len(prompts) == len(team_brainstorm.SUBTASKS)
+    assert all("THW test" in prompt and "Closing Opposition" in prompt for prompt in prompts)
+    headings = [heading for heading, _ in team_brainstorm.SUBTASKS.values()]
+    positions = [clue.index(f"## {heading}") for heading in headings]
+    assert positions == sorted(positions)
+    assert "analysis notes" in clue and "rebuttals notes" in clue
+
+
+def test_slow_or_failing_branches_are_left_out():
+    brainstormer, _ = make_brainstormer("parallel", subtask_timeout=0.05, delays={"opponents": 1}, failing={"rebuttals"})
+    clue = asyncio.run(brainstormer.abrain_storm_now("THW test", "Opening Government"))
+    assert "arguments notes" in clue
+    assert "opponents notes" not in clue
+    assert "rebuttals notes" not in clue
+
+
+def test_parallel_mode_fails_when_every_branch_fails():
+    brainstormer, _ = make_brainstormer("parallel", failing=set(team_brainstorm.SUBTASKS))
+    with pytest.raises(RuntimeError):
+        asyncio.run(brainstormer.abrain_storm_now("THW test", "Opening Government"))
+
+
+def test_unknown_mode_is_rejected():
+    with pytest.raises(ValueError):
+        make_brainstormer("serial")
@@ -0,0 +1,87 @@
+import multiprocessing
+import sys
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from utilities.capture_buffer import CaptureBuffer, SharedCaptureBuffer
+
+
+def test_blocks_are_stored_in_order():
+    buffer = CaptureBuffer(samplerate=100, max_seconds=10)
+    first = np.full((30, 1), 0.1, dtype=np.float32)
+    second = np.full((20, 1), 0.2, dtype=np.float32)
+    buffer.write(first)
+    buffer.write(second)
+
+    assert buffer.frames == 50
+    assert buffer.seconds == 0.5
+    np.testing.assert_array_equal(buffer.view(), np.concatenate([first, second]))
+
+
+def test_view_does_not_copy():
+    buffer = CaptureBuffer(samplerate=100, max_seconds=1)
+    assert buffer.write(np.ones((40, 1), dtype=np.float32)) == 40
+
+    assert np.shares_memory(buffer.view(), buffer.data)
+
+
+def test_audio_past_the_cap_is_counted_not_stored():
+    buffer = CaptureBuffer(samplerate=100, max_seconds=1)
+    buffer.write(np.ones((80, 1), dtype=np.float32))
+    written = buffer.write(np.full((50, 1), 2.0, dtype=np.float32))
+
+    assert written == 20
+    assert buffer.full
+    assert buffer.dropped_frames == 30
+    assert len(buffer.view()) == 100
+
+    assert buffer.write(np.ones((10, 1), dtype=np.float32)) == 0
+    assert buffer.dropped_frames == 40
+
+
+def test_empty_buffer():
+    buffer = CaptureBuffer(samplerate=100, max_seconds=1)
+
+    assert buffer.view().shape == (0, 1)
+    assert not buffer.full
+
+
+def _write_in_child(name):
+    buffer = SharedCaptureBuffer(samplerate=100, max_seconds=1, name=name)
+    buffer.write(np.full((30, 1), 0.5, dtype=np.float32))
+    buffer.overflows += 1
+    buffer.close()
+
+
+def test_shared_buffer_is_written_by_another_process():
+    buffer = SharedCaptureBuffer(samplerate=100, max_seconds=1)
+    try:
+        process = multiprocessing.get_context("spawn").Process(target=_write_in_child, args=(buffer.name,))
+        process.start()
+        process.join(timeout=30)
+
+        assert process.exitcode == 0
+        assert buffer.frames == 30
+        assert buffer.overflows == 1
+        np.testing.assert_array_equal(buffer.view(), np.full((30, 1), 0.5, dtype=np.float32))
+    finally:
+        buffer.close()
+        buffer.unlink()
+
+
+def test_attaching_keeps_the_counters():
+    buffer = SharedCaptureBuffer(samplerate=100, max_seconds=1)
+    try:
+        buffer.write(np.ones((10, 1), dtype=np.float32))
+        attached = SharedCaptureBuffer(samplerate=100, max_seconds=1, name=buffer.name)
+
+        assert attached.frames == 10
+        attached.write(np.ones((5, 1), dtype=np.float32))
+        assert buffer.frames == 15
+        attached.close()
+    finally:
+        buffer.close()
+        buffer.unlink()
@@ -0,0 +1,47 @@
+import asyncio
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from utilities import client_pool
+from utilities.text_generator import Responder
+
+
+def test_run_sync_closes_the_clients_of_its_loop(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+
+    async def use_client():
+        client = client_pool.get_async_client("openai")
+        return client, asyncio.get_running_loop()
+
+    client, loop = client_pool.run_sync(use_client())
+
+    assert client.is_closed()
+    assert loop not in client_pool._async_clients
+
+
+def test_respond_to_uses_the_pooled_sync_client():
+    client = MagicMock()
+    client.chat.completions.create.return_value = SimpleNamespace(
+        usage=None, choices=[SimpleNamespace(message=SimpleNamespace(content="Hello"))])
+    cache = MagicMock()
+    cache.get.return_value = None
+    with patch("utilities.text_generator.get_client", return_value=client) as get_client, \
+         patch("utilities.text_generator.get_async_client") as get_async_client, \
+         patch("utilities.text_generator.get_response_cache", return_value=cache):
+        responder = Responder("openai")
+        assert responder.respond_to("Hi") == "Hello"
+
+    get_client.assert_called_once_with("openai")
+    get_async_client.assert_not_called()
+    cache.put.assert_called_once_with("openai", responder.model, "Hi", "Hello")
+
+
+def test_providers_follow_the_proxy_environment_unless_configured():
+    settings = MagicMock(provider_proxies={"openai": None})
+    with patch("utilities.client_pool.get_settings", return_value=settings):
+        assert client_pool._proxy_for("openrouter") == (None, True)
+        assert client_pool._proxy_for("openai") == (None, False)
@@ -0,0 +1,111 @@
+import json
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from config_utils import ROLES, Config, ConfigError, get_settings, validate_config
+
+VALID = {
+    "speaker_tone": "loud",
+    "debater_tone": "fast",
+    "TEAM_AI_PROVIDER": "openrouter",
+    "TEAM_AI_MODEL": "team-model",
+    "INDIVIDUAL_AI_PROVIDER": "openrouter",
+    "INDIVIDUAL_AI_MODEL": "individual-model",
+    "INTERACTION_PROVIDER": "openai",
+    "PLAYBACK": {"rate": 1.0},
+    "PARTY": {role: "AI" for role in ROLES},
+}
+
+
+def write(path, config, mtime=None):
+    path.write_text(json.dumps(config), encoding="utf-8")
+    if mtime is not None:
+        os.utime(path, (mtime, mtime))
+
+
+def test_repository_config_is_valid():
+    assert validate_config(get_settings().data) == []
+
+
+def test_validation_names_every_problem():
+    config = dict(VALID, TEAM_AI_PROVIDER="anthropic", INDIVIDUAL_AI_MODEL="", PLAYBACK=[1.5],
+                  PARTY={**VALID["PARTY"], "Government Whip": "Robot", "Judge": "AI"})
+    del config["PARTY"]["Opposition Whip"]
+    problems = " | ".join(validate_config(config))
+    for expected in ("TEAM_AI_PROVIDER", "INDIVIDUAL_AI_MODEL", "PLAYBACK", "Opposition Whip", "Judge", "Robot"):
+        assert expected in problems
+
+
+def test_file_is_parsed_again_only_when_it_changes(tmp_path):
+    path = tmp_path / "config.json"
+    write(path, VALID, mtime=1_000_000)
+    config = Config(path, environ={})
+    first = config.data
+    assert config.data is first
+
+    write(path, dict(VALID, TEAM_AI_MODEL="new-model"), mtime=1_000_010)
+    assert config.team_model == "new-model"
+
+
+def test_a_broken_edit_keeps_the_previous_config(tmp_path):
+    path = tmp_path / "config.json"
+    write(path, VALID, mtime=1_000_000)
+    config = Config(path, environ={})
+    assert config.team_model == "team-model"
+
+    write(path, dict(VALID, PARTY={}), mtime=1_000_010)
+    assert config.team_model == "team-model"
+    path.write_text("{ not json", encoding="utf-8")
+    os.utime(path, (1_000_020, 1_000_020))
+    assert config.team_model == "team-model"
+
+
+def test_an_invalid_file_fails_on_first_load(tmp_path):
+    path = tmp_path / "config.json"
+    write(path, dict(VALID, INTERACTION_PROVIDER="nobody"))
+    with pytest.raises(ConfigError, match="INTERACTION_PROVIDER"):
+        Config(path, environ={}).data
+
+
+def test_overrides_from_environment_and_command_line(tmp_path):
+    path = tmp_path / "config.json"
+    write(path, VALID)
+    environ = {"DEBATE__PLAYBACK__rate": "1.5", "DEBATE__TEAM_AI_MODEL": "env-model", "DEBATE__STT__streaming": "false"}
+    config = Config(path, environ=environ)
+    assert config.section("PLAYBACK")["rate"] == 1.5
+    assert config.section("STT") == {"streaming": False}
+    assert config.team_model == "env-model"
+
+    config.set_overrides(["TEAM_AI_MODEL=cli-model", "PARTY.Prime Minister=Human"])
+    assert config.team_model == "cli-model"
+    assert config.human_roles == ["Prime Minister"]
+
+
+def test_callers_cannot_change_the_cached_config(tmp_path):
+    path = tmp_path / "config.json"
+    write(path, dict(VALID, PLAYBACK={"rate": 1.0}))
+    config = Config(path, environ={})
+    with pytest.raises(TypeError):
+        config.playback["rate"] = 2.0
+    config.get("PARTY")["Prime Minister"] = "Human"
+    config.party["Leader of Opposition"] = "Human"
+    assert config.playback == {"rate": 1.0}
+    assert config.section("STT") == {} and config.stt == {}
+    assert config.human_roles == []
+
+
+def test_override_needs_a_value():
+    with pytest.raises(ConfigError):
+        Config(environ={}).set_overrides(["PLAYBACK.rate"])
+
+
+def test_provider_list_matches_the_client_pool():
+    from config_utils import PROVIDERS
+    from utilities.client_pool import PROVIDERS as POOLED
+
+    assert set(PROVIDERS) == set(POOLED)
@@ -0,0 +1,61 @@
+import asyncio
+import sys
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from debater.context_builder import ContextBuilder, estimate_tokens
+
+
+def long_speech(label, words=800):
+    return " ".join(f"{label}{i}" for i in range(words))
+
+
+def make_builder(**kwargs):
+    responder = MagicMock()
+    responder.arespond_to = AsyncMock(side_effect=lambda prompt: "short summary")
+    return ContextBuilder(responder=responder, **kwargs), responder
+
+
+def test_small_logs_are_kept_verbatim():
+    builder, _ = make_builder(token_budget=10_000)
+    log = ["first speech", "second speech"]
+    assert builder.build(log) == "first speech\nsecond speech"
+
+
+def test_disabled_budget_keeps_everything():
+    builder, _ = make_builder(token_budget=0)
+    log = [long_speech("a"), long_speech("b"), long_speech("c")]
+    assert builder.build(log) == "\n".join(log)
+
+
+def test_earlier_speeches_are_summarized_in_the_background():
+    async def run():
+        builder, responder = make_builder(token_budget=1500, verbatim_recent=1)
+        log = []
+        for label in "abc":
+            log.append(long_speech(label))
+            builder.speech_added(len(log) - 1, log[-1])
+        await asyncio.sleep(0)
+        text = builder.build(log)
+        await builder.aclose()
+        return text, log, responder
+
+    text, log, responder = asyncio.run(run())
+    assert responder.arespond_to.await_count == 3
+    assert "[Summary of the Prime Minister's speech]\nshort summary" in text
+    assert "[Summary of the Leader of Opposition's speech]\nshort summary" in text
+    # the latest speech stays word for word
+    assert long_speech("c") in text
+    assert estimate_tokens(text) < estimate_tokens("\n".join(log))
+
+
+def test_missing_summaries_fall_back_to_the_opening_and_respect_the_budget():
+    builder, _ = make_builder(token_budget=1100, verbatim_recent=1, summary_words=50)
+    log = [long_speech("a"), long_speech("b"), long_speech("c")]
+    text = builder.build(log)
+    assert "[Opening of the Leader of Opposition's speech]" in text
+    # the oldest condensed speech is dropped to stay within budget
+    assert "[Opening of the Prime Minister's speech]" not in text
+    assert long_speech("c") in text
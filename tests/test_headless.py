@@ -0,0 +1,114 @@
+import asyncio
+import subprocess
+import sys
+import textwrap
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import main
+
+# runs in a fresh interpreter, so modules imported by other tests do not count
+HEADLESS_RUN = textwrap.dedent("""
+    import asyncio
+    import sys
+    from unittest.mock import AsyncMock, MagicMock, patch
+
+    import main
+
+    brainstormer = MagicMock()
+    brainstormer.abrain_storm = AsyncMock(side_effect=lambda motion, team: f"clue for {team}")
+    debater = MagicMock()
+    debater.adeliver_speech = AsyncMock(return_value="A speech.")
+    party = {role: "AI" for role in ["Prime Minister", "Leader of Opposition", "Deputy Prime Minister",
+             "Deputy Leader of Opposition", "Member of Government", "Member of Opposition",
+             "Government Whip", "Opposition Whip"]}
+
+    with patch("main.BrainStormer", return_value=brainstormer), \\
+         patch("main.Debater", return_value=debater), \\
+         patch("main.get_settings", return_value=MagicMock(party=party)), \\
+         patch("speaker.speaker.warm_up", AsyncMock()), \\
+         patch("main.debate_history_saver") as saver:
+        asyncio.run(main.main("This house would test", mode="headless"))
+
+    motion, speech_log, speaker_info = saver.call_args[0]
+    assert speech_log == ["A speech."] * 8, speech_log
+    assert [info["speaker"] for info in speaker_info] == ["AI"] * 8
+    loaded = [name for name in ("sounddevice", "soundfile", "numpy") if name in sys.modules]
+    assert not loaded, loaded
+""")
+
+
+def test_headless_debate_never_imports_audio_stack():
+    result = subprocess.run([sys.executable, "-c", HEADLESS_RUN], cwd=ROOT, capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+
+
+IMPORT_ONLY = textwrap.dedent("""
+    import logging
+    import sys
+
+    import main
+
+    loaded = [name for name in ("sounddevice", "soundfile", "numpy", "openai", "httpx") if name in sys.modules]
+    assert not loaded, loaded
+    assert not logging.getLogger().handlers, logging.getLogger().handlers
+""")
+
+
+def test_importing_main_has_no_side_effects():
+    logs_before = set((ROOT / "logs").glob("*.log"))
+    result = subprocess.run([sys.executable, "-c", IMPORT_ONLY], cwd=ROOT, capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+    assert set((ROOT / "logs").glob("*.log")) == logs_before
+
+
+PARTY = {role: "AI" for role in ["Prime Minister", "Leader of Opposition", "Deputy Prime Minister", "Deputy Leader of Opposition",
+                                 "Member of Government", "Member of Opposition", "Government Whip", "Opposition Whip"]}
+
+
+def run_headless(events, debater, context):
+    async def brainstorm(motion, team):
+        await asyncio.sleep(0.05 if team == "Opening Government" else 0)
+        events.append(f"clue {team}")
+        return "clue"
+
+    brainstormer = MagicMock()
+    brainstormer.abrain_storm = AsyncMock(side_effect=brainstorm)
+    speaker = MagicMock()
+    speaker.prerender = AsyncMock(return_value=0)
+    speaker.announce_motion = AsyncMock(side_effect=lambda **_: events.append("announce motion"))
+    speaker.start_debate = AsyncMock(side_effect=lambda **_: events.append("start debate"))
+    speaker.announce_next_speaker = AsyncMock()
+    speaker.announce_end = AsyncMock()
+    with patch("main.BrainStormer", return_value=brainstormer), \
+         patch("main.Speaker", return_value=speaker), \
+         patch("main.Debater", return_value=debater), \
+         patch("main.ContextBuilder.from_config", return_value=context), \
+         patch("main.get_settings", return_value=MagicMock(party=PARTY)), \
+         patch("main.debate_history_saver"):
+        asyncio.run(main.main("This house would test", mode="headless"))
+
+
+def test_debate_starts_once_opening_government_has_prepared():
+    events = []
+    debater = MagicMock()
+    debater.adeliver_speech = AsyncMock(return_value="A speech.")
+    context = MagicMock()
+    context.aclose = AsyncMock()
+    run_headless(events, debater, context)
+    assert events.index("start debate") > events.index("clue Opening Government")
+
+
+def test_context_is_closed_when_a_step_fails():
+    debater = MagicMock()
+    debater.adeliver_speech = AsyncMock(side_effect=RuntimeError("provider down"))
+    context = MagicMock()
+    context.aclose = AsyncMock()
+    with pytest.raises(RuntimeError):
+        run_headless([], debater, context)
+    context.aclose.assert_awaited_once()
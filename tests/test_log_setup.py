@@ -0,0 +1,109 @@
+import asyncio
+import json
+import logging
+import os
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from utilities.log_setup import LIBRARY_LOGGERS, configure_logging, log_artifact, log_context, prune_logs, shutdown_logging
+
+logger = logging.getLogger("test_log_setup")
+
+
+@pytest.fixture
+def logs(tmp_path):
+    root = logging.getLogger()
+    saved = (root.level, root.handlers[:], {name: logging.getLogger(name).level for name in LIBRARY_LOGGERS})
+    yield tmp_path
+    shutdown_logging()
+    root.setLevel(saved[0])
+    root.handlers[:] = saved[1]
+    for name, level in saved[2].items():
+        logging.getLogger(name).setLevel(level)
+
+
+def read_jsonl(path: Path) -> list[dict]:
+    return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+
+
+def test_lines_are_json_with_context_fields(logs):
+    log_file = configure_logging(logs, "run", console_level="CRITICAL", retention_days=None, max_total_mb=None)
+
+    async def step():
+        with log_context(stage="speech", role="Prime Minister"):
+            logger.info("in the task")
+            await asyncio.to_thread(logger.info, "in a thread")
+    asyncio.run(step())
+    logger.info("outside")
+    try:
+        raise RuntimeError("boom")
+    except RuntimeError:
+        logger.error("failed", exc_info=True)
+    shutdown_logging()
+
+    entries = {entry["message"]: entry for entry in read_jsonl(log_file) if entry["logger"] == "test_log_setup"}
+    assert entries["in the task"]["stage"] == "speech" and entries["in the task"]["role"] == "Prime Minister"
+    assert entries["in a thread"]["role"] == "Prime Minister"
+    assert "role" not in entries["outside"]
+    assert entries["failed"]["level"] == "ERROR"
+    assert "RuntimeError: boom" in entries["failed"]["exception"]
+
+
+def test_artifacts_are_kept_out_of_the_log(logs):
+    log_file = configure_logging(logs, "run", console_level="CRITICAL", retention_days=None, max_total_mb=None)
+    speech = "Madam Speaker, " * 500
+    with log_context(role="Opposition Whip"):
+        artifact_id = log_artifact(logger, "Opposition Whip speech", "speech", speech)
+    shutdown_logging()
+
+    line = next(entry for entry in read_jsonl(log_file) if entry["message"] == "Opposition Whip speech")
+    assert line["artifact"] == artifact_id
+    assert "Madam Speaker" not in log_file.read_text(encoding="utf-8")
+    (artifact,) = read_jsonl(logs / "artifacts" / log_file.name)
+    assert artifact["id"] == artifact_id and artifact["kind"] == "speech"
+    assert artifact["role"] == "Opposition Whip" and artifact["text"] == speech
+
+
+def test_artifacts_are_kept_below_the_log_level(logs):
+    log_file = configure_logging(logs, "run", level="WARNING", console_level="CRITICAL", retention_days=None, max_total_mb=None)
+    with log_context(role="Prime Minister"):
+        artifact_id = log_artifact(logger, "Prime Minister speech", "speech", "Madam Speaker")
+    shutdown_logging()
+
+    assert not log_file.exists()
+    (artifact,) = read_jsonl(logs / "artifacts" / log_file.name)
+    assert artifact["id"] == artifact_id and artifact["role"] == "Prime Minister" and artifact["text"] == "Madam Speaker"
+
+
+def test_level_and_library_level(logs):
+    log_file = configure_logging(logs, "run", level="INFO", console_level="CRITICAL", retention_days=None, max_total_mb=None)
+    logger.debug("hidden")
+    logger.info("shown")
+    logging.getLogger("httpcore.http11").debug("socket noise")
+    shutdown_logging()
+
+    messages = [entry["message"] for entry in read_jsonl(log_file)]
+    assert messages == ["shown"]
+
+
+def test_prune_logs_by_age_then_size(tmp_path):
+    now = time.time()
+    files = {}
+    for name, age_days, size in [("old.log", 30, 10), ("main_a.jsonl", 3, 400), ("main_a.jsonl.1", 2, 400),
+                                 ("artifacts/main_b.jsonl", 1, 400), ("keep.txt", 30, 10)]:
+        path = tmp_path / name
+        path.parent.mkdir(exist_ok=True)
+        path.write_bytes(b"x" * size)
+        os.utime(path, (now - age_days * 86400, now - age_days * 86400))
+        files[name] = path
+
+    # old.log is too old, then the oldest go until at most 500 bytes of logs are left
+    deleted = prune_logs(tmp_path, retention_days=14, max_total_mb=500 / 1024 / 1024)
+
+    assert deleted == 3
+    assert [name for name, path in files.items() if path.exists()] == ["artifacts/main_b.jsonl", "keep.txt"]
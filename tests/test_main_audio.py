@@ -4,22 +4,19 @@ import tempfile
 import numpy as np
 from unittest.mock import patch, MagicMock, call
 
-# Import the function to test from main.py
-# Assuming main.py is in the parent directory relative to the tests directory
+# Import the function to test from utilities/recording.py
 import sys
 from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 
-# Now we can import the function, but we need to be careful as main.py also runs code at the top level
-# Let's try importing it directly. If main.py has side effects on import, this might need adjustment.
-# It's generally better practice to have functions like this in a separate utils module.
 try:
-    from main import record_and_save_audio, logger as main_logger
+    from utilities.recording import record_audio, record_and_save_audio, logger as main_logger
 except ImportError as e:
-    print(f"Error importing from main: {e}")
+    print(f"Error importing from utilities.recording: {e}")
     # Define a placeholder if import fails, so tests can be collected (but will fail)
     def record_and_save_audio(*args, **kwargs): raise RuntimeError("Import failed")
+    def record_audio(*args, **kwargs): raise RuntimeError("Import failed")
     main_logger = MagicMock()
 
 # Mock sounddevice globally for all tests in this module, as it's a hardware dependency
@@ -33,14 +30,14 @@ def mock_sounddevice():
     # Mock PortAudioError class for exception testing
     mock_sd.PortAudioError = sd.PortAudioError if 'sd' in globals() else Exception # Use real if available
 
-    with patch('main.sd', mock_sd):
+    with patch('utilities.recording.sd', mock_sd):
         yield mock_sd
 
 # Mock soundfile globally
 @pytest.fixture(autouse=True)
 def mock_soundfile():
     mock_sf = MagicMock()
-    with patch('main.sf', mock_sf):
+    with patch('utilities.recording.sf', mock_sf):
         yield mock_sf
 
 # Mock tempfile globally
@@ -65,7 +62,7 @@ def mock_tempfile():
             pass # Do nothing on exit in the mock
 
     # Patch tempfile.NamedTemporaryFile to return our mock class instance
-    with patch('main.tempfile.NamedTemporaryFile', MockNamedTemporaryFile):
+    with patch('utilities.recording.tempfile.NamedTemporaryFile', MockNamedTemporaryFile):
         yield # Let the test run
 
     # Cleanup any files created during the test
@@ -76,18 +73,26 @@ def mock_tempfile():
             except OSError:
                 pass # Ignore errors during test cleanup
 
-# Mock builtins.input globally
+# Mock the stdin reader globally, every prompt is answered with Enter
 @pytest.fixture(autouse=True)
 def mock_input():
-    with patch('builtins.input', return_value="") as mock_input_func:
+    with patch('utilities.recording.read_line', return_value="") as mock_input_func:
         yield mock_input_func
 
-# Mock the logger used in main to check log messages
+# Mock the logger used in utilities.recording to check log messages
 @pytest.fixture
 def mock_logger():
-    with patch('main.logger', MagicMock()) as logger_mock:
+    with patch('utilities.recording.logger', MagicMock()) as logger_mock:
         yield logger_mock
 
+def play_blocks(mock_sd, blocks):
+    """Make the mocked InputStream run each block through the callback the way sounddevice would."""
+    def start_stream(*args, **kwargs):
+        for block in blocks:
+            kwargs["callback"](block, len(block), None, None)
+        return MagicMock()
+    mock_sd.InputStream.side_effect = start_stream
+
 # --- Test Cases ---
 
 def test_record_and_save_audio_success(mock_sounddevice, mock_soundfile, mock_tempfile, mock_input, mock_logger):
@@ -96,13 +101,9 @@ def test_record_and_save_audio_success(mock_sounddevice, mock_soundfile, mock_te
     samplerate = 16000
     fake_audio_data = np.random.rand(samplerate * 2, 1).astype(np.float32) # 2 seconds
 
-    # Simulate the callback putting data into the queue by patching queue.Queue
-    mock_queue_instance = MagicMock()
-    mock_queue_instance.empty.side_effect = [False, True] # Simulate one item then empty
-    mock_queue_instance.get.return_value = fake_audio_data
-    with patch('main.queue.Queue', return_value=mock_queue_instance):
-        # Call the function
-        result_path = record_and_save_audio(role, samplerate=samplerate)
+    # Simulate the callback receiving the audio
+    play_blocks(mock_sounddevice, [fake_audio_data])
+    result_path = record_and_save_audio(role, samplerate=samplerate)
 
     # Assertions
     assert result_path is not None
@@ -117,11 +118,9 @@ def test_record_and_save_audio_success(mock_sounddevice, mock_soundfile, mock_te
     np.testing.assert_array_equal(args[1], fake_audio_data)
     assert args[2] == samplerate
 
-    # Check input calls
-    mock_input.assert_has_calls([
-        call(f"Press Enter to start recording for {role}... "),
-        call("Press Enter again to stop recording... ")
-    ])
+    # Check input calls: the start prompt, then the Enter that stops the recording
+    assert mock_input.call_args_list[0] == call(f"Press Enter to start recording for {role}... ")
+    assert len(mock_input.call_args_list) == 2
 
     # Check logger info messages
     assert any(f"Starting recording for {role}..." in str(call_args) for call_args in mock_logger.info.call_args_list)
@@ -134,11 +133,8 @@ def test_record_and_save_audio_success(mock_sounddevice, mock_soundfile, mock_te
 
 def test_record_and_save_audio_no_data(mock_sounddevice, mock_logger):
     """Test the case where no audio data is captured."""
-    # Simulate the queue being empty
-    mock_queue_instance = MagicMock()
-    mock_queue_instance.empty.return_value = True
-    with patch('main.queue.Queue', return_value=mock_queue_instance):
-        result_path = record_and_save_audio("TestRole")
+    # The callback never receives a block
+    result_path = record_and_save_audio("TestRole")
 
     assert result_path is None
     mock_logger.warning.assert_called_with("No audio data recorded.")
@@ -167,14 +163,10 @@ def test_record_and_save_audio_write_error(mock_sounddevice, mock_soundfile, moc
     samplerate = 16000
     fake_audio_data = np.random.rand(samplerate * 1, 1).astype(np.float32) # 1 second
 
-    # Simulate data being put in queue
-    mock_queue_instance = MagicMock()
-    mock_queue_instance.empty.side_effect = [False, True]
-    mock_queue_instance.get.return_value = fake_audio_data
+    play_blocks(mock_sounddevice, [fake_audio_data])
     # Mock os.path.exists and os.remove specifically for this test's cleanup phase
-    with patch('main.queue.Queue', return_value=mock_queue_instance), \
-         patch('main.os.path.exists', return_value=True) as mock_exists, \
-         patch('main.os.remove') as mock_remove:
+    with patch('utilities.recording.os.path.exists', return_value=True) as mock_exists, \
+         patch('utilities.recording.os.remove') as mock_remove:
         # Mock soundfile.write to raise an error
         mock_soundfile.write.side_effect = IOError("Disk full")
 
@@ -208,3 +200,53 @@ def test_record_and_save_audio_write_error(mock_sounddevice, mock_soundfile, moc
     # The fixture cleans it up AFTER the test, so we check our mock's list
     # Check the specific debug message for cleanup
     mock_logger.debug.assert_any_call(f"Cleaned up failed temporary file: {remove_path}")
+
+def test_record_audio_keeps_the_recording_in_memory(mock_sounddevice, mock_soundfile, mock_logger):
+    """Test that record_audio returns the samples without writing any file."""
+    samplerate = 16000
+    fake_audio_data = np.random.rand(samplerate, 1).astype(np.float32) # 1 second
+
+    play_blocks(mock_sounddevice, [fake_audio_data, fake_audio_data]) # two blocks
+    with patch('utilities.recording.tempfile.NamedTemporaryFile') as mock_named_temp:
+        audio = record_audio("TestRole", samplerate=samplerate)
+
+    assert audio.shape == (samplerate * 2, 1)
+    mock_soundfile.write.assert_not_called()
+    mock_named_temp.assert_not_called()
+
+def test_record_audio_hands_blocks_to_on_block(mock_sounddevice, mock_logger):
+    """Test that every recorded block reaches the on_block callback as it arrives."""
+    received = []
+    block = np.ones((512, 1), dtype=np.float32)
+
+    play_blocks(mock_sounddevice, [block])
+    audio = record_audio("TestRole", on_block=received.append)
+
+    assert len(received) == 1
+    np.testing.assert_array_equal(received[0], block)
+    np.testing.assert_array_equal(audio, block)
+
+def test_record_audio_stops_at_the_time_limit(mock_sounddevice, mock_logger):
+    """Test that audio past max_seconds is counted and dropped instead of stored."""
+    samplerate = 1000
+    block = np.ones((600, 1), dtype=np.float32)
+    received = []
+
+    play_blocks(mock_sounddevice, [block, block, block]) # 1.8 seconds
+    audio = record_audio("TestRole", samplerate=samplerate, on_block=received.append, max_seconds=1)
+
+    assert audio.shape == (samplerate, 1)
+    assert sum(len(part) for part in received) == samplerate
+    assert any("0.8s of audio after the 1s limit" in str(call_args) for call_args in mock_logger.warning.call_args_list)
+
+def test_blocks_reach_on_block_off_the_audio_thread(mock_sounddevice, mock_logger):
+    """Test that the audio callback only stores blocks and on_block runs on the follower thread."""
+    import threading
+    threads = []
+    block = np.ones((512, 1), dtype=np.float32)
+
+    play_blocks(mock_sounddevice, [block, block])
+    audio = record_audio("TestRole", on_block=lambda part: threads.append(threading.current_thread().name))
+
+    assert len(audio) == 1024
+    assert threads and set(threads) == {"capture-follower"}
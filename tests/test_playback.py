@@ -0,0 +1,187 @@
+import asyncio
+import queue
+import sys
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from utilities import console
+from utilities.playback import PlaybackEngine, SkipListener
+
+
+class FakeEngine(PlaybackEngine):
+    """An engine without a sound device, blocks are pulled by calling pull()."""
+
+    def __init__(self):
+        super().__init__()
+        self.opened = 0
+
+    def _open(self):
+        self.opened += 1
+
+    def pull(self, frames):
+        out = np.full((frames, 1), np.nan, dtype=np.float32)
+        self._callback(out, frames, None, None)
+        return out[:, 0]
+
+
+def test_clips_play_back_to_back_without_a_gap():
+    async def run():
+        engine = FakeEngine()
+        await engine.play(np.full(3, 0.1, dtype=np.float32), wait=False)
+        await engine.play(np.full(4, 0.2, dtype=np.float32), wait=False)
+        return engine.pull(9)
+
+    out = asyncio.run(run())
+    np.testing.assert_allclose(out, [0.1] * 3 + [0.2] * 4 + [0.0] * 2)
+
+
+def test_a_clip_still_arriving_keeps_its_place():
+    async def run():
+        engine = FakeEngine()
+        speech = engine.clip("speech")
+        announcement = await engine.play(np.full(2, 0.5, dtype=np.float32), wait=False)
+        speech.put(np.full(2, 0.1, dtype=np.float32))
+        first = engine.pull(4)
+        # the rest of the speech arrives late, the announcement waits behind it
+        speech.put(np.full(2, 0.2, dtype=np.float32))
+        speech.end()
+        second = engine.pull(4)
+        return first, second, announcement
+
+    first, second, announcement = asyncio.run(run())
+    np.testing.assert_allclose(first, [0.1, 0.1, 0.0, 0.0])
+    np.testing.assert_allclose(second, [0.2, 0.2, 0.5, 0.5])
+    assert announcement.frames_played == 2
+
+
+def test_waiting_returns_once_the_clip_was_played():
+    async def run():
+        engine = FakeEngine()
+        clip = await engine.play(np.ones(5, dtype=np.float32), wait=False)
+        waiter = asyncio.create_task(clip.wait())
+        await asyncio.sleep(0.01)
+        assert not waiter.done()
+        engine.pull(5)
+        # the clip is finished when the callback moves past its last buffer
+        engine.pull(5)
+        await asyncio.wait_for(engine.drain(), timeout=1)
+        await asyncio.wait_for(waiter, timeout=1)
+        return engine
+
+    engine = asyncio.run(run())
+    assert not engine.clips
+
+
+def test_skipping_drops_the_rest_and_moves_on():
+    async def run():
+        engine = FakeEngine()
+        speech = engine.clip("speech", skippable=True)
+        speech.put(np.full(4, 0.1, dtype=np.float32))
+        speech.put(np.full(4, 0.1, dtype=np.float32))
+        cancelled = []
+        speech.on_cancel(lambda: cancelled.append(True))
+        await engine.play(np.full(2, 0.5, dtype=np.float32), wait=False)
+        first = engine.pull(2)
+        assert engine.skip()
+        second = engine.pull(4)
+        await asyncio.wait_for(speech.wait(), timeout=1)
+        await asyncio.sleep(0)
+        return first, second, speech, cancelled
+
+    first, second, speech, cancelled = asyncio.run(run())
+    np.testing.assert_allclose(first, [0.1, 0.1])
+    np.testing.assert_allclose(second, [0.5, 0.5, 0.0, 0.0])
+    assert speech.frames_skipped == 6
+    assert speech.seconds_saved == 6 / 24000
+    assert cancelled == [True]
+
+
+def test_announcements_cannot_be_skipped():
+    async def run():
+        engine = FakeEngine()
+        await engine.play(np.ones(4, dtype=np.float32), wait=False)
+        return engine.skip(), engine.pull(4)
+
+    skipped, out = asyncio.run(run())
+    assert not skipped
+    np.testing.assert_allclose(out, [1.0] * 4)
+
+
+def test_enter_goes_to_one_reader_and_the_listener_stops_promptly(monkeypatch):
+    # stands in for the stdin reader thread
+    monkeypatch.setattr(console, "_lines", queue.Queue())
+    monkeypatch.setattr(console, "_reader", object())
+
+    async def run():
+        engine = FakeEngine()
+        speech = engine.clip("speech", skippable=True)
+        listener = SkipListener(engine, poll_seconds=0.01)
+        listener._thread.start()
+        console._lines.put("")
+        for _ in range(100):
+            if speech.cancelled:
+                break
+            await asyncio.sleep(0.01)
+        listener.stop()
+        return speech, listener
+
+    speech, listener = asyncio.run(run())
+    assert speech.cancelled
+    assert not listener._thread.is_alive()
+    # the Enter was taken by the listener only
+    assert console.read_line(timeout=0.01) is None
+
+
+class FakeResponse:
+    def __init__(self, closed):
+        self.closed = closed
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        self.closed.append(True)
+
+    async def iter_bytes(self):
+        # 0.1s of audio per read, forever, like a long speech still being synthesized
+        while True:
+            await asyncio.sleep(0.01)
+            yield np.zeros(2400, dtype=np.int16).tobytes()
+
+
+def test_skipping_a_speech_closes_its_tts_stream():
+    from utilities import interaction as interaction_module
+
+    closed = []
+    client = MagicMock()
+    client.audio.speech.with_streaming_response.create.side_effect = lambda **kwargs: FakeResponse(closed)
+    engine = FakeEngine()
+
+    async def run():
+        chunks = asyncio.Queue()
+        chunks.put_nowait("A" * 150)
+        interaction = interaction_module.Interaction(service="openai")
+        speaking = asyncio.create_task(interaction.tts_stream(tone="", chunks=chunks, wait=False))
+        await asyncio.sleep(0.05)
+        assert interaction.skip()
+        # generation goes on after the skip, none of it is synthesized
+        chunks.put_nowait("B" * 150)
+        chunks.put_nowait(None)
+        await asyncio.wait_for(speaking, timeout=1)
+        engine.pull(100)
+        return interaction
+
+    with patch.object(interaction_module, "get_async_client", return_value=client), \
+         patch("utilities.playback.get_playback_engine", return_value=engine):
+        interaction = asyncio.run(run())
+
+    assert closed == [True]
+    assert client.audio.speech.with_streaming_response.create.call_count == 1
+    skipped, saved = interaction.skipped()
+    assert skipped == 1
+    # 300 characters at the default rate, some of the first chunk was already downloaded
+    assert 0 < saved <= 300 / interaction_module.TTS_CHARS_PER_SECOND
@@ -0,0 +1,104 @@
+import asyncio
+import sys
+import time
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from debater.prep_library import PrepLibrary, normalize_motion
+from debater.team_brainstorm import BrainStormer
+
+MODEL = "test-model"
+
+
+def test_motions_are_folded():
+    expected = "this house would legalize marijuana"
+    assert normalize_motion("This house would legalize marijuana.") == expected
+    assert normalize_motion("THW legalize marijuana") == expected
+    assert normalize_motion("  this House would   legalize marijuana! ") == expected
+    assert normalize_motion("THBT art should be free") == "this house believes that art should be free"
+    # only a leading abbreviation is expanded
+    assert normalize_motion("THW ban the TH word") == "this house would ban the th word"
+
+
+def test_entries_are_found_by_normalized_motion(tmp_path):
+    library = PrepLibrary(tmp_path)
+    library.store("THW legalize marijuana", "Opening Government", "OG clue", "openrouter", MODEL, "single")
+    library.store("This house would legalize marijuana.", "Opening Opposition", "OO clue", "openrouter", MODEL, "single")
+    entry = library.lookup("this house would legalize marijuana", "Opening Government")
+    assert entry["clue"] == "OG clue"
+    assert library.lookup("THW legalize marijuana", "Opening Opposition")["clue"] == "OO clue"
+    assert library.lookup("THW ban cars", "Opening Government") is None
+    assert library.is_fresh(entry, "openrouter", MODEL, "single")
+    assert not library.is_fresh(entry, "openrouter", "other-model", "single")
+    assert not library.is_fresh(entry, "openrouter", MODEL, "parallel")
+    entry["created"] = time.time() - 15 * 24 * 3600
+    assert not library.is_fresh(entry, "openrouter", MODEL, "single")
+
+
+def test_disabled_library_stores_nothing(tmp_path):
+    library = PrepLibrary(tmp_path / "prep", enabled=False)
+    library.store("THW test", "Opening Government", "clue", "openrouter", MODEL, "single")
+    assert library.lookup("THW test", "Opening Government") is None
+    assert not (tmp_path / "prep").exists()
+
+
+def make_brainstormer(library, delay=0.0):
+    settings = MagicMock(team_provider="openrouter", team_model=MODEL, brainstorm={})
+    config = patch("debater.team_brainstorm.get_settings", return_value=settings)
+    with config:
+        brainstormer = BrainStormer()
+    calls = []
+
+    async def brainstorm_now(motion, team):
+        calls.append(team)
+        await asyncio.sleep(delay)
+        return f"new {team} clue"
+
+    brainstormer.abrain_storm_now = brainstorm_now
+    return brainstormer, calls, config, patch("debater.team_brainstorm.get_prep_library", return_value=library)
+
+
+def test_fresh_entries_skip_the_brainstorm(tmp_path):
+    library = PrepLibrary(tmp_path)
+    brainstormer, calls, config, use_library = make_brainstormer(library)
+    with config, use_library:
+        first = asyncio.run(brainstormer.abrain_storm("THW test", "Opening Government"))
+        second = asyncio.run(brainstormer.abrain_storm("This house would test.", "Opening Government"))
+    assert first == second == "new Opening Government clue"
+    assert calls == ["Opening Government"]
+
+
+def test_stored_entry_stands_in_for_a_slow_provider(tmp_path):
+    library = PrepLibrary(tmp_path, max_age=0, fallback_after=0.05)
+    library.store("THW test", "Opening Government", "old clue", "openrouter", MODEL, "single")
+    time.sleep(0.01)
+    brainstormer, calls, config, use_library = make_brainstormer(library, delay=0.2)
+
+    async def debate():
+        clue = await brainstormer.abrain_storm("THW test", "Opening Government")
+        # the debate goes on while the slow brainstorm finishes in the background
+        await asyncio.gather(*brainstormer._refreshing)
+        return clue
+
+    with config, use_library:
+        clue = asyncio.run(debate())
+    assert clue == "old clue"
+    assert calls == ["Opening Government"]
+    assert library.lookup("THW test", "Opening Government")["clue"] == "new Opening Government clue"
+
+
+def test_stored_entry_stands_in_for_a_cancelled_brainstorm(tmp_path):
+    library = PrepLibrary(tmp_path, max_age=0, fallback_after=1)
+    library.store("THW test", "Opening Government", "old clue", "openrouter", MODEL, "single")
+    time.sleep(0.01)
+    brainstormer, calls, config, use_library = make_brainstormer(library)
+
+    async def cancelled(motion, team):
+        raise asyncio.CancelledError()
+
+    brainstormer.abrain_storm_now = cancelled
+    with config, use_library:
+        clue = asyncio.run(brainstormer.abrain_storm("THW test", "Opening Government"))
+    assert clue == "old clue"
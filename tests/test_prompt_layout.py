@@ -0,0 +1,54 @@
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from debater.debater import prompt_loader
+from utilities.text_generator import TokenUsage, as_messages
+
+MOTION = "This house would test"
+
+
+def test_static_parts_come_before_the_speech_log():
+    messages = prompt_loader(MOTION, "Deputy Prime Minister", ["PM speech", "LO speech"], "OG clue")
+    assert [message["role"] for message in messages] == ["system", "system", "user"]
+    assert "OG clue" in messages[0]["content"]
+    assert messages[-1]["content"].endswith("PM speech\nLO speech")
+
+
+def test_speakers_of_a_team_share_the_prefix():
+    pm = prompt_loader(MOTION, "Prime Minister", [], "OG clue")
+    dpm = prompt_loader(MOTION, "Deputy Prime Minister", ["PM speech", "LO speech"], "OG clue")
+    lo = prompt_loader(MOTION, "Leader of Opposition", ["PM speech"], "OO clue")
+    assert pm[0] == dpm[0]
+    assert lo[0] != pm[0]
+    assert MOTION in lo[0]["content"]
+
+
+def test_string_messages_are_sent_as_one_user_message():
+    assert as_messages("hello") == [{"role": "user", "content": "hello"}]
+
+
+def test_token_usage_counts_cached_prompt_tokens():
+    usage = TokenUsage()
+    usage.record(SimpleNamespace(prompt_tokens=2000, completion_tokens=900,
+                                 prompt_tokens_details=SimpleNamespace(cached_tokens=1536)))
+    # providers that do not report details
+    usage.record(SimpleNamespace(prompt_tokens=1000, completion_tokens=100, prompt_tokens_details=None))
+    usage.record(None)
+    assert usage.summary() == {
+        "requests": 2,
+        "prompt_tokens": 3000,
+        "cached_tokens": 1536,
+        "cached_ratio": 0.512,
+        "completion_tokens": 1000,
+    }
+
+
+def test_motion_is_stated_once_and_history_only_in_the_last_message():
+    history = "[Summary of the Prime Minister's speech]\nPM points\n\n[The Leader of Opposition's speech]\nLO speech"
+    messages = prompt_loader(MOTION, "Deputy Prime Minister", history, "OG clue")
+    assert sum(message["content"].count(MOTION) for message in messages) == 1
+    assert all("PM points" not in message["content"] for message in messages[:-1])
+    assert history in messages[-1]["content"]
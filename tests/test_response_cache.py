@@ -0,0 +1,108 @@
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from utilities.response_cache import ResponseCache
+
+
+def test_miss_then_hit(tmp_path):
+    cache = ResponseCache(tmp_path)
+    assert cache.get("openrouter", "model", "prompt") is None
+    cache.put("openrouter", "model", "prompt", "speech")
+    assert cache.get("openrouter", "model", "prompt") == "speech"
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+    assert cache.stats()["writes"] == 1
+    # no temp files are left behind by the atomic write
+    assert [p.suffix for p in tmp_path.iterdir()] == [".json"]
+
+
+def test_key_covers_provider_model_and_prompt(tmp_path):
+    cache = ResponseCache(tmp_path)
+    cache.put("openrouter", "model", "prompt", "speech")
+    assert cache.get("openai", "model", "prompt") is None
+    assert cache.get("openrouter", "other", "prompt") is None
+    assert cache.get("openrouter", "model", "other prompt") is None
+
+
+def test_read_only_and_bypass_modes(tmp_path):
+    ResponseCache(tmp_path).put("openai", "model", "prompt", "speech")
+
+    read_only = ResponseCache(tmp_path, mode="read-only")
+    assert read_only.get("openai", "model", "prompt") == "speech"
+    read_only.put("openai", "model", "new prompt", "new speech")
+    assert read_only.get("openai", "model", "new prompt") is None
+
+    bypass = ResponseCache(tmp_path, mode="bypass")
+    assert bypass.get("openai", "model", "prompt") is None
+    assert bypass.stats()["misses"] == 0
+
+    with pytest.raises(ValueError):
+        ResponseCache(tmp_path, mode="sometimes")
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = ResponseCache(tmp_path, max_bytes=10 ** 6)
+    for name in ("a", "b", "c"):
+        cache.put("openai", "model", name, "x" * 100)
+    # make "a" the oldest entry, then touch it so "b" becomes the least recently used
+    for age, name in ((300, "a"), (200, "b"), (100, "c")):
+        path = cache._path(cache.key("openai", "model", name))
+        os.utime(path, (time.time() - age, time.time() - age))
+    assert cache.get("openai", "model", "a") is not None
+
+    # the entries can differ by a byte (the "created" timestamp), so size the budget on the two to keep
+    cache.max_bytes = sum(cache._path(cache.key("openai", "model", name)).stat().st_size for name in ("a", "c"))
+    assert cache.evict() == 1
+    assert cache.get("openai", "model", "b") is None
+    assert cache.get("openai", "model", "a") is not None
+    assert cache.get("openai", "model", "c") is not None
+
+
+def test_stale_entries_are_misses_and_evicted(tmp_path):
+    cache = ResponseCache(tmp_path, max_age=60)
+    cache.put("openai", "model", "prompt", "speech")
+    path = cache._path(cache.key("openai", "model", "prompt"))
+    os.utime(path, (time.time() - 120, time.time() - 120))
+    assert cache.get("openai", "model", "prompt") is None
+    assert cache.evict() == 1
+    assert not path.exists()
+
+
+def test_read_only_entries_do_not_age_out(tmp_path):
+    ResponseCache(tmp_path, max_age=60).put("openai", "model", "prompt", "speech")
+    path = ResponseCache(tmp_path)._path(ResponseCache.key("openai", "model", "prompt"))
+    os.utime(path, (time.time() - 120, time.time() - 120))
+    cache = ResponseCache(tmp_path, mode="read-only", max_age=60)
+    assert cache.get("openai", "model", "prompt") == "speech"
+    assert cache.evict() == 0
+    assert path.exists()
+
+
+def test_put_only_scans_the_directory_when_over_budget(tmp_path):
+    cache = ResponseCache(tmp_path, max_bytes=10 ** 6)
+    cache.put("openai", "model", "first", "x" * 100)
+    with patch.object(ResponseCache, "evict", wraps=cache.evict) as evict:
+        for name in ("a", "b", "c"):
+            cache.put("openai", "model", name, "x" * 100)
+        evict.assert_not_called()
+        cache.max_bytes = 1
+        cache.put("openai", "model", "d", "x" * 100)
+        evict.assert_called_once()
+
+
+def test_async_get_and_put(tmp_path):
+    cache = ResponseCache(tmp_path)
+
+    async def round_trip():
+        await cache.aput("openai", "model", "prompt", "speech")
+        return await cache.aget("openai", "model", "prompt")
+
+    assert asyncio.run(round_trip()) == "speech"
@@ -0,0 +1,42 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from utilities.sentence_stream import SpeechChunker
+
+
+def feed_in_pieces(chunker, text, size=3):
+    chunks = []
+    for i in range(0, len(text), size):
+        chunks.extend(chunker.feed(text[i:i + size]))
+    return chunks
+
+
+def test_first_sentence_is_released_immediately():
+    chunker = SpeechChunker(chunk_chars=1000)
+    chunks = feed_in_pieces(chunker, "Right now we live in a world of harm. And it goes on ")
+    assert chunks == ["Right now we live in a world of harm."]
+
+
+def test_later_sentences_are_grouped():
+    chunker = SpeechChunker(chunk_chars=30)
+    chunks = feed_in_pieces(chunker, "First. Two. Three. Four five six seven eight. Nine ten. ")
+    assert chunks[0] == "First."
+    assert all(len(chunk) >= 30 for chunk in chunks[1:])
+
+
+def test_abbreviations_and_decimals_do_not_split():
+    chunker = SpeechChunker()
+    chunks = feed_in_pieces(chunker, "Thank you Mr. Speaker, 3.5 million people agree. ")
+    assert chunks == ["Thank you Mr. Speaker, 3.5 million people agree."]
+
+
+def test_flush_returns_unterminated_tail_and_nothing_is_lost():
+    text = "One sentence here. Another one! And a tail without a full stop"
+    chunker = SpeechChunker(chunk_chars=10)
+    chunks = feed_in_pieces(chunker, text)
+    tail = chunker.flush()
+    assert tail == "And a tail without a full stop"
+    assert " ".join(chunks + [tail]) == text
+    assert chunker.flush() is None
@@ -28,7 +28,7 @@ def mock_config():
         "Opposition Whip": "AI"
     }
     
-    with patch('main.get_config', side_effect=lambda key: mock_party_config if key == "PARTY" else MagicMock()):
+    with patch('main.get_settings', return_value=MagicMock(party=mock_party_config)):
         yield mock_party_config
 
 @pytest.fixture
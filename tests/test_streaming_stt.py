@@ -0,0 +1,129 @@
+import io
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import soundfile as sf
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from utilities.audio_processing import STT_SAMPLERATE, encode_speech, quietest_point, resample, split_at_silences, stitch_transcripts
+from utilities.streaming_stt import StreamingTranscriber, transcribe_in_chunks
+
+RATE = 8000
+WORD_SECONDS = 0.4
+GAP_SECONDS = 0.3
+
+
+def speech(words: int) -> np.ndarray:
+    """Each word is a flat tone whose level encodes its number, separated by silence."""
+    parts = []
+    for index in range(words):
+        parts.append(np.full(int(WORD_SECONDS * RATE), (index + 1) / 200, dtype=np.float32))
+        parts.append(np.zeros(int(GAP_SECONDS * RATE), dtype=np.float32))
+    return np.concatenate(parts)
+
+
+def fake_transcribe(audio: bytes, prompt: str) -> str:
+    """Hear every run of sound longer than 0.1s as the word its level encodes."""
+    samples, _ = sf.read(io.BytesIO(audio), dtype="float32")
+    frame = RATE // 100
+    levels = np.abs(samples[:len(samples) // frame * frame]).reshape(-1, frame).max(axis=1)
+    words, run = [], []
+    for level in list(levels) + [0.0]:
+        if level > 0.001:
+            run.append(level)
+        elif run:
+            if len(run) >= 10:
+                words.append(f"w{int(round(np.median(run) * 200)) - 1}")
+            run = []
+    return " ".join(words)
+
+
+def test_stitching_drops_words_heard_twice():
+    assert stitch_transcripts("we believe that today", "Today, we propose") == "we believe that today we propose"
+    assert stitch_transcripts("first part.", "second part.") == "first part. second part."
+    assert stitch_transcripts("", "only chunk") == "only chunk"
+    assert stitch_transcripts("only chunk", "") == "only chunk"
+
+
+def test_cuts_land_in_silence():
+    audio = speech(10)
+    cut = quietest_point(audio, RATE, int(1.0 * RATE), int(2.0 * RATE))
+    assert audio[cut] == 0
+
+
+def test_streamed_transcript_has_every_word_once():
+    audio = speech(60)
+    calls = []
+
+    def transcribe(chunk, prompt):
+        calls.append(prompt)
+        return fake_transcribe(chunk, prompt)
+
+    transcriber = StreamingTranscriber(transcribe, samplerate=RATE, min_chunk_seconds=4, max_chunk_seconds=6, overlap_seconds=0.5)
+    for start in range(0, len(audio), 800):
+        transcriber.feed(audio[start:start + 800].reshape(-1, 1))
+    transcript = transcriber.finish()
+    assert transcript == " ".join(f"w{index}" for index in range(60))
+    assert len(calls) > 5
+    # every chunk after the first gets the transcript so far as context
+    assert calls[0] == "" and all(calls[1:])
+
+
+def test_failed_chunks_are_counted():
+    def transcribe(chunk, prompt):
+        raise RuntimeError("provider down")
+
+    transcriber = StreamingTranscriber(transcribe, samplerate=RATE, min_chunk_seconds=1, max_chunk_seconds=2)
+    transcriber.feed(speech(5).reshape(-1, 1))
+    assert transcriber.finish() == ""
+    assert transcriber.failed_chunks == transcriber.chunks > 0
+
+
+def test_split_chunks_are_bounded_and_cover_the_recording():
+    audio = speech(40)
+    chunks = split_at_silences(audio, RATE, min_chunk_seconds=3, max_chunk_seconds=5, overlap_seconds=0.5)
+    assert len(chunks) > 3
+    assert all(len(chunk) <= 5.5 * RATE for chunk in chunks)
+    # the overlap is counted twice at every cut
+    assert sum(len(chunk) for chunk in chunks) >= len(audio)
+
+
+def test_chunked_transcription_runs_concurrently_and_keeps_the_order():
+    audio = speech(60)
+    active = []
+    peak = []
+
+    def transcribe(chunk, prompt):
+        active.append(1)
+        peak.append(len(active))
+        time.sleep(0.02)
+        text = fake_transcribe(chunk, prompt)
+        active.pop()
+        return text
+
+    transcript = transcribe_in_chunks(audio, RATE, transcribe, concurrency=3, min_chunk_seconds=4, max_chunk_seconds=6)
+    assert transcript == " ".join(f"w{index}" for index in range(60))
+    assert 1 < max(peak) <= 3
+
+
+def test_speech_is_uploaded_as_16khz_flac():
+    samplerate = 44100
+    tone = (0.5 * np.sin(2 * np.pi * 300 * np.arange(samplerate * 2) / samplerate)).astype(np.float32)
+    audio = encode_speech(tone.reshape(-1, 1), samplerate)
+    decoded, decoded_rate = sf.read(io.BytesIO(audio), dtype="float32")
+    assert audio[:4] == b"fLaC"
+    assert decoded_rate == STT_SAMPLERATE
+    assert abs(len(decoded) - 2 * STT_SAMPLERATE) <= 1
+    # far smaller than the float samples it came from
+    assert len(audio) < tone.nbytes / 5
+    # the tone survives resampling
+    spectrum = np.abs(np.fft.rfft(decoded[:STT_SAMPLERATE]))
+    assert spectrum.argmax() == 300
+
+
+def test_low_rate_audio_is_not_resampled():
+    samples = np.linspace(-1, 1, 800, dtype=np.float32)
+    assert resample(samples, 8000, STT_SAMPLERATE) is samples
@@ -0,0 +1,69 @@
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from utilities.task_graph import TaskGraph
+
+
+def step(order, name, delay=0.0, result=None):
+    async def run():
+        order.append(f"start {name}")
+        await asyncio.sleep(delay)
+        order.append(f"end {name}")
+        return result if result is not None else name
+    return run
+
+
+def test_steps_wait_only_for_their_own_dependencies():
+    order = []
+    graph = TaskGraph()
+    graph.add("clue OG", step(order, "clue OG", 0.01))
+    graph.add("clue CO", step(order, "clue CO", 0.1))
+    graph.add("PM", step(order, "PM"), after=["clue OG"])
+    results = asyncio.run(graph.run())
+    assert results["PM"] == "PM"
+    # the PM speaks long before the slow brainstorm is done
+    assert order.index("end PM") < order.index("end clue CO")
+
+
+def test_critical_path_follows_the_latest_dependency():
+    order = []
+    graph = TaskGraph()
+    graph.add("fast", step(order, "fast", 0.01))
+    graph.add("slow", step(order, "slow", 0.08))
+    graph.add("speech", step(order, "speech", 0.01), after=["fast", "slow"])
+    graph.add("side", step(order, "side"))
+    asyncio.run(graph.run())
+    assert graph.critical_path() == ["slow", "speech"]
+    report = graph.report()
+    assert report.startswith("Critical path")
+    assert "slow" in report and "fast" not in report
+
+
+def test_unknown_and_duplicate_steps_are_rejected():
+    graph = TaskGraph()
+    graph.add("a", step([], "a"))
+    with pytest.raises(ValueError):
+        graph.add("a", step([], "a"))
+    with pytest.raises(ValueError):
+        graph.add("b", step([], "b"), after=["missing"])
+
+
+def test_a_failing_step_cancels_the_rest():
+    order = []
+
+    async def fail():
+        raise RuntimeError("provider down")
+
+    graph = TaskGraph()
+    graph.add("broken", fail)
+    graph.add("slow", step(order, "slow", 1.0))
+    graph.add("after broken", step(order, "after broken"), after=["broken"])
+    with pytest.raises(RuntimeError):
+        asyncio.run(graph.run())
+    assert "end slow" not in order
+    assert "start after broken" not in order
@@ -0,0 +1,52 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from utilities.time_stretch import TimeStretcher
+
+SAMPLERATE = 24000
+
+
+def tone(seconds=2.0, frequency=220.0):
+    t = np.arange(int(seconds * SAMPLERATE)) / SAMPLERATE
+    return (0.5 * np.sin(2 * np.pi * frequency * t)).astype(np.float32).reshape(-1, 1)
+
+
+def stretch(samples, rate, block=None):
+    stretcher = TimeStretcher(rate, SAMPLERATE)
+    block = block or len(samples)
+    parts = [stretcher.process(samples[i:i + block]) for i in range(0, len(samples), block)]
+    return np.concatenate(parts + [stretcher.flush()])
+
+
+def dominant_frequency(samples):
+    samples = samples.reshape(-1)
+    spectrum = np.abs(np.fft.rfft(samples * np.hanning(len(samples))))
+    return np.argmax(spectrum) * SAMPLERATE / len(samples)
+
+
+@pytest.mark.parametrize("rate", [0.8, 1.5, 2.0])
+def test_length_follows_the_rate_and_pitch_stays(rate):
+    samples = tone()
+    out = stretch(samples, rate)
+    assert len(out) / len(samples) == pytest.approx(1 / rate, abs=0.02)
+    assert dominant_frequency(out) == pytest.approx(220, abs=2)
+
+
+def test_streaming_matches_one_pass():
+    samples = tone(1.0)
+    np.testing.assert_array_equal(stretch(samples, 1.5, block=1000), stretch(samples, 1.5))
+
+
+def test_rate_one_passes_audio_through():
+    samples = tone(0.5)
+    np.testing.assert_array_equal(stretch(samples, 1.0, block=777), samples)
+
+
+def test_rate_has_to_be_positive():
+    with pytest.raises(ValueError):
+        TimeStretcher(0)
@@ -0,0 +1,78 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from utilities.audio_processing import SilenceDetector, trim_silence, voice_activity
+from utilities.streaming_stt import StreamingTranscriber, transcribe_in_chunks
+
+RATE = 8000
+
+
+def silence(seconds):
+    return np.zeros(int(seconds * RATE), dtype=np.float32)
+
+
+def tone(seconds):
+    return (0.2 * np.sin(2 * np.pi * 200 * np.arange(int(seconds * RATE)) / RATE)).astype(np.float32)
+
+
+def test_voice_activity_marks_loud_frames():
+    voiced = voice_activity(np.concatenate([silence(1), tone(1)]), RATE)
+    assert not voiced[:30].any()
+    assert voiced[-30:].all()
+
+
+def test_edges_are_trimmed_and_long_pauses_shortened():
+    audio = np.concatenate([silence(2), tone(1), silence(5), tone(1), silence(0.5), tone(1), silence(3)])
+    trimmed, removed = trim_silence(audio, RATE, max_pause_seconds=1.0, padding_seconds=0.2)
+    assert removed + len(trimmed) / RATE == len(audio) / RATE
+    # three seconds of speech, one pause shortened to about a second, the short pause kept
+    assert 4.3 < len(trimmed) / RATE < 5.0
+    # no speech was lost
+    assert np.count_nonzero(trimmed) >= np.count_nonzero(audio) - RATE * 0.05
+
+
+def test_silent_audio_is_dropped_entirely():
+    trimmed, removed = trim_silence(silence(2), RATE)
+    assert len(trimmed) == 0
+    assert removed == 2
+
+
+def test_clips_shorter_than_the_padding_are_kept():
+    trimmed, removed = trim_silence(tone(0.2), RATE, padding_seconds=0.2)
+    assert len(trimmed) == len(tone(0.2))
+    assert removed == 0
+
+
+def test_silence_detector_waits_for_speech_first():
+    detector = SilenceDetector(RATE, silence_seconds=1.0)
+    # leading silence does not count
+    assert not any(detector.update(block) for block in np.split(silence(3), 30))
+    assert not detector.update(tone(0.5))
+    results = [detector.update(block) for block in np.split(silence(1.2), 12)]
+    assert not results[0] and results[-1]
+
+
+def test_streaming_skips_silent_chunks_and_reports_removed_audio():
+    sent = []
+    transcriber = StreamingTranscriber(lambda audio, prompt: sent.append(audio) or "word", samplerate=RATE,
+                                       min_chunk_seconds=2, max_chunk_seconds=4, max_pause_seconds=0.5)
+    for block in np.split(np.concatenate([silence(8), tone(1), silence(1)]), 100):
+        transcriber.feed(block)
+    transcriber.finish()
+    assert len(sent) < transcriber.chunks
+    assert transcriber.silence_removed > 7
+
+
+def test_chunked_transcription_trims_each_chunk():
+    lengths = []
+    audio = np.concatenate([tone(1), silence(6), tone(1)])
+    transcribe_in_chunks(audio, RATE, lambda audio, prompt: lengths.append(len(audio)) or "word",
+                         min_chunk_seconds=2, max_chunk_seconds=4, max_pause_seconds=0.5)
+    untrimmed = []
+    transcribe_in_chunks(audio, RATE, lambda audio, prompt: untrimmed.append(len(audio)) or "word",
+                         min_chunk_seconds=2, max_chunk_seconds=4)
+    assert sum(lengths) < sum(untrimmed)
@@ -0,0 +1,150 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+import wave
+from pathlib import Path
+from config_utils import get_settings
+
+"""
+This file stores synthesized speech on disk so fixed lines (the Speaker's announcements)
+are only sent to the TTS provider once and afterwards play straight from local audio.
+
+Clips are keyed by (text, tone, voice, model) and kept as 16-bit mono WAV files.
+
+Like the response cache, loading a clip refreshes its mtime, and once the clips are over
+max_bytes the least recently used ones are deleted, as are clips unused for max_age. Every
+motion adds its own announcement clips, so without this the directory would only grow.
+"""
+
+SAMPLE_RATE = 24000
+
+
+class AudioCache:
+    def __init__(self, directory, max_bytes: int = 100 * 1024 * 1024, max_age: float | None = 90 * 24 * 3600):
+        """
+        Args:
+            directory: Where the clips are stored, created on first write
+            max_bytes (int): Size budget for all clips together
+            max_age (float | None): Seconds without use after which a clip is deleted, None for no limit
+        """
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        # clips synthesized and stored by this process, and clips deleted by eviction
+        self.writes = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        # bytes on disk, None until the first scan
+        self._size = None
+
+    @staticmethod
+    def key(text: str, tone: str, voice: str, model: str) -> str:
+        payload = json.dumps([text, tone, voice, model], ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.wav"
+
+    def contains(self, key: str) -> bool:
+        return self._path(key).exists()
+
+    def load(self, key: str):
+        """
+        Returns:
+            np.ndarray | None: float32 samples shaped (n, 1) at SAMPLE_RATE, or None if missing
+        """
+        import numpy as np
+
+        path = self._path(key)
+        try:
+            with wave.open(str(path), "rb") as f:
+                frames = f.readframes(f.getnframes())
+            # refresh the LRU position
+            os.utime(path)
+        except (OSError, wave.Error, EOFError):
+            return None
+        return (np.frombuffer(frames, dtype=np.int16).astype(np.float32) / 32767.0).reshape(-1, 1)
+
+    def store(self, key: str, pcm: bytes) -> None:
+        """Store raw 16-bit mono PCM at SAMPLE_RATE as a WAV file, atomically."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as raw, wave.open(raw, "wb") as f:
+                f.setnchannels(1)
+                f.setsampwidth(2)
+                f.setframerate(SAMPLE_RATE)
+                f.writeframes(pcm[:len(pcm) - len(pcm) % 2])
+            written = os.path.getsize(tmp_path)
+            os.replace(tmp_path, self._path(key))
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        with self._lock:
+            self.writes += 1
+            if self._size is not None:
+                self._size += written
+            due = self._size is None or self._size > self.max_bytes
+        if due:
+            self.evict()
+
+    def evict(self) -> int:
+        """
+        Remove clips unused for max_age, then the least recently used ones until the size budget is met.
+
+        Returns:
+            int: Number of clips removed
+        """
+        now = time.time()
+        clips = []
+        removed = 0
+        for path in self.directory.glob("*.wav"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            if self.max_age is not None and now - stat.st_mtime > self.max_age:
+                path.unlink(missing_ok=True)
+                removed += 1
+            else:
+                clips.append((stat.st_mtime, stat.st_size, path))
+        total = sum(size for _, size, _ in clips)
+        for _, size, path in sorted(clips):
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+            removed += 1
+        with self._lock:
+            self.evictions += removed
+            self._size = total
+        return removed
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_audio_cache() -> AudioCache:
+    """
+    The process-wide cache in the directory set by AUDIO_CACHE in config.json, shared by
+    every Interaction so its writes counter covers all clips synthesized in this process.
+    """
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            settings = get_settings().audio_cache
+            directory = Path(settings.get("directory", "cache/audio"))
+            if not directory.is_absolute():
+                directory = Path(__file__).resolve().parent.parent / directory
+            max_age_days = settings.get("max_age_days", 90)
+            _cache = AudioCache(
+                directory,
+                max_bytes=int(settings.get("max_mb", 100) * 1024 * 1024),
+                max_age=max_age_days * 24 * 3600 if max_age_days is not None else None,
+            )
+        return _cache
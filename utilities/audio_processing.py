@@ -0,0 +1,206 @@
+import io
+
+import numpy as np
+import soundfile as sf
+
+"""
+This file holds small signal helpers for recorded speech: mono conversion, finding quiet
+points to cut at, voice activity detection and silence trimming, compact in-memory encoding
+for upload, and stitching the transcripts of overlapping chunks back together.
+"""
+
+# speech recognition gains nothing above this rate
+STT_SAMPLERATE = 16000
+
+
+def to_mono(block) -> np.ndarray:
+    """Flatten a (frames, channels) block from the microphone to float32 mono samples."""
+    samples = np.asarray(block, dtype=np.float32)
+    if samples.ndim == 2:
+        samples = samples.mean(axis=1)
+    return samples.reshape(-1)
+
+
+def frame_rms(samples: np.ndarray, frame_len: int) -> np.ndarray:
+    """RMS level of consecutive frames, a trailing partial frame is ignored."""
+    count = len(samples) // frame_len
+    if count == 0:
+        return np.zeros(0, dtype=np.float32)
+    frames = samples[:count * frame_len].reshape(count, frame_len)
+    return np.sqrt(np.mean(frames * frames, axis=1))
+
+
+def quietest_point(samples: np.ndarray, samplerate: int, start: int, end: int, frame_seconds: float = 0.05) -> int:
+    """
+    Find the best place to cut speech between two sample positions.
+
+    Returns:
+        int: Sample index at the middle of the quietest frame in [start, end)
+    """
+    frame_len = max(1, int(samplerate * frame_seconds))
+    levels = frame_rms(samples[start:end], frame_len)
+    if len(levels) == 0:
+        return end
+    return start + int(np.argmin(levels)) * frame_len + frame_len // 2
+
+
+def level_db(samples: np.ndarray) -> float:
+    """RMS level of some samples in dBFS."""
+    if len(samples) == 0:
+        return -np.inf
+    return float(20 * np.log10(np.sqrt(np.mean(np.square(samples, dtype=np.float64))) + 1e-10))
+
+
+def voice_activity(samples: np.ndarray, samplerate: int, threshold_db: float = -45, frame_seconds: float = 0.03) -> np.ndarray:
+    """
+    Returns:
+        np.ndarray: One bool per frame of frame_seconds, True where the level is above threshold_db
+    """
+    levels = frame_rms(samples, max(1, int(samplerate * frame_seconds)))
+    return 20 * np.log10(levels + 1e-10) > threshold_db
+
+
+def trim_silence(samples: np.ndarray, samplerate: int, max_pause_seconds: float = 1.0, threshold_db: float = -45,
+                 padding_seconds: float = 0.2, frame_seconds: float = 0.03) -> tuple[np.ndarray, float]:
+    """
+    Drop leading and trailing silence and shorten pauses longer than max_pause_seconds.
+
+    Speech keeps padding_seconds of its surrounding silence so word edges are never clipped.
+
+    Returns:
+        tuple[np.ndarray, float]: The trimmed samples and the seconds removed
+    """
+    frame_len = max(1, int(samplerate * frame_seconds))
+    voiced = voice_activity(samples, samplerate, threshold_db, frame_seconds)
+    if not voiced.any():
+        return samples[:0], len(samples) / samplerate
+    padding = int(padding_seconds / frame_seconds)
+    # mode="same" would return the kernel's length for clips shorter than it
+    keep = np.convolve(voiced, np.ones(2 * padding + 1))[padding:padding + len(voiced)] > 0
+    # runs of silent frames: starts where keep turns False, ends where it turns True again
+    edges = np.diff(np.concatenate([[1], keep.astype(np.int8), [1]]))
+    starts, ends = np.flatnonzero(edges == -1), np.flatnonzero(edges == 1)
+    # the padding on both sides already counts towards a pause
+    max_pause = max(0, int(max_pause_seconds / frame_seconds) - 2 * padding)
+    for start, end in zip(starts, ends):
+        if start == 0 or end == len(keep):
+            continue
+        if end - start > max_pause:
+            # keep the edges of a long pause so it still sounds like one
+            keep[start:start + max_pause // 2] = True
+            keep[end - (max_pause - max_pause // 2):end] = True
+        else:
+            keep[start:end] = True
+    mask = np.repeat(keep, frame_len)
+    # the partial frame at the end follows the last full frame
+    mask = np.concatenate([mask, np.full(len(samples) - len(mask), keep[-1])])
+    trimmed = samples[mask]
+    return trimmed, (len(samples) - len(trimmed)) / samplerate
+
+
+class SilenceDetector:
+    """Tells when a recording has been silent for a while after speech was heard, block by block."""
+
+    def __init__(self, samplerate: int, silence_seconds: float, threshold_db: float = -45):
+        self.limit = int(silence_seconds * samplerate)
+        self.threshold_db = threshold_db
+        self.heard_speech = False
+        self.silent_samples = 0
+
+    def update(self, block) -> bool:
+        """
+        Returns:
+            bool: True once the silence after speech has lasted silence_seconds
+        """
+        samples = to_mono(block)
+        if level_db(samples) > self.threshold_db:
+            self.heard_speech = True
+            self.silent_samples = 0
+        elif self.heard_speech:
+            self.silent_samples += len(samples)
+        return self.heard_speech and self.silent_samples >= self.limit
+
+
+def split_at_silences(samples: np.ndarray, samplerate: int, min_chunk_seconds: float = 8,
+                      max_chunk_seconds: float = 15, overlap_seconds: float = 0.5) -> list[np.ndarray]:
+    """
+    Cut a recording into chunks of at most max_chunk_seconds, each cut at the quietest moment
+    past min_chunk_seconds. Neighbouring chunks share overlap_seconds of audio on each side of
+    the cut, so stitch_transcripts can remove what both of them heard.
+
+    Returns:
+        list[np.ndarray]: The chunks in order, a short recording is returned whole
+    """
+    min_chunk = int(min_chunk_seconds * samplerate)
+    max_chunk = int(max_chunk_seconds * samplerate)
+    overlap = int(overlap_seconds * samplerate)
+    if min_chunk <= overlap:
+        raise ValueError("min_chunk_seconds has to be longer than overlap_seconds")
+    chunks = []
+    start = 0
+    while len(samples) - start > max_chunk:
+        cut = start + quietest_point(samples[start:start + max_chunk], samplerate, min_chunk, max_chunk)
+        chunks.append(samples[start:cut + overlap])
+        start = max(start, cut - overlap)
+    # the first 2 * overlap samples of the rest were already part of the previous chunk
+    if len(samples) - start > (overlap * 2 if chunks else 0):
+        chunks.append(samples[start:])
+    return chunks
+
+
+def resample(samples: np.ndarray, samplerate: int, target: int) -> np.ndarray:
+    """
+    Downsample mono audio. A moving average over one output sample period removes most of
+    what would alias before linear interpolation, which is plenty for speech recognition.
+    Audio already at or below the target rate is returned unchanged.
+    """
+    if samplerate <= target or len(samples) == 0:
+        return samples
+    width = int(round(samplerate / target))
+    if width > 1:
+        padded = np.concatenate([np.zeros(1, dtype=np.float64), np.cumsum(samples, dtype=np.float64)])
+        smoothed = (padded[width:] - padded[:-width]) / width
+        # centre the window again
+        samples = np.concatenate([np.full(width // 2, smoothed[0]), smoothed, np.full(width - 1 - width // 2, smoothed[-1])])
+    positions = np.arange(0, len(samples) - 1, samplerate / target)
+    return np.interp(positions, np.arange(len(samples)), samples).astype(np.float32)
+
+
+def encode_speech(samples: np.ndarray, samplerate: int) -> bytes:
+    """
+    Encode speech for upload: mono, at most STT_SAMPLERATE, 16-bit FLAC, in memory.
+
+    Returns:
+        bytes: A FLAC file, several times smaller than the float WAV it replaces
+    """
+    samples = resample(to_mono(samples), samplerate, STT_SAMPLERATE)
+    buffer = io.BytesIO()
+    sf.write(buffer, np.clip(samples, -1.0, 1.0), min(samplerate, STT_SAMPLERATE), format="FLAC", subtype="PCM_16")
+    return buffer.getvalue()
+
+
+def _word_key(word: str) -> str:
+    return "".join(character for character in word.lower() if character.isalnum())
+
+
+def stitch_transcripts(previous: str, following: str, max_overlap_words: int = 8) -> str:
+    """
+    Join the transcripts of two chunks that overlap by a moment of audio.
+
+    Words heard at the end of the first chunk and again at the start of the next one are
+    kept once. Case and punctuation are ignored when comparing, so "today." matches "Today".
+    """
+    previous_words = previous.split()
+    following_words = following.split()
+    if not previous_words:
+        return following.strip()
+    if not following_words:
+        return previous.strip()
+    previous_keys = [_word_key(word) for word in previous_words]
+    following_keys = [_word_key(word) for word in following_words]
+    overlap = 0
+    for size in range(min(max_overlap_words, len(previous_keys), len(following_keys)), 0, -1):
+        if previous_keys[-size:] == following_keys[:size]:
+            overlap = size
+            break
+    return " ".join(previous_words + following_words[overlap:])
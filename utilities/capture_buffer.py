@@ -0,0 +1,119 @@
+from multiprocessing import shared_memory
+
+import numpy as np
+
+"""
+This file holds the buffer microphone audio is recorded into.
+
+The whole speech fits in one array allocated up front, sized from the time limit of a BP
+speech plus some grace. The audio callback only copies each block into the next free rows
+and moves the frame count on, so it creates no arrays per block; consumers read the rows
+added since they last looked from another thread. The finished recording is a view of the
+array rather than a concatenation of many small ones. Audio arriving after the buffer is
+full is counted, not stored.
+
+SharedCaptureBuffer keeps the same array and counters in shared memory, so a capture process
+can write a speech while another process reads it without copying.
+"""
+
+# seven minutes per speech in British Parliamentary format
+SPEECH_LIMIT_SECONDS = 7 * 60
+# speakers are allowed to finish their sentence after the bell
+GRACE_SECONDS = 30
+
+
+class CaptureBuffer:
+    def __init__(self, samplerate: int, max_seconds: float = SPEECH_LIMIT_SECONDS + GRACE_SECONDS, channels: int = 1,
+                 data: np.ndarray | None = None):
+        """
+        Args:
+            samplerate (int): Recording sample rate
+            max_seconds (float): Hard cap on the recording length
+            channels (int): Channels per frame
+            data (np.ndarray | None): Storage to record into, allocated here when None
+        """
+        self.samplerate = samplerate
+        # np.empty only reserves the memory, pages are committed as they are written
+        self.data = data if data is not None else np.empty((int(max_seconds * samplerate), channels), dtype=np.float32)
+        self.frames = 0
+        self.dropped_frames = 0
+        # blocks the audio driver reported as overflowed, i.e. audio lost before it reached us
+        self.overflows = 0
+
+    @property
+    def capacity(self) -> int:
+        return len(self.data)
+
+    @property
+    def full(self) -> bool:
+        return self.frames >= self.capacity
+
+    @property
+    def seconds(self) -> float:
+        return self.frames / self.samplerate
+
+    def write(self, block: np.ndarray) -> int:
+        """
+        Copy a block in after what was recorded so far, as much of it as still fits.
+
+        Returns:
+            int: The number of frames stored, 0 once the buffer is full
+        """
+        start = self.frames
+        count = min(len(block), self.capacity - start)
+        self.data[start:start + count] = block[:count]
+        # moved on only after the copy, so a reader never sees rows that are still being written
+        self.frames = start + count
+        self.dropped_frames += len(block) - count
+        return count
+
+    def view(self) -> np.ndarray:
+        """The recording so far, shaped (frames, channels), without copying."""
+        return self.data[:self.frames]
+
+
+def _shared_counter(index: int) -> property:
+    return property(lambda self: int(self._header[index]), lambda self, value: self._header.__setitem__(index, value))
+
+
+class SharedCaptureBuffer(CaptureBuffer):
+    # int64 counters in front of the samples: frames, dropped_frames, overflows
+    HEADER = 3
+    frames = _shared_counter(0)
+    dropped_frames = _shared_counter(1)
+    overflows = _shared_counter(2)
+
+    def __init__(self, samplerate: int, max_seconds: float = SPEECH_LIMIT_SECONDS + GRACE_SECONDS, channels: int = 1,
+                 name: str | None = None):
+        """
+        Args:
+            name (str | None): Attach to the buffer another process created under this name,
+                None creates a new one. The creator has to unlink it when done.
+        """
+        capacity = int(max_seconds * samplerate)
+        header_bytes = self.HEADER * np.dtype(np.int64).itemsize
+        if name is None:
+            self.shm = shared_memory.SharedMemory(create=True, size=header_bytes + capacity * channels * np.dtype(np.float32).itemsize)
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+        self._header = np.ndarray((self.HEADER,), dtype=np.int64, buffer=self.shm.buf)
+        data = np.ndarray((capacity, channels), dtype=np.float32, buffer=self.shm.buf, offset=header_bytes)
+        if name is None:
+            super().__init__(samplerate, max_seconds, channels, data=data)
+        else:
+            # the counters belong to the creator, attaching must not reset them
+            self.samplerate = samplerate
+            self.data = data
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    def close(self) -> None:
+        """Detach from the shared memory. Views of it must be gone by now."""
+        self.data = self._header = None
+        self.shm.close()
+
+    def unlink(self) -> None:
+        """Free the shared memory once every process has closed it."""
+        self.shm.unlink()
@@ -0,0 +1,266 @@
+import asyncio
+import logging
+import os
+import threading
+import weakref
+from contextlib import asynccontextmanager
+from typing import TYPE_CHECKING
+
+from config_utils import get_settings
+
+if TYPE_CHECKING:
+    from openai import AsyncOpenAI, OpenAI
+
+"""
+This file keeps one long-lived client per provider so that every Responder, BrainStormer
+and Interaction call reuses the same keep-alive connection pool instead of paying for a
+new TCP + TLS handshake on each request.
+
+Sync clients are shared process-wide (they are thread safe, so asyncio.to_thread callers
+can use them too). Async clients are bound to the event loop they were created on, so
+they are kept per running loop.
+
+Proxies are configured on each client: like the per-call clients these replaced, every
+provider follows the HTTP(S)_PROXY environment variables, unless PROVIDER_PROXIES in
+config.json gives it a URL or null (a direct connection). The environment itself is never
+modified.
+
+provider_slot caps how many requests may be in flight per provider at once (PROVIDER_LIMITS in
+config.json, or set_provider_limits), which keeps batch runs within the providers' rate limits.
+
+openai and httpx take most of a second to import, so they are imported when the first client
+is created rather than with this module.
+"""
+
+logger = logging.getLogger(__name__)
+
+PROVIDERS = {
+    "openai": {"base_url": None, "api_key_env": "OPENAI_API_KEY"},
+    "openrouter": {"base_url": "https://openrouter.ai/api/v1", "api_key_env": "OPENROUTER_API_KEY"},
+}
+
+# keep-alive settings shared by every pooled client, see _http_settings
+POOL_LIMITS = {"max_connections": 20, "max_keepalive_connections": 10, "keepalive_expiry": 120}
+POOL_TIMEOUT_SECONDS = 600.0
+POOL_CONNECT_TIMEOUT_SECONDS = 10.0
+
+_lock = threading.Lock()
+# key -> (client, http_client)
+_sync_clients = {}
+# event loop -> {key -> (client, http_client)}
+_async_clients = weakref.WeakKeyDictionary()
+# provider -> max requests in flight, overrides PROVIDER_LIMITS
+_limits = {}
+# event loop -> {provider -> asyncio.Semaphore}
+_semaphores = weakref.WeakKeyDictionary()
+
+
+def _provider_settings(provider: str) -> dict:
+    if provider not in PROVIDERS:
+        raise ValueError(f"Invalid service: '{provider}'. Valid options are {', '.join(repr(p) for p in PROVIDERS)}")
+    return PROVIDERS[provider]
+
+
+def _proxy_for(provider: str):
+    """
+    Resolve the proxy for a provider.
+
+    Returns:
+        tuple: (proxy_url or None, trust_env) to pass to httpx
+    """
+    # rejects unknown providers
+    _provider_settings(provider)
+    proxy = get_settings().provider_proxies.get(provider, "env")
+    if proxy == "env":
+        return None, True
+    # an explicit URL, or null for a direct connection
+    return proxy, False
+
+
+def _client_key(provider: str, api_key_env: str | None) -> tuple:
+    settings = _provider_settings(provider)
+    return (provider, settings["base_url"], api_key_env or settings["api_key_env"])
+
+
+def _client_kwargs(provider: str, api_key_env: str | None) -> dict:
+    settings = _provider_settings(provider)
+    return {
+        "base_url": settings["base_url"],
+        "api_key": os.environ.get(api_key_env or settings["api_key_env"]),
+    }
+
+
+def _http_settings(provider: str) -> dict:
+    """Keyword arguments for the httpx client behind a provider's pooled client."""
+    import httpx
+
+    proxy, trust_env = _proxy_for(provider)
+    return {"limits": httpx.Limits(**POOL_LIMITS), "timeout": httpx.Timeout(POOL_TIMEOUT_SECONDS, connect=POOL_CONNECT_TIMEOUT_SECONDS),
+            "proxy": proxy, "trust_env": trust_env}
+
+
+def get_client(provider: str, api_key_env: str = None) -> "OpenAI":
+    """
+    Get the shared sync client for a provider.
+
+    Args:
+        provider (str): "openai" or "openrouter"
+        api_key_env (str): Environment variable holding the key, defaults to the provider's own
+
+    Returns:
+        OpenAI: A pooled client, created on first use
+    """
+    key = _client_key(provider, api_key_env)
+    with _lock:
+        if key not in _sync_clients:
+            import httpx
+            from openai import OpenAI
+
+            http_client = httpx.Client(**_http_settings(provider))
+            client = OpenAI(http_client=http_client, **_client_kwargs(provider, api_key_env))
+            _sync_clients[key] = (client, http_client)
+            logger.debug(f"Created pooled client for {key[0]} (key from {key[2]})")
+        return _sync_clients[key][0]
+
+
+def get_async_client(provider: str, api_key_env: str = None) -> "AsyncOpenAI":
+    """
+    Get the shared async client for a provider on the running event loop.
+
+    Args:
+        provider (str): "openai" or "openrouter"
+        api_key_env (str): Environment variable holding the key, defaults to the provider's own
+
+    Returns:
+        AsyncOpenAI: A pooled client, created on first use within this loop
+    """
+    loop = asyncio.get_running_loop()
+    key = _client_key(provider, api_key_env)
+    with _lock:
+        clients = _async_clients.setdefault(loop, {})
+        if key not in clients:
+            import httpx
+            from openai import AsyncOpenAI
+
+            http_client = httpx.AsyncClient(**_http_settings(provider))
+            client = AsyncOpenAI(http_client=http_client, **_client_kwargs(provider, api_key_env))
+            clients[key] = (client, http_client)
+            logger.debug(f"Created pooled async client for {key[0]} (key from {key[2]})")
+        return clients[key][0]
+
+
+def set_provider_limits(limits: dict) -> None:
+    """
+    Cap concurrent requests per provider, e.g. {"openrouter": 8}. A limit of 0 or None removes the cap.
+    Takes effect for event loops that have not used the provider yet.
+    """
+    _limits.update(limits)
+
+
+def _provider_limit(provider: str) -> int | None:
+    if provider in _limits:
+        return _limits[provider]
+    return get_settings().provider_limits.get(provider)
+
+
+@asynccontextmanager
+async def provider_slot(provider: str):
+    """Hold one of the provider's request slots for the duration of the block."""
+    limit = _provider_limit(provider)
+    if not limit:
+        yield
+        return
+    loop = asyncio.get_running_loop()
+    with _lock:
+        semaphores = _semaphores.setdefault(loop, {})
+        if provider not in semaphores:
+            semaphores[provider] = asyncio.Semaphore(limit)
+        semaphore = semaphores[provider]
+    async with semaphore:
+        yield
+
+
+def _warm_sync(provider: str, api_key_env: str | None) -> None:
+    client = get_client(provider, api_key_env)
+    _, http_client = _sync_clients[_client_key(provider, api_key_env)]
+    # any response will do, we only want the connection to be open and pooled
+    http_client.head(str(client.base_url), timeout=10.0)
+
+
+async def _warm_async(provider: str, api_key_env: str | None) -> None:
+    client = get_async_client(provider, api_key_env)
+    _, http_client = _async_clients[asyncio.get_running_loop()][_client_key(provider, api_key_env)]
+    await http_client.head(str(client.base_url), timeout=10.0)
+
+
+def debate_targets() -> list[tuple]:
+    """
+    The clients a debate will use, as warm_up targets.
+
+    Returns:
+        list[tuple]: (provider, api_key_env, is_async) for brainstorming, speeches and, when a human
+            is playing, STT
+    """
+    settings = get_settings()
+    targets = [
+        (settings.team_provider, None, True),
+        (settings.individual_provider, None, True),
+    ]
+    if settings.human_roles:
+        targets.append((settings.interaction_provider, "INTERACTION_KEY", False))
+    # drop duplicates while keeping the order
+    return list(dict.fromkeys(targets))
+
+
+async def warm_up(targets: list[tuple]) -> None:
+    """
+    Open connections ahead of time so the first real request skips DNS, TCP and TLS setup.
+
+    Args:
+        targets (list[tuple]): (provider, api_key_env, is_async) for each client to warm,
+            api_key_env may be None to use the provider's default key
+    """
+    jobs = []
+    for provider, api_key_env, is_async in targets:
+        if is_async:
+            jobs.append(_warm_async(provider, api_key_env))
+        else:
+            jobs.append(asyncio.to_thread(_warm_sync, provider, api_key_env))
+    results = await asyncio.gather(*jobs, return_exceptions=True)
+    for (provider, _, is_async), result in zip(targets, results):
+        if isinstance(result, Exception):
+            logger.warning(f"Warm-up failed for {provider} ({'async' if is_async else 'sync'}): {result}")
+        else:
+            logger.debug(f"Warmed up {provider} ({'async' if is_async else 'sync'}) connection")
+
+
+async def aclose_loop_clients() -> None:
+    """Close the async clients pooled for the running event loop."""
+    with _lock:
+        clients = _async_clients.pop(asyncio.get_running_loop(), {})
+    for client, _ in clients.values():
+        await client.close()
+
+
+def run_sync(coroutine):
+    """
+    Run a coroutine on a new event loop from blocking code, like asyncio.run, and close the
+    async clients it pooled on that loop before the loop goes away.
+
+    Returns:
+        The coroutine's result
+    """
+    async def run():
+        try:
+            return await coroutine
+        finally:
+            await aclose_loop_clients()
+    return asyncio.run(run())
+
+
+def close_all() -> None:
+    """Close every pooled sync client. Async clients are closed by aclose_loop_clients, see run_sync."""
+    with _lock:
+        for client, _ in _sync_clients.values():
+            client.close()
+        _sync_clients.clear()
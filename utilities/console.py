@@ -0,0 +1,58 @@
+import queue
+import sys
+import threading
+
+"""
+This file owns stdin for the whole process once a debate is running.
+
+A single reader thread reads stdin line by line and hands each line to whoever calls
+read_line next, so the recording prompts and the SkipListener never read stdin at the same
+time: one Enter always goes to exactly one of them, and a reader that gives up (a recording
+that stopped on its own, a listener that was stopped) leaves no thread blocked on stdin.
+
+The reader thread is started by the first read_line call. Plain input() must not be used
+after that, it would compete with the reader thread for the same lines.
+"""
+
+# lines read from stdin, None once stdin is closed
+_lines = queue.Queue()
+_reader = None
+_lock = threading.Lock()
+
+
+def _read() -> None:
+    for line in iter(sys.stdin.readline, ""):
+        _lines.put(line.rstrip("\r\n"))
+    _lines.put(None)
+
+
+def read_line(prompt: str = "", timeout: float | None = None) -> str | None:
+    """
+    Wait for the next line typed on stdin.
+
+    Args:
+        prompt (str): Printed (without a newline) before waiting, like input()'s prompt
+        timeout (float | None): Give up after this many seconds, None waits for good
+
+    Returns:
+        str | None: The line without its line break, or None if the timeout passed first
+
+    Raises:
+        EOFError: When stdin is closed
+    """
+    global _reader
+    with _lock:
+        if _reader is None:
+            _reader = threading.Thread(target=_read, name="stdin-reader", daemon=True)
+            _reader.start()
+    if prompt:
+        print(prompt, end="", flush=True)
+    try:
+        line = _lines.get(timeout=timeout)
+    except queue.Empty:
+        return None
+    if line is None:
+        # leave the end of input for every later reader too
+        _lines.put(None)
+        raise EOFError("stdin was closed")
+    return line
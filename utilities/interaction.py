@@ -1,24 +1,202 @@
 import asyncio
-from openai import AsyncOpenAI, OpenAI
-from openai.helpers import LocalAudioPlayer
-import os
-from config_utils import get_config
+import logging
+import time
+from config_utils import get_settings
+from utilities.client_pool import get_client, get_async_client
+from utilities.audio_cache import get_audio_cache
 
 """
 This is a file for tts & stt to allow human and ai to interact.
 There should be more providers in the future.
 Currently it only supports openai.
+
+numpy and the playback engine are imported where they are used, so headless runs that never
+play or record anything do not load the audio stack.
+
+All audio is played through the process-wide PlaybackEngine (see utilities/playback.py).
+With wait=False a clip is only queued, so the caller can move on and fetch the next clip
+while this one is still playing. Streamed speeches can be skipped (skip() or Enter while
+listen_for_skips runs); a skipped speech stops its TTS request right away.
+
+PLAYBACK.rate in config.json speeds all speech up (or down) locally before it is queued,
+see utilities/time_stretch.py. Streamed audio is stretched chunk by chunk as it arrives.
 """
 
+logger = logging.getLogger(__name__)
+
+TTS_MODEL = "gpt-4o-mini-tts"
+TTS_VOICE = "coral"
+# how much of the transcript so far is sent along with the next chunk
+STT_PROMPT_CHARS = 500
+# rough speaking rate, used to estimate how long a skipped, never synthesized text would have played
+TTS_CHARS_PER_SECOND = 15
+
+
+async def pcm_buffers(response):
+    """Turn a streamed 16-bit PCM response into float32 buffers shaped (n, 1)."""
+    import numpy as np
+
+    leftover = b""
+    async for data in response.iter_bytes():
+        data = leftover + data
+        # 16-bit samples, keep an odd trailing byte for the next read
+        usable = len(data) - len(data) % 2
+        leftover = data[usable:]
+        if usable:
+            pcm = np.frombuffer(data[:usable], dtype=np.int16)
+            yield (pcm.astype(np.float32) / 32767.0).reshape(-1, 1)
 
 
 class Interaction:
     def __init__(self, service=None):
-        self.service = service if service else get_config("INTERACTION_PROVIDER")
+        settings = get_settings()
+        self.service = service if service else settings.interaction_provider
+        self.audio_cache = get_audio_cache()
+        # cache key -> task currently synthesizing it, so a clip is never requested twice
+        self._rendering = {}
+        # every streamed speech, to add up what skipping saved
+        self.speech_clips = []
+        self.playback_rate = settings.playback.get("rate", 1.0)
+
+    async def tts(self, tone: str, input: str, cached: bool = False, wait: bool = True) -> None:
+        """
+        Speak a text. With cached=True the clip is played from the local audio cache,
+        synthesizing and storing it first if it is not there yet. With wait=False this
+        returns once the clip is queued for playback instead of once it was heard.
+        """
+        if self.service == "openai":
+            if cached:
+                return await self.play_cached(tone=tone, input=input, wait=wait)
+            return await self.openai_tts(tone=tone, input=input, wait=wait)
+        else:
+            raise ValueError("Invalid service")
+
+    async def synthesize(self, tone: str, input: str) -> bytes:
+        """
+        Returns:
+            bytes: The whole clip as 16-bit mono PCM at 24 kHz
+        """
+        if self.service == "openai":
+            return await self.openai_synthesize(tone=tone, input=input)
+        else:
+            raise ValueError("Invalid service")
+
+    async def render(self, tone: str, input: str) -> str:
+        """
+        Make sure a clip is in the audio cache.
+
+        Returns:
+            str: The cache key of the clip
+        """
+        key = self.audio_cache.key(input, tone, TTS_VOICE, TTS_MODEL)
+        if self.audio_cache.contains(key):
+            return key
+        task = self._rendering.get(key)
+        if task is None:
+            task = asyncio.create_task(self._render(key, tone, input))
+            self._rendering[key] = task
+            task.add_done_callback(lambda _: self._rendering.pop(key, None))
+        await task
+        return key
+
+    async def _render(self, key: str, tone: str, input: str) -> None:
+        pcm = await self.synthesize(tone=tone, input=input)
+        await asyncio.to_thread(self.audio_cache.store, key, pcm)
+        logger.debug(f"Rendered and cached clip {key[:12]} ({len(pcm)} bytes): {input[:60]}")
+
+    async def prerender(self, tone: str, texts: list[str], concurrency: int = 4) -> int:
+        """
+        Synthesize every clip that is missing from the audio cache, concurrently.
+
+        Returns:
+            int: Number of clips that are ready in the cache
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def render_one(text):
+            async with semaphore:
+                return await self.render(tone=tone, input=text)
+
+        results = await asyncio.gather(*(render_one(text) for text in texts), return_exceptions=True)
+        for text, result in zip(texts, results):
+            if isinstance(result, Exception):
+                logger.warning(f"Pre-rendering failed for '{text[:60]}': {result}")
+        return sum(not isinstance(result, Exception) for result in results)
+
+    async def play_cached(self, tone: str, input: str, wait: bool = True) -> None:
+        from utilities.playback import get_playback_engine
+
+        key = await self.render(tone=tone, input=input)
+        audio = await asyncio.to_thread(self.audio_cache.load, key)
+        if audio is None:
+            raise RuntimeError(f"Cached clip {key} could not be read")
+        if self.playback_rate != 1.0:
+            audio = await asyncio.to_thread(self.stretch, audio)
+        await get_playback_engine().play(audio, label=input[:60], wait=wait)
+
+    def stretch(self, audio):
+        """A complete clip played at PLAYBACK.rate, same pitch."""
+        import numpy as np
+        from utilities.time_stretch import TimeStretcher
+
+        stretcher = TimeStretcher(self.playback_rate)
+        return np.concatenate([stretcher.process(audio), stretcher.flush()])
+
+    async def drain(self) -> None:
+        """Wait until every queued clip has been played."""
+        from utilities.playback import get_playback_engine
+
+        await get_playback_engine().drain()
 
-    async def tts(self, tone: str, input: str) -> None:
+    def close(self) -> None:
+        """Release the output device once nothing is left to play."""
+        from utilities.playback import get_playback_engine
+
+        get_playback_engine().close()
+
+    def skip(self) -> bool:
+        """
+        Skip the rest of the speech being played. Safe to call from any thread.
+
+        Returns:
+            bool: Whether a speech was playing and got skipped
+        """
+        from utilities.playback import get_playback_engine
+
+        return get_playback_engine().skip()
+
+    def listen_for_skips(self):
+        """
+        Returns:
+            SkipListener: Started, skips the playing speech whenever Enter is pressed; stop() it when done
+        """
+        from utilities.playback import SkipListener, get_playback_engine
+
+        return SkipListener(get_playback_engine()).start()
+
+    def skipped(self) -> tuple[int, float]:
+        """
+        Returns:
+            tuple[int, float]: Speeches of this Interaction that were skipped, and the seconds of playback that saved
+        """
+        skipped = [clip for clip in self.speech_clips if clip.cancelled]
+        return len(skipped), sum(clip.seconds_saved for clip in skipped)
+
+    async def tts_stream(self, tone: str, chunks: asyncio.Queue, wait: bool = True, label: str = "the speech") -> float | None:
+        """
+        Speak text chunks as they arrive, gaplessly, until a None is taken from the queue.
+        The speech can be skipped; the rest of the queue is then consumed without being synthesized.
+
+        Args:
+            wait (bool): Return once the speech was played, otherwise once all of its audio is queued
+            label (str): Names the speech in prompts and logs
+
+        Returns:
+            float | None: Seconds from the call until the first audio was queued (and played,
+                unless earlier clips were still playing), None if there was no audio
+        """
         if self.service == "openai":
-            return await self.openai_tts(tone=tone, input=input)
+            return await self.openai_tts_stream(tone=tone, chunks=chunks, wait=wait, label=label)
         else:
             raise ValueError("Invalid service")
 
@@ -28,27 +206,163 @@ class Interaction:
         else:
             raise ValueError("Invalid service")
 
-    async def openai_tts(self, tone: str, input: str) -> None:
+    def stt_samples(self, samples, samplerate: int, max_pause_seconds: float | None = None, threshold_db: float = -45) -> str:
+        """
+        Transcribe a recording held in memory with one upload. It is sent as 16 kHz FLAC
+        (see encode_speech) straight from memory, without a temp file. With max_pause_seconds
+        set, silence is trimmed first (see trim_silence).
+        """
+        from utilities.audio_processing import encode_speech, to_mono, trim_silence
+
+        samples = to_mono(samples)
+        if max_pause_seconds is not None:
+            samples, removed = trim_silence(samples, samplerate, max_pause_seconds, threshold_db)
+            logger.info(f"Removed {removed:.1f}s of silence, {len(samples) / samplerate:.1f}s of speech left")
+            if len(samples) == 0:
+                return ""
+        audio = encode_speech(samples, samplerate)
+        started = time.perf_counter()
+        text = self.stt_chunk(audio)
+        logger.info(f"Uploaded {len(audio) / 1024:.0f} KiB for {len(samples) / samplerate:.0f}s of speech, transcribed in {time.perf_counter() - started:.2f}s")
+        return text
+
+    def stt_parallel(self, samples, samplerate: int, concurrency: int = 4, max_chunk_seconds: float = 30, **trim) -> str:
+        """
+        Transcribe a recording held in memory as chunks cut at silences, sent concurrently
+        instead of as one long upload, so long speeches take about as long as their longest chunk.
+        Keyword arguments max_pause_seconds and threshold_db trim silence from each chunk.
+        """
+        from utilities.streaming_stt import transcribe_in_chunks
+
+        return transcribe_in_chunks(samples, samplerate, self.stt_chunk, concurrency=concurrency, max_chunk_seconds=max_chunk_seconds, **trim)
+
+    def stt_chunk(self, audio: bytes, prompt: str = "") -> str:
+        """
+        Transcribe one chunk of a longer recording.
+
+        Args:
+            audio (bytes): A FLAC file in memory, as made by encode_speech
+            prompt (str): The transcript so far, its end keeps wording consistent across chunks
+        """
+        if self.service == "openai":
+            return self.openai_stt_chunk(audio=audio, prompt=prompt)
+        else:
+            raise ValueError("Invalid service")
+
+    async def openai_tts(self, tone: str, input: str, wait: bool = True) -> None:
+        from utilities.playback import get_playback_engine
+        from utilities.time_stretch import TimeStretcher
+
         # For TTS
-        openai = AsyncOpenAI(api_key=os.environ.get("INTERACTION_KEY"))
-        
-        async with openai.audio.speech.with_streaming_response.create(
-            model="gpt-4o-mini-tts",
-            voice="coral",
+        openai = get_async_client("openai", api_key_env="INTERACTION_KEY")
+        clip = get_playback_engine().clip(label=input[:60])
+        stretcher = TimeStretcher(self.playback_rate)
+        try:
+            async with openai.audio.speech.with_streaming_response.create(
+                model=TTS_MODEL,
+                voice=TTS_VOICE,
+                input=input,
+                instructions=tone,
+                response_format="pcm",
+            ) as response:
+                async for buffer in pcm_buffers(response):
+                    clip.put(stretcher.process(buffer))
+            clip.put(stretcher.flush())
+        finally:
+            clip.end()
+        if wait:
+            await clip.wait()
+
+    async def openai_synthesize(self, tone: str, input: str) -> bytes:
+        openai = get_async_client("openai", api_key_env="INTERACTION_KEY")
+        response = await openai.audio.speech.create(
+            model=TTS_MODEL,
+            voice=TTS_VOICE,
             input=input,
             instructions=tone,
-            response_format="wav",
-        ) as response:
-            await LocalAudioPlayer().play(response)
+            response_format="pcm",
+        )
+        return response.content
+
+    async def openai_tts_stream(self, tone: str, chunks: asyncio.Queue, wait: bool = True, label: str = "the speech") -> float | None:
+        from utilities.playback import SAMPLE_RATE, get_playback_engine
+        from utilities.time_stretch import TimeStretcher
+
+        openai = get_async_client("openai", api_key_env="INTERACTION_KEY")
+        started = time.perf_counter()
+        first_audio = None
+        # queued right away, so it keeps its place behind the clips before it
+        clip = get_playback_engine().clip(label=label, skippable=True)
+        # one stretcher for the whole speech, chunks of text are consecutive audio
+        stretcher = TimeStretcher(self.playback_rate)
+        self.speech_clips.append(clip)
+        synthesized_chars = synthesized_frames = 0
+        # the chunk being synthesized and how much of its audio arrived
+        current, current_frames = "", 0
+
+        async def synthesize():
+            nonlocal first_audio, synthesized_chars, synthesized_frames, current, current_frames
+            # fetch every chunk in order without waiting for playback, so the next
+            # chunk is already downloading while the current one is being played
+            while (text := await chunks.get()) is not None:
+                current, current_frames = text, 0
+                async with openai.audio.speech.with_streaming_response.create(
+                    model=TTS_MODEL,
+                    voice=TTS_VOICE,
+                    input=text,
+                    instructions=tone,
+                    response_format="pcm",
+                ) as response:
+                    async for buffer in pcm_buffers(response):
+                        if first_audio is None:
+                            first_audio = time.perf_counter() - started
+                        buffer = stretcher.process(buffer)
+                        clip.put(buffer)
+                        current_frames += len(buffer)
+                synthesized_chars += len(text)
+                synthesized_frames += current_frames
+                current, current_frames = "", 0
+            clip.put(stretcher.flush())
+
+        producer = asyncio.create_task(synthesize())
+        # a skip cancels the producer, which closes the streaming response mid-download
+        clip.on_cancel(producer.cancel)
+        try:
+            await producer
+        except asyncio.CancelledError:
+            if not clip.cancelled:
+                raise
+            # the speech is still being generated, take the rest without synthesizing it
+            skipped = current
+            while (text := await chunks.get()) is not None:
+                skipped += text
+            frames_per_char = synthesized_frames / synthesized_chars if synthesized_chars else SAMPLE_RATE / (TTS_CHARS_PER_SECOND * self.playback_rate)
+            clip.frames_not_synthesized = max(0, int(len(skipped) * frames_per_char) - current_frames)
+            logger.info(f"Stopped synthesizing {label}, {len(skipped)} characters were never sent to TTS")
+        finally:
+            clip.end()
+        if wait:
+            await clip.wait()
+        return first_audio
 
     def openai_stt(self, audio_file: str) -> str:
         # For STT
-        client = OpenAI(api_key=os.environ.get("INTERACTION_KEY"))
-        audio_file = open(audio_file, "rb")
+        client = get_client("openai", api_key_env="INTERACTION_KEY")
+        with open(audio_file, "rb") as f:
+            transcription = client.audio.transcriptions.create(
+                model="gpt-4o-mini-transcribe", 
+                file=f,
+                response_format="text"
+            )
+        return transcription.text
+
+    def openai_stt_chunk(self, audio: bytes, prompt: str = "") -> str:
+        client = get_client("openai", api_key_env="INTERACTION_KEY")
+        kwargs = {"prompt": prompt[-STT_PROMPT_CHARS:]} if prompt else {}
         transcription = client.audio.transcriptions.create(
-            model="gpt-4o-mini-transcribe", 
-            file=audio_file,
-            response_format="text"
+            model="gpt-4o-mini-transcribe",
+            file=("speech.flac", audio),
+            **kwargs
         )
         return transcription.text
 
@@ -0,0 +1,256 @@
+import atexit
+import contextvars
+import copy
+import itertools
+import json
+import logging
+import logging.handlers
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+"""
+This file sets up logging for a run so that no log line is written to disk or the console
+on the thread that logs it.
+
+The root logger only gets a QueueHandler, which hands each record to a QueueListener thread.
+That thread writes it to the console (human readable) and to a JSON Lines file in logs/
+(one object per line with time, level, logger, message and the structured fields below),
+rotated once it reaches max_file_mb.
+
+Structured fields come from log_context, which stamps every record logged inside it, also
+from tasks and asyncio.to_thread calls started inside it:
+
+    with log_context(stage="speech", role="Prime Minister"):
+        logger.info("...")
+
+Bulky payloads (speeches, clues) do not belong in the log. log_artifact writes them to a
+separate artifact file in logs/artifacts/ and the log line only carries the artifact's ID.
+The artifact is written even when the configured levels drop the log line itself.
+
+Old log and artifact files are removed when a run starts, once they are older than
+retention_days or, oldest first, while logs/ holds more than max_total_mb.
+"""
+
+logger = logging.getLogger(__name__)
+
+# structured fields written to the JSON log when set
+FIELDS = ("debate", "stage", "role", "artifact")
+# libraries whose DEBUG output is mostly request bodies and socket events
+LIBRARY_LOGGERS = ("httpx", "httpcore", "openai")
+LOG_SUFFIXES = (".log", ".jsonl")
+
+_fields = contextvars.ContextVar("log_fields", default={})
+_artifact_ids = itertools.count(1)
+_listener = None
+_queue_handler = None
+_lock = threading.Lock()
+
+
+@contextmanager
+def log_context(**fields):
+    """Add structured fields (see FIELDS) to every record logged inside the block."""
+    token = _fields.set({**_fields.get(), **fields})
+    try:
+        yield
+    finally:
+        _fields.reset(token)
+
+
+def log_artifact(log: logging.Logger, message: str, kind: str, payload: str, level: int = logging.INFO) -> str:
+    """
+    Log a message whose payload goes to the artifact store instead of the log.
+
+    Args:
+        log (logging.Logger): The logger to log the message on
+        message (str): The log line, it should not repeat the payload
+        kind (str): What the payload is, e.g. "speech" or "clue"
+        payload (str): The bulky text
+
+    Returns:
+        str: The artifact ID the log line refers to
+    """
+    artifact_id = f"{kind}-{next(_artifact_ids):04d}"
+    extra = {"artifact": artifact_id, "artifact_kind": kind, "payload": payload}
+    queue_handler = _queue_handler
+    if log.isEnabledFor(level) or queue_handler is None:
+        log.log(level, message, extra=extra)
+    else:
+        # the logger would drop the record before it reaches the queue; the console and file
+        # handlers still drop the line by their own level, the artifact handler keeps the payload
+        queue_handler.handle(log.makeRecord(log.name, level, "(unknown file)", 0, message, None, None, extra=extra))
+    return artifact_id
+
+
+class ContextFilter(logging.Filter):
+    """Stamps the fields of the current log_context on each record, in the thread that logs it."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        for key, value in _fields.get().items():
+            if getattr(record, key, None) is None:
+                setattr(record, key, value)
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for field in FIELDS:
+            value = getattr(record, field, None)
+            if value is not None:
+                entry[field] = value
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class ArtifactHandler(logging.FileHandler):
+    """Appends the payload of records logged through log_artifact, one JSON object per line."""
+
+    def __init__(self, path: Path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        super().__init__(path, encoding="utf-8", delay=True)
+        self.addFilter(lambda record: getattr(record, "payload", None) is not None)
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {"id": record.artifact, "kind": record.artifact_kind,
+                 "time": datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds")}
+        for field in FIELDS[:-1]:
+            value = getattr(record, field, None)
+            if value is not None:
+                entry[field] = value
+        entry["text"] = record.payload
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # unlike QueueHandler.prepare, keep the traceback apart from the message so the JSON
+        # file gets it as its own field
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        if record.exc_info and not record.exc_text:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        record.msg, record.args, record.exc_info = record.message, None, None
+        return record
+
+
+def prune_logs(directory: Path, retention_days: float | None = 14, max_total_mb: float | None = 200) -> int:
+    """
+    Delete old log and artifact files.
+
+    Args:
+        directory (Path): The logs directory, searched recursively
+        retention_days (float | None): Delete files not modified for this long, None keeps them
+        max_total_mb (float | None): Then delete the oldest files while the rest is larger than this, None for no cap
+
+    Returns:
+        int: How many files were deleted
+    """
+    files = []
+    for path in directory.rglob("*"):
+        # rotated files end in .1, .2, ...
+        if path.is_file() and any(suffix in LOG_SUFFIXES for suffix in path.suffixes):
+            stat = path.stat()
+            files.append((stat.st_mtime, stat.st_size, path))
+    files.sort()
+    cutoff = time.time() - retention_days * 86400 if retention_days is not None else None
+    total = sum(size for _, size, _ in files)
+    deleted = 0
+    for mtime, size, path in files:
+        expired = cutoff is not None and mtime < cutoff
+        over_cap = max_total_mb is not None and total > max_total_mb * 1024 * 1024
+        if not (expired or over_cap):
+            continue
+        try:
+            path.unlink()
+        except OSError as e:
+            logger.warning(f"Could not delete old log file {path}: {e}")
+            continue
+        total -= size
+        deleted += 1
+    return deleted
+
+
+def configure_logging(directory: Path, name: str = "main", level: str = "DEBUG", console_level: str = "INFO",
+                      library_level: str = "WARNING", max_file_mb: float = 10, backup_count: int = 3,
+                      retention_days: float | None = 14, max_total_mb: float | None = 200) -> Path:
+    """
+    Route all logging through a background thread, see the module docstring.
+
+    Args:
+        directory (Path): Where the log file and logs/artifacts/ go
+        name (str): Prefix of the file names of this run
+        level (str): Level of the JSON log file
+        console_level (str): Level of the console output
+        library_level (str): Level of the httpx, httpcore and openai loggers
+        max_file_mb (float): Size at which the log file is rotated
+        backup_count (int): Rotated files kept per run
+        retention_days (float | None): Age after which old runs are deleted
+        max_total_mb (float | None): Cap on the size of the logs directory
+
+    Returns:
+        Path: The JSON log file of this run
+    """
+    global _listener, _queue_handler
+    shutdown_logging()
+    directory.mkdir(parents=True, exist_ok=True)
+    deleted = prune_logs(directory, retention_days, max_total_mb)
+    stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    log_file = directory / f"{name}_{stamp}.jsonl"
+
+    console = logging.StreamHandler()
+    console.setLevel(console_level.upper())
+    console.setFormatter(logging.Formatter("%(asctime)s [%(levelname)s] %(name)s: %(message)s", datefmt="%Y-%m-%d %H:%M:%S"))
+    file_handler = logging.handlers.RotatingFileHandler(log_file, maxBytes=int(max_file_mb * 1024 * 1024),
+                                                        backupCount=backup_count, encoding="utf-8", delay=True)
+    file_handler.setLevel(level.upper())
+    file_handler.setFormatter(JsonFormatter())
+    artifacts = ArtifactHandler(directory / "artifacts" / f"{name}_{stamp}.jsonl")
+
+    records = queue.SimpleQueue()
+    queue_handler = _QueueHandler(records)
+    queue_handler.addFilter(ContextFilter())
+    with _lock:
+        _listener = logging.handlers.QueueListener(records, console, file_handler, artifacts, respect_handler_level=True)
+        _listener.start()
+        _queue_handler = queue_handler
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(min(logging.getLevelName(level.upper()), logging.getLevelName(console_level.upper())))
+    for library in LIBRARY_LOGGERS:
+        logging.getLogger(library).setLevel(library_level.upper())
+    if deleted:
+        logger.info(f"Deleted {deleted} old log files from {directory}")
+    return log_file
+
+
+def shutdown_logging() -> None:
+    """Write out everything still queued and detach the queue from the root logger."""
+    global _listener, _queue_handler
+    with _lock:
+        listener, _listener = _listener, None
+        _queue_handler = None
+    if listener is None:
+        return
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        if isinstance(handler, _QueueHandler):
+            root.removeHandler(handler)
+    listener.stop()
+    for handler in listener.handlers:
+        handler.close()
+
+
+# runs before logging's own shutdown, which is registered earlier
+atexit.register(shutdown_logging)
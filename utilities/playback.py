@@ -0,0 +1,259 @@
+import asyncio
+import collections
+import logging
+import sys
+import threading
+import time
+
+import numpy as np
+
+from utilities.console import read_line
+
+"""
+This file plays every clip of a debate (Speaker announcements and speeches) through one
+output stream that stays open for the whole debate.
+
+Opening and closing the sound device for each clip leaves audible gaps and adds startup
+latency to every line. Instead, clips are queued on a PlaybackEngine and its audio callback
+plays them back to back. A clip can be queued before the previous one finishes, and its
+audio can keep arriving while it plays, so the next clip is fetched (prefetched) while the
+current one is still being heard.
+
+A skippable clip (an AI speech) can be cut short with skip(), from code or by pressing Enter
+while a SkipListener runs. What is left of it is dropped at once and the clip's producer is
+told to stop, so no more of it is downloaded or synthesized; the queue moves straight on to
+the next clip. Each clip keeps track of how much playback skipping it saved.
+
+sounddevice is imported when the stream is first opened, so building an engine does not
+need the audio stack.
+"""
+
+logger = logging.getLogger(__name__)
+
+# TTS audio is 16-bit mono PCM at 24 kHz
+SAMPLE_RATE = 24000
+
+
+class Clip:
+    """One clip in the playback queue. Audio is added with put and closed with end."""
+
+    def __init__(self, label: str, loop: asyncio.AbstractEventLoop, skippable: bool = False):
+        self.label = label
+        self.skippable = skippable
+        # float32 buffers shaped (n, 1), appended by the producer and taken by the audio callback
+        self.buffers = collections.deque()
+        self.ended = False
+        self.cancelled = False
+        self.frames_played = 0
+        # audio that was ready but dropped by a skip, and audio that was never made because of it
+        self.frames_skipped = 0
+        self.frames_not_synthesized = 0
+        self._loop = loop
+        self._played = loop.create_future()
+        self._on_cancel = []
+
+    def put(self, buffer: np.ndarray) -> None:
+        if len(buffer) and not self.cancelled:
+            self.buffers.append(np.asarray(buffer, dtype=np.float32).reshape(-1, 1))
+
+    def end(self) -> None:
+        """No more audio will be added; the clip counts as played once its buffers are."""
+        self.ended = True
+
+    def on_cancel(self, callback) -> None:
+        """Call back (on the clip's event loop) when the clip is skipped, to stop producing it."""
+        self._on_cancel.append(callback)
+
+    def cancel(self) -> None:
+        """Drop the rest of the clip. Safe to call from any thread."""
+        if self.cancelled:
+            return
+        self.cancelled = True
+        for callback in self._on_cancel:
+            self._loop.call_soon_threadsafe(callback)
+
+    @property
+    def seconds_played(self) -> float:
+        return self.frames_played / SAMPLE_RATE
+
+    @property
+    def seconds_saved(self) -> float:
+        """Playback time a skip saved, 0 if the clip was played in full."""
+        return (self.frames_skipped + self.frames_not_synthesized) / SAMPLE_RATE if self.cancelled else 0.0
+
+    async def wait(self) -> None:
+        """Wait until the clip has been played to the end (or skipped)."""
+        await asyncio.shield(self._played)
+
+    def _finish(self) -> None:
+        # called from the audio thread
+        def set_result():
+            if not self._played.done():
+                self._played.set_result(None)
+        self._loop.call_soon_threadsafe(set_result)
+
+
+class PlaybackEngine:
+    def __init__(self, samplerate: int = SAMPLE_RATE):
+        self.samplerate = samplerate
+        self.clips = collections.deque()
+        self._stream = None
+        self._lock = threading.Lock()
+        # the buffer being played and the position in it, only touched by the audio callback
+        self._buffer = None
+        self._position = 0
+
+    def clip(self, label: str = "", skippable: bool = False) -> Clip:
+        """Queue a new clip behind the ones already queued, opening the stream if needed."""
+        clip = Clip(label, asyncio.get_running_loop(), skippable)
+        self._open()
+        self.clips.append(clip)
+        return clip
+
+    async def play(self, samples: np.ndarray, label: str = "", wait: bool = True) -> Clip:
+        """
+        Queue a complete clip.
+
+        Args:
+            samples (np.ndarray): float32 samples at the engine's sample rate
+            wait (bool): Return after the clip was played instead of as soon as it is queued
+        """
+        clip = self.clip(label)
+        clip.put(samples)
+        clip.end()
+        if wait:
+            await clip.wait()
+        return clip
+
+    async def drain(self) -> None:
+        """Wait until everything queued so far has been played."""
+        for clip in list(self.clips):
+            await clip.wait()
+
+    def current(self) -> Clip | None:
+        """The clip being played (or waited for), None when the queue is empty."""
+        try:
+            return self.clips[0]
+        except IndexError:
+            return None
+
+    def skip(self) -> bool:
+        """
+        Skip the rest of the clip being played, if it is skippable.
+
+        Returns:
+            bool: Whether a clip was skipped
+        """
+        clip = self.current()
+        if clip is None or not clip.skippable or clip.cancelled:
+            return False
+        logger.info(f"Skipping the rest of {clip.label} after {clip.seconds_played:.1f}s")
+        clip.cancel()
+        return True
+
+    def close(self) -> None:
+        """Close the output stream, it is opened again by the next clip."""
+        with self._lock:
+            stream, self._stream = self._stream, None
+        if stream is not None:
+            stream.stop()
+            stream.close()
+            logger.debug("Playback stream closed")
+
+    def _open(self) -> None:
+        with self._lock:
+            if self._stream is not None:
+                return
+            import sounddevice as sd
+
+            self._stream = sd.OutputStream(samplerate=self.samplerate, channels=1, dtype="float32", callback=self._callback)
+            self._stream.start()
+            logger.debug(f"Playback stream opened at {self.samplerate} Hz")
+
+    def _next_buffer(self) -> np.ndarray | None:
+        """The next buffer of the clip being played, moving on to the next clip once it is done."""
+        while self.clips:
+            clip = self.clips[0]
+            if clip.cancelled:
+                while clip.buffers:
+                    clip.frames_skipped += len(clip.buffers.popleft())
+            elif clip.buffers:
+                return clip.buffers.popleft()
+            elif not clip.ended:
+                # its audio is still on the way
+                return None
+            self.clips.popleft()
+            clip._finish()
+        return None
+
+    def _callback(self, outdata, frames, time, status):
+        """Fill one block of output from the queued clips, silence where there is nothing to play."""
+        if self._buffer is not None and self.clips and self.clips[0].cancelled:
+            self.clips[0].frames_skipped += len(self._buffer) - self._position
+            self._buffer = None
+        written = 0
+        while written < frames:
+            if self._buffer is None or self._position >= len(self._buffer):
+                self._buffer = self._next_buffer()
+                self._position = 0
+                if self._buffer is None:
+                    break
+            count = min(frames - written, len(self._buffer) - self._position)
+            outdata[written:written + count] = self._buffer[self._position:self._position + count]
+            self._position += count
+            written += count
+            self.clips[0].frames_played += count
+        outdata[written:] = 0
+
+
+class SkipListener:
+    """Skips the playing speech when Enter is pressed. Stdin is only read while a skippable clip plays."""
+
+    def __init__(self, engine: PlaybackEngine, poll_seconds: float = 0.1):
+        self.engine = engine
+        self.poll_seconds = poll_seconds
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="skip-listener", daemon=True)
+
+    def start(self) -> "SkipListener":
+        if sys.stdin is not None and sys.stdin.isatty():
+            self._thread.start()
+        else:
+            logger.debug("Stdin is not a terminal, speeches can only be skipped through Interaction.skip()")
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread.is_alive():
+            # read_line gives up after poll_seconds, the thread is never stuck on stdin
+            self._thread.join(timeout=self.poll_seconds * 10)
+
+    def _run(self) -> None:
+        prompted = None
+        while not self._stop.is_set():
+            clip = self.engine.current()
+            if clip is None or not clip.skippable or clip.cancelled:
+                time.sleep(self.poll_seconds)
+                continue
+            if clip is not prompted:
+                print(f"(Press Enter to skip the rest of {clip.label})")
+                prompted = clip
+            try:
+                line = read_line(timeout=self.poll_seconds)
+            except EOFError:
+                return
+            if line is not None and self.engine.current() is clip:
+                self.engine.skip()
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_playback_engine() -> PlaybackEngine:
+    """The process-wide engine all audio of a debate is played through."""
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = PlaybackEngine()
+        return _engine
@@ -0,0 +1,242 @@
+import logging
+import multiprocessing
+import os
+import tempfile
+import threading
+import time
+
+import numpy as np
+import sounddevice as sd
+import soundfile as sf
+
+from utilities.audio_processing import SilenceDetector
+from utilities.capture_buffer import SPEECH_LIMIT_SECONDS, GRACE_SECONDS, CaptureBuffer, SharedCaptureBuffer
+from utilities.console import read_line
+
+"""
+This file captures human speeches from the microphone.
+It pulls in the audio stack (sounddevice, soundfile, numpy), so it is only imported
+when a debate actually needs to record someone.
+
+record_audio keeps the speech in memory for transcription; record_and_save_audio is
+for callers that need the recording as a WAV file. Audio goes straight into a preallocated
+CaptureBuffer, which also caps the length of a speech. The audio callback does nothing but
+that copy: a follower thread picks up the new rows every POLL_SECONDS and does the rest
+(on_block, auto-stop, the time limit).
+
+With in_subprocess the audio callback runs in a dedicated capture process that writes into a
+SharedCaptureBuffer, so the event loop, logging and LLM calls of this process cannot hold the
+GIL while a block is due. This process follows the shared buffer for streaming STT and
+auto-stop. Either way the driver's input overflows are counted and logged with the recording.
+
+Enter is read through utilities/console.py, so a recording that stops on its own does not
+leave a prompt behind that would take the next Enter from the SkipListener.
+"""
+
+logger = logging.getLogger(__name__)
+
+# how often the shared buffer is checked for new audio in subprocess mode
+POLL_SECONDS = 0.05
+
+
+def _capture_process(name: str, samplerate: int, max_seconds: float, start, stop) -> None:
+    """Body of the capture process: record into the shared buffer from start until stop or full."""
+    buffer = SharedCaptureBuffer(samplerate, max_seconds, name=name)
+
+    def callback(indata, frames, time, status):
+        if status.input_overflow:
+            buffer.overflows += 1
+        buffer.write(indata)
+
+    try:
+        start.wait()
+        if not stop.is_set():
+            with sd.InputStream(samplerate=samplerate, channels=1, callback=callback):
+                while not stop.wait(POLL_SECONDS) and not buffer.full:
+                    pass
+    finally:
+        buffer.close()
+
+
+def record_audio(role: str, samplerate=44100, on_block=None, auto_stop_seconds=None, threshold_db=-45,
+                 max_seconds=SPEECH_LIMIT_SECONDS + GRACE_SECONDS, in_subprocess=False) -> np.ndarray | None:
+    """
+    Records audio from microphone until the user presses Enter again.
+
+    Args:
+        role (str): The position being recorded, used in the prompts
+        samplerate (int): Recording sample rate
+        on_block (Callable): Optional, called with the audio recorded since the last call, about
+            every POLL_SECONDS (from the follower thread). The block stays valid after the call.
+        auto_stop_seconds (float): Optional, also stop once the speaker has been silent this long
+        threshold_db (float): Level below which audio counts as silence for auto_stop_seconds
+        max_seconds (float): Recording stops on its own after this long
+        in_subprocess (bool): Run the audio callback in a separate capture process
+
+    Returns:
+        np.ndarray | None: The recording shaped (frames, 1), or None if nothing was captured
+    """
+    stop_event = threading.Event()
+    stopped_by = []
+    detector = SilenceDetector(samplerate, auto_stop_seconds, threshold_db) if auto_stop_seconds else None
+
+    def stop(reason):
+        stopped_by.append(reason)
+        stop_event.set()
+
+    def received(block, buffer):
+        """Hand a new block on and stop the recording when it is due."""
+        if len(block) and on_block is not None:
+            on_block(block)
+        if buffer.full and not stop_event.is_set():
+            stop(f"the {max_seconds:g}s limit was reached")
+        elif detector is not None and detector.update(block) and not stop_event.is_set():
+            stop(f"{auto_stop_seconds}s of silence")
+
+    def wait_for_stop():
+        # Wait for user to stop recording, or for the recording to stop on its own
+        print("Press Enter again to stop recording... ", end="", flush=True)
+        while not stop_event.is_set():
+            if read_line(timeout=POLL_SECONDS) is not None and not stop_event.is_set():
+                stop("enter")
+        if stopped_by[0] != "enter":
+            print(f"\nRecording stopped after {stopped_by[0]}.")
+
+    try:
+        if in_subprocess:
+            buffer = _record_in_subprocess(role, samplerate, max_seconds, received, wait_for_stop, stop)
+        else:
+            buffer = _record_in_thread(role, samplerate, max_seconds, received, wait_for_stop)
+        logger.info("Recording stopped.")
+
+    except sd.PortAudioError as e:
+        logger.error(f"PortAudio error during stream setup/operation: {e}", exc_info=True)
+         # Check for common issues
+        if "Invalid device ID" in str(e) or "No Default Input Device Available" in str(e):
+            logger.error("No microphone detected or selected. Please check your system audio settings.")
+        elif "Device unavailable" in str(e):
+            logger.error("Microphone might be in use by another application.")
+        return None # Exit early if stream fails
+    except Exception as e: # Catch other potential errors during stream setup/input
+        logger.error(f"Unexpected error during recording phase: {e}", exc_info=True)
+        return None # Exit early
+
+    if buffer.dropped_frames:
+        logger.warning(f"{buffer.dropped_frames / samplerate:.1f}s of audio after the {max_seconds:g}s limit was not recorded")
+    if buffer.frames == 0:
+        logger.warning("No audio data recorded.")
+        return None
+    logger.info(f"Recorded {buffer.seconds:.1f}s of audio with {buffer.overflows} input overflows "
+                f"(captured in {'a subprocess' if in_subprocess else 'this process'})")
+    return buffer.view()
+
+
+def _follow(buffer, received, running, copy_blocks=False) -> None:
+    """
+    Hand the rows recorded since the last look to received every POLL_SECONDS, until
+    running() turns False and the last rows were handed on.
+    """
+    read = 0
+    while True:
+        still_running = running()
+        frames = buffer.frames
+        if frames > read:
+            block = buffer.data[read:frames]
+            received(block.copy() if copy_blocks else block, buffer)
+            read = frames
+        if not still_running:
+            return
+        time.sleep(POLL_SECONDS)
+
+
+def _record_in_thread(role, samplerate, max_seconds, received, wait_for_stop) -> CaptureBuffer:
+    buffer = CaptureBuffer(samplerate, max_seconds)
+    recording_event = threading.Event()
+
+    def callback(indata, frames, time, status):
+        """Called on the audio thread for each block: only copies it into the buffer."""
+        if status and status.input_overflow:
+            buffer.overflows += 1
+        if recording_event.is_set():
+            buffer.write(indata)
+
+    read_line(f"Press Enter to start recording for {role}... ")
+    logger.info(f"Starting recording for {role}...")
+    recording_event.set() # Signal recording start
+    follower = threading.Thread(target=_follow, args=(buffer, received, recording_event.is_set),
+                                name="capture-follower", daemon=True)
+    follower.start()
+
+    # Start the stream in a non-blocking way
+    try:
+        with sd.InputStream(samplerate=samplerate, channels=1, callback=callback):
+            wait_for_stop()
+    finally:
+        recording_event.clear() # Signal recording stop
+        follower.join()
+    return buffer
+
+
+def _record_in_subprocess(role, samplerate, max_seconds, received, wait_for_stop, stop) -> CaptureBuffer:
+    buffer = SharedCaptureBuffer(samplerate, max_seconds)
+    context = multiprocessing.get_context("spawn")
+    start_capture, stop_capture = context.Event(), context.Event()
+    # started before the prompt, so the process is ready by the time Enter is pressed
+    process = context.Process(target=_capture_process, name="audio-capture", daemon=True,
+                              args=(buffer.name, samplerate, max_seconds, start_capture, stop_capture))
+    process.start()
+
+    def follow():
+        # copies, the shared buffer is released when the recording ends
+        _follow(buffer, received, process.is_alive, copy_blocks=True)
+        if process.exitcode:
+            stop(f"the capture process failed with exit code {process.exitcode}")
+
+    try:
+        read_line(f"Press Enter to start recording for {role}... ")
+        logger.info(f"Starting recording for {role} in a capture process...")
+        follower = threading.Thread(target=follow, name="capture-follower", daemon=True)
+        follower.start()
+        start_capture.set()
+        wait_for_stop()
+        stop_capture.set()
+        process.join()
+        follower.join()
+        if process.exitcode:
+            raise RuntimeError(f"Capture process exited with code {process.exitcode}")
+        # copy the recording out of shared memory so the block can be freed right away
+        recording = CaptureBuffer(samplerate, data=buffer.view().copy())
+        recording.frames, recording.dropped_frames, recording.overflows = buffer.frames, buffer.dropped_frames, buffer.overflows
+        return recording
+    finally:
+        stop_capture.set()
+        start_capture.set()
+        process.join()
+        buffer.close()
+        buffer.unlink()
+
+
+def record_and_save_audio(role: str, samplerate=44100, on_block=None) -> str | None:
+    """Records audio from microphone and saves to a temporary WAV file."""
+    temp_file_path = None
+    audio_np = record_audio(role, samplerate=samplerate, on_block=on_block)
+    if audio_np is None:
+        return None
+
+    try:
+        with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as tmp_f:
+            temp_file_path = tmp_f.name
+            # --- Write the file --- 
+            sf.write(temp_file_path, audio_np, samplerate)
+            logger.info(f"Audio saved temporarily to {temp_file_path}")
+        return temp_file_path
+
+    except Exception as e: # Catch errors during file writing
+        logger.error(f"Error during audio processing/saving: {e}", exc_info=True)
+        if temp_file_path and os.path.exists(temp_file_path):
+            try:
+                os.remove(temp_file_path)
+                logger.debug(f"Cleaned up failed temporary file: {temp_file_path}")
+            except OSError as del_e:
+                 logger.error(f"Error deleting failed temporary file {temp_file_path}: {del_e}")
+        return None
@@ -0,0 +1,218 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+from config_utils import get_settings
+
+"""
+This file is an opt-in on-disk cache for LLM responses, so re-running a motion with the same
+models and prompts does not pay for (or wait on) identical calls again.
+
+Entries are content addressed: the file name is the sha256 of provider + model + prompt.
+Every entry is written atomically (temp file + rename) so a crashed run never leaves a
+half-written entry behind. Reading an entry refreshes its mtime, and eviction removes the
+least recently used entries once the cache is over its size budget, as well as any entry
+that has not been used within the age limit.
+
+The cache keeps a running total of its size, so a write only scans the directory when the
+total goes over budget or once per evict_interval (to drop stale entries), not on every put.
+Async callers use aget/aput, which do the file I/O in a worker thread instead of on the
+event loop.
+
+Modes:
+    read-write: serve hits and store misses
+    read-only:  serve hits, never write (regression runs against a known cache); reads
+                cannot refresh an entry's mtime, so entries never age out in this mode
+    bypass:     behave as if there was no cache (default)
+"""
+
+logger = logging.getLogger(__name__)
+
+MODES = ("read-write", "read-only", "bypass")
+
+
+class ResponseCache:
+    def __init__(self, directory, mode: str = "read-write", max_bytes: int = 200 * 1024 * 1024, max_age: float = 30 * 24 * 3600,
+                 evict_interval: float = 3600):
+        """
+        Args:
+            directory: Where the entries are stored, created on first write
+            mode (str): One of MODES
+            max_bytes (int): Size budget for all entries together
+            max_age (float): Seconds without use after which an entry is stale, None for no limit
+            evict_interval (float): Most seconds between two scans for stale entries
+        """
+        if mode not in MODES:
+            raise ValueError(f"Invalid cache mode: '{mode}'. Valid options are {', '.join(repr(m) for m in MODES)}")
+        self.directory = Path(directory)
+        self.mode = mode
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.evict_interval = evict_interval
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        # bytes on disk, None until the first scan; when the directory was last scanned
+        self._size = None
+        self._last_evict = 0.0
+
+    @staticmethod
+    def key(provider: str, model: str, prompt) -> str:
+        """Content address for a request, the prompt may be a string or a list of messages."""
+        payload = json.dumps([provider, model, prompt], ensure_ascii=False, sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.json"
+
+    def _is_stale(self, mtime: float, now: float) -> bool:
+        return self.max_age is not None and now - mtime > self.max_age
+
+    def get(self, provider: str, model: str, prompt) -> str | None:
+        """
+        Look up a response.
+
+        Returns:
+            str | None: The cached response, or None on a miss (always None in bypass mode)
+        """
+        if self.mode == "bypass":
+            return None
+        path = self._path(self.key(provider, model, prompt))
+        try:
+            # a read-only cache is a fixed snapshot, its entries would otherwise all expire
+            # max_age after they were last used in read-write mode
+            if self.mode == "read-write" and self._is_stale(path.stat().st_mtime, time.time()):
+                raise KeyError("stale entry")
+            with path.open("r", encoding="utf-8") as f:
+                entry = json.load(f)
+            if self.mode == "read-write":
+                # refresh the LRU position
+                os.utime(path)
+        except (OSError, ValueError, KeyError):
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        logger.debug(f"Response cache hit for {provider}/{model} ({path.name})")
+        return entry["response"]
+
+    def put(self, provider: str, model: str, prompt, response: str) -> None:
+        """Store a response, only in read-write mode."""
+        if self.mode != "read-write" or response is None:
+            return
+        self.directory.mkdir(parents=True, exist_ok=True)
+        entry = {"provider": provider, "model": model, "created": time.time(), "response": response}
+        path = self._path(self.key(provider, model, prompt))
+        try:
+            replaced = path.stat().st_size
+        except OSError:
+            replaced = 0
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(entry, f, ensure_ascii=False)
+            written = os.path.getsize(tmp_path)
+            os.replace(tmp_path, path)
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        with self._lock:
+            self.writes += 1
+            if self._size is not None:
+                self._size += written - replaced
+            due = (self._size is None or self._size > self.max_bytes
+                   or time.monotonic() - self._last_evict >= self.evict_interval)
+        if due:
+            self.evict()
+
+    async def aget(self, provider: str, model: str, prompt) -> str | None:
+        """get, with the file I/O in a worker thread."""
+        if self.mode == "bypass":
+            return None
+        return await asyncio.to_thread(self.get, provider, model, prompt)
+
+    async def aput(self, provider: str, model: str, prompt, response: str) -> None:
+        """put, with the file I/O (and any eviction) in a worker thread."""
+        if self.mode != "read-write" or response is None:
+            return
+        await asyncio.to_thread(self.put, provider, model, prompt, response)
+
+    def evict(self) -> int:
+        """
+        Remove stale entries, then the least recently used ones until the size budget is met.
+        Only in read-write mode, the other modes never change the cache.
+
+        Returns:
+            int: Number of entries removed
+        """
+        if self.mode != "read-write":
+            return 0
+        if not self.directory.exists():
+            with self._lock:
+                self._size = 0
+                self._last_evict = time.monotonic()
+            return 0
+        now = time.time()
+        entries = []
+        removed = 0
+        for path in self.directory.glob("*.json"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            if self._is_stale(stat.st_mtime, now):
+                path.unlink(missing_ok=True)
+                removed += 1
+            else:
+                entries.append((stat.st_mtime, stat.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+            removed += 1
+        with self._lock:
+            self.evictions += removed
+            self._size = total
+            self._last_evict = time.monotonic()
+        return removed
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"mode": self.mode, "hits": self.hits, "misses": self.misses, "writes": self.writes, "evictions": self.evictions}
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> ResponseCache:
+    """
+    The process-wide cache configured by RESPONSE_CACHE in config.json.
+    The RESPONSE_CACHE_MODE environment variable overrides the configured mode.
+    """
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            settings = get_settings().response_cache
+            directory = Path(settings.get("directory", "cache/responses"))
+            if not directory.is_absolute():
+                directory = Path(__file__).resolve().parent.parent / directory
+            max_age_days = settings.get("max_age_days", 30)
+            _cache = ResponseCache(
+                directory,
+                mode=os.environ.get("RESPONSE_CACHE_MODE", settings.get("mode", "bypass")),
+                max_bytes=int(settings.get("max_mb", 200) * 1024 * 1024),
+                max_age=max_age_days * 24 * 3600 if max_age_days is not None else None,
+            )
+        return _cache
@@ -0,0 +1,77 @@
+import re
+
+"""
+This file turns a stream of text deltas from the Responder into speakable chunks for TTS.
+
+The first chunk is released as soon as the first sentence is complete so audio can start
+early; later chunks gather several sentences so there are fewer, longer TTS requests.
+"""
+
+# words that end with a full stop without ending the sentence
+ABBREVIATIONS = {"mr", "mrs", "ms", "dr", "prof", "st", "vs", "etc", "e.g", "i.e", "no", "u.s", "u.k"}
+
+SENTENCE_END = re.compile(r'[.!?…]+["\'”’)\]]*(?=\s)|\n{2,}')
+
+
+def _ends_with_abbreviation(text: str) -> bool:
+    words = text.rstrip(".").split()
+    return bool(words) and words[-1].lower().strip("(\"'“‘") in ABBREVIATIONS
+
+
+class SpeechChunker:
+    def __init__(self, first_chunk_chars: int = 0, chunk_chars: int = 400):
+        """
+        Args:
+            first_chunk_chars (int): Minimum size of the first chunk, 0 releases the first sentence as is
+            chunk_chars (int): Minimum size of every later chunk
+        """
+        self.first_chunk_chars = first_chunk_chars
+        self.chunk_chars = chunk_chars
+        self.buffer = ""
+        self.pending = ""
+        self.emitted = 0
+
+    def _sentences(self) -> list[str]:
+        sentences = []
+        start = 0
+        for match in SENTENCE_END.finditer(self.buffer):
+            candidate = self.buffer[start:match.end()]
+            if match.group().startswith(".") and _ends_with_abbreviation(candidate):
+                continue
+            sentences.append(candidate.strip())
+            start = match.end()
+        self.buffer = self.buffer[start:]
+        return [s for s in sentences if s]
+
+    def feed(self, delta: str) -> list[str]:
+        """
+        Add a text delta.
+
+        Returns:
+            list[str]: Chunks that are ready to be spoken, possibly empty
+        """
+        self.buffer += delta
+        chunks = []
+        for sentence in self._sentences():
+            self.pending = f"{self.pending} {sentence}".strip()
+            target = self.first_chunk_chars if self.emitted == 0 else self.chunk_chars
+            if len(self.pending) >= target:
+                chunks.append(self.pending)
+                self.pending = ""
+                self.emitted += 1
+        return chunks
+
+    def flush(self) -> str | None:
+        """
+        Release whatever is left once the stream has ended.
+
+        Returns:
+            str | None: The remaining text, or None if nothing is left
+        """
+        rest = f"{self.pending} {self.buffer.strip()}".strip()
+        self.pending = ""
+        self.buffer = ""
+        if not rest:
+            return None
+        self.emitted += 1
+        return rest
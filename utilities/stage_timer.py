@@ -0,0 +1,46 @@
+import statistics
+import time
+from contextlib import contextmanager
+
+"""
+This file collects how long each stage of a debate takes (brainstorming, speech generation,
+playback, ...), so single runs and batch runs can report where the time went.
+"""
+
+
+class StageTimings:
+    def __init__(self):
+        # stage -> list of durations in seconds
+        self.samples = {}
+
+    def record(self, stage: str, seconds: float) -> None:
+        self.samples.setdefault(stage, []).append(seconds)
+
+    @contextmanager
+    def measure(self, stage: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, time.perf_counter() - started)
+
+    def merge(self, other: "StageTimings") -> None:
+        for stage, samples in other.samples.items():
+            self.samples.setdefault(stage, []).extend(samples)
+
+    def summary(self) -> dict:
+        """
+        Returns:
+            dict: stage -> count, mean, p50, p95 and max in seconds
+        """
+        result = {}
+        for stage, samples in self.samples.items():
+            ordered = sorted(samples)
+            result[stage] = {
+                "count": len(ordered),
+                "mean": round(statistics.mean(ordered), 3),
+                "p50": round(ordered[len(ordered) // 2], 3),
+                "p95": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 3),
+                "max": round(ordered[-1], 3),
+            }
+        return result
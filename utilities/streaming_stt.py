@@ -0,0 +1,179 @@
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+
+import numpy as np
+
+from utilities.audio_processing import encode_speech, quietest_point, split_at_silences, stitch_transcripts, to_mono, trim_silence
+
+"""
+This file transcribes a human speech while it is still being recorded.
+
+Microphone blocks are fed in as they arrive. A worker thread cuts the audio into chunks of
+min_chunk_seconds to max_chunk_seconds, cutting at the quietest moment in that window, and
+transcribes each chunk as soon as it is cut. Neighbouring chunks share overlap_seconds of
+audio so a word cut in half is heard whole by at least one of them; the duplicate is removed
+when the transcripts are stitched. When recording stops only the last chunk is left to
+transcribe, so the full transcript is ready shortly after the speaker presses Enter.
+
+transcribe_in_chunks does the same for a recording that is already complete: the chunks are
+cut up front and transcribed concurrently instead of in one long request.
+
+With max_pause_seconds set, silence is trimmed from every chunk before it is uploaded
+(see trim_silence) and a chunk with no speech at all is not sent.
+"""
+
+logger = logging.getLogger(__name__)
+
+_DONE = object()
+
+
+class StreamingTranscriber:
+    def __init__(self, transcribe: Callable[[bytes, str], str], samplerate: int = 44100,
+                 min_chunk_seconds: float = 8, max_chunk_seconds: float = 15, overlap_seconds: float = 0.5,
+                 max_pause_seconds: float | None = None, threshold_db: float = -45):
+        """
+        Args:
+            transcribe (Callable): Takes an encoded audio file (see encode_speech) as bytes and
+                the transcript so far (as a prompt for continuity), returns the chunk's transcript
+            samplerate (int): Sample rate of the fed blocks
+            min_chunk_seconds (float): Shortest chunk that is sent on its own
+            max_chunk_seconds (float): Longest chunk, it is cut at its quietest moment past the minimum
+            overlap_seconds (float): Audio shared by neighbouring chunks
+            max_pause_seconds (float | None): Trim silence and shorten longer pauses to this, None sends chunks as recorded
+            threshold_db (float): Level below which audio counts as silence
+        """
+        self.transcribe = transcribe
+        self.samplerate = samplerate
+        self.min_chunk = int(min_chunk_seconds * samplerate)
+        self.max_chunk = int(max_chunk_seconds * samplerate)
+        self.overlap = int(overlap_seconds * samplerate)
+        self.max_pause_seconds = max_pause_seconds
+        self.threshold_db = threshold_db
+        self.transcript = ""
+        self.chunks = 0
+        self.failed_chunks = 0
+        self.bytes_uploaded = 0
+        self.upload_seconds = 0.0
+        self.silence_removed = 0.0
+        self._blocks = queue.Queue()
+        # blocks not yet cut into a chunk, joined only when a chunk is due
+        self._parts = []
+        self._pending_len = 0
+        self._worker = threading.Thread(target=self._run, name="streaming-stt", daemon=True)
+        self._worker.start()
+
+    def feed(self, block) -> None:
+        """Hand over a block of recorded audio. Cheap enough for the audio callback."""
+        self._blocks.put(block)
+
+    def finish(self) -> str:
+        """
+        Transcribe what is left and wait for the worker.
+
+        Returns:
+            str: The stitched transcript of the whole recording
+        """
+        stopped = time.perf_counter()
+        self._blocks.put(_DONE)
+        self._worker.join()
+        logger.info(f"Streaming transcript ready {time.perf_counter() - stopped:.2f}s after recording stopped "
+                    f"({self.chunks} chunks, {self.failed_chunks} failed, {self.silence_removed:.1f}s of silence removed, "
+                    f"{self.bytes_uploaded / 1024:.0f} KiB uploaded in {self.upload_seconds:.2f}s)")
+        return self.transcript
+
+    def _run(self) -> None:
+        while True:
+            block = self._blocks.get()
+            if block is _DONE:
+                break
+            samples = to_mono(block)
+            self._parts.append(samples)
+            self._pending_len += len(samples)
+            if self._pending_len < self.max_chunk:
+                continue
+            pending = np.concatenate(self._parts)
+            # transcribe every full chunk that is waiting, the queue keeps filling meanwhile
+            while len(pending) >= self.max_chunk:
+                cut = quietest_point(pending, self.samplerate, self.min_chunk, self.max_chunk)
+                self._transcribe_chunk(pending[:cut + self.overlap])
+                pending = pending[max(0, cut - self.overlap):]
+            self._parts = [pending]
+            self._pending_len = len(pending)
+        # the first 2 * overlap samples were already part of the previous chunk
+        if self._pending_len > (self.overlap * 2 if self.chunks else 0):
+            self._transcribe_chunk(np.concatenate(self._parts))
+        self._parts = []
+        self._pending_len = 0
+
+    def _transcribe_chunk(self, samples: np.ndarray) -> None:
+        self.chunks += 1
+        if self.max_pause_seconds is not None:
+            samples, removed = trim_silence(samples, self.samplerate, self.max_pause_seconds, self.threshold_db)
+            self.silence_removed += removed
+            if len(samples) == 0:
+                logger.debug(f"Chunk {self.chunks} is silent, not sending it")
+                return
+        audio = encode_speech(samples, self.samplerate)
+        started = time.perf_counter()
+        try:
+            text = self.transcribe(audio, self.transcript)
+        except Exception as e:
+            self.failed_chunks += 1
+            logger.error(f"Transcribing chunk {self.chunks} failed: {e}", exc_info=True)
+            return
+        finally:
+            self.bytes_uploaded += len(audio)
+            self.upload_seconds += time.perf_counter() - started
+        self.transcript = stitch_transcripts(self.transcript, text or "")
+        logger.debug(f"Chunk {self.chunks} ({len(samples) / self.samplerate:.1f}s of audio, {len(audio) / 1024:.0f} KiB) transcribed in {time.perf_counter() - started:.2f}s")
+
+
+def transcribe_in_chunks(samples: np.ndarray, samplerate: int, transcribe: Callable[[bytes, str], str],
+                         concurrency: int = 4, min_chunk_seconds: float = 8, max_chunk_seconds: float = 30,
+                         overlap_seconds: float = 0.5, max_pause_seconds: float | None = None, threshold_db: float = -45) -> str:
+    """
+    Transcribe a whole recording as concurrent chunks cut at silences.
+
+    Args:
+        samples (np.ndarray): Mono float samples
+        samplerate (int): Their sample rate
+        transcribe (Callable): Same as for StreamingTranscriber, the prompt is always empty
+            because chunks run at the same time
+        concurrency (int): Most chunks in flight at once
+        max_pause_seconds (float | None): Trim silence from each chunk as StreamingTranscriber does
+
+    Returns:
+        str: The transcripts of all chunks, stitched in order
+
+    Raises:
+        Exception: The first chunk that fails, a transcript with a hole in it is not returned
+    """
+    started = time.perf_counter()
+    chunks = split_at_silences(to_mono(samples), samplerate, min_chunk_seconds, max_chunk_seconds, overlap_seconds)
+    if not chunks:
+        return ""
+    uploaded = []
+    removed = []
+
+    def transcribe_chunk(chunk):
+        if max_pause_seconds is not None:
+            chunk, seconds = trim_silence(chunk, samplerate, max_pause_seconds, threshold_db)
+            removed.append(seconds)
+            if len(chunk) == 0:
+                return ""
+        audio = encode_speech(chunk, samplerate)
+        uploaded.append(len(audio))
+        return transcribe(audio, "")
+
+    with ThreadPoolExecutor(max_workers=max(1, min(concurrency, len(chunks))), thread_name_prefix="chunked-stt") as pool:
+        texts = list(pool.map(transcribe_chunk, chunks))
+    transcript = ""
+    for text in texts:
+        transcript = stitch_transcripts(transcript, text or "")
+    logger.info(f"Transcribed {len(samples) / samplerate:.0f}s of audio as {len(chunks)} chunks "
+                f"({sum(removed):.1f}s of silence removed, {sum(uploaded) / 1024:.0f} KiB uploaded) in {time.perf_counter() - started:.2f}s")
+    return transcript
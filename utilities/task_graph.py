@@ -0,0 +1,107 @@
+import asyncio
+import time
+from typing import Awaitable, Callable
+
+"""
+This file runs a debate as a graph of async steps (brainstorms, speeches, playback,
+announcements) with declared dependencies, so every step starts as soon as the steps it
+actually needs are done instead of waiting for a whole phase to finish.
+
+After a run, critical_path() names the chain of steps that decided the total time and
+report() describes it step by step.
+"""
+
+
+class TaskGraph:
+    def __init__(self):
+        # name -> (coroutine factory, names of the steps it waits for)
+        self.nodes = {}
+        self.results = {}
+        # name -> (start, end) in seconds since the run started
+        self.spans = {}
+
+    def add(self, name: str, step: Callable[[], Awaitable], after=()) -> str:
+        """
+        Add a step. Dependencies must already be in the graph, which keeps it acyclic.
+
+        Args:
+            name (str): Unique name of the step
+            step (Callable): Called without arguments once all dependencies are done, returns an awaitable
+            after (Iterable[str]): Names of the steps that have to finish first
+
+        Returns:
+            str: The name, so calls can be chained into later `after` lists
+        """
+        if name in self.nodes:
+            raise ValueError(f"Duplicate step: {name}")
+        after = tuple(dict.fromkeys(dependency for dependency in after if dependency is not None))
+        unknown = [dependency for dependency in after if dependency not in self.nodes]
+        if unknown:
+            raise ValueError(f"Step '{name}' depends on unknown steps: {', '.join(unknown)}")
+        self.nodes[name] = (step, after)
+        return name
+
+    async def run(self) -> dict:
+        """
+        Run every step as soon as its dependencies are done.
+
+        If a step fails, the steps still running are cancelled and the error is raised.
+
+        Returns:
+            dict: name -> result of each step
+        """
+        origin = time.perf_counter()
+        tasks = {}
+
+        async def run_step(name):
+            step, after = self.nodes[name]
+            if after:
+                await asyncio.gather(*(tasks[dependency] for dependency in after))
+            start = time.perf_counter() - origin
+            try:
+                result = await step()
+            finally:
+                self.spans[name] = (start, time.perf_counter() - origin)
+            self.results[name] = result
+            return result
+
+        for name in self.nodes:
+            tasks[name] = asyncio.create_task(run_step(name), name=name)
+        try:
+            await asyncio.gather(*tasks.values())
+        except BaseException:
+            for task in tasks.values():
+                task.cancel()
+            await asyncio.gather(*tasks.values(), return_exceptions=True)
+            raise
+        return self.results
+
+    def critical_path(self) -> list[str]:
+        """
+        Returns:
+            list[str]: From the first to the last step of the chain that finished last, each
+                step preceded by the dependency that held it up the longest
+        """
+        if not self.spans:
+            return []
+        name = max(self.spans, key=lambda step: self.spans[step][1])
+        path = [name]
+        while True:
+            after = [dependency for dependency in self.nodes[name][1] if dependency in self.spans]
+            if not after:
+                break
+            name = max(after, key=lambda step: self.spans[step][1])
+            path.append(name)
+        return path[::-1]
+
+    def report(self) -> str:
+        """Human readable critical path with the duration of each step."""
+        path = self.critical_path()
+        if not path:
+            return "Critical path: nothing ran"
+        total = self.spans[path[-1]][1]
+        lines = [f"Critical path ({total:.2f}s):"]
+        for name in path:
+            start, end = self.spans[name]
+            lines.append(f"  {name}: {start:.2f}s -> {end:.2f}s ({end - start:.2f}s, {(end - start) / total:.0%})" if total else f"  {name}: {end - start:.2f}s")
+        return "\n".join(lines)
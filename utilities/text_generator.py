@@ -1,59 +1,169 @@
-from openai import OpenAI
-import os
-from config_utils import get_config
+import logging
+from typing import AsyncIterator
+from config_utils import get_settings
+from utilities.client_pool import get_async_client, get_client, provider_slot
+from utilities.response_cache import get_response_cache
 
 """
 This file is for generating text responses of the speaker's and the debaters'.
 There should be at least OpenAI and OpenRouter as providers.
 More is expected in the future.
 
-It is designed to respond to only one message, so system message and message history is not supported.
-The message should be passed as a string and be loaded with being passed in.
+A message is either a single string (sent as one user message) or a ready list of chat
+messages. Callers that send many similar prompts should put the parts that do not change
+first, so providers with prompt caching can reuse the prefix; the cached token counts they
+report are collected in token_usage.
 
 Wether the response is used for Speaker or Debater should be defined in main.py instead of here.
 
+The a-prefixed methods are the native asyncio implementation, so one event loop can drive many
+generations at once. respond_to is the blocking version for scripts and tests; it uses the pooled
+sync clients, so it does not create an event loop (or a new async client) per call.
+
 TODO: Resturture to suit the response provider of team_brainstorm.py
 """
 
+logger = logging.getLogger(__name__)
+
+
+def as_messages(message) -> list[dict]:
+    if isinstance(message, str):
+        return [{"role": "user", "content": message}]
+    return list(message)
+
+
+class TokenUsage:
+    """Running totals of the token usage reported by the providers."""
+
+    def __init__(self):
+        self.requests = 0
+        self.prompt_tokens = 0
+        self.cached_tokens = 0
+        self.completion_tokens = 0
+
+    def record(self, usage) -> None:
+        if usage is None:
+            return
+        details = getattr(usage, "prompt_tokens_details", None)
+        cached = (getattr(details, "cached_tokens", None) or 0) if details is not None else 0
+        self.requests += 1
+        self.prompt_tokens += usage.prompt_tokens or 0
+        self.cached_tokens += cached
+        self.completion_tokens += usage.completion_tokens or 0
+        logger.debug(f"Prompt tokens: {usage.prompt_tokens} ({cached} cached), completion tokens: {usage.completion_tokens}")
+
+    def summary(self) -> dict:
+        return {
+            "requests": self.requests,
+            "prompt_tokens": self.prompt_tokens,
+            "cached_tokens": self.cached_tokens,
+            "cached_ratio": round(self.cached_tokens / self.prompt_tokens, 3) if self.prompt_tokens else 0.0,
+            "completion_tokens": self.completion_tokens,
+        }
+
+
+token_usage = TokenUsage()
+
+
 class Responder:
     def __init__(self, service: str = None):
-        self.service = service if service else get_config("INDIVIDUAL_AI_PROVIDER")
+        settings = get_settings()
+        self.service = service if service else settings.individual_provider
+        self.model = settings.individual_model
 
-    def respond_to(self,message: str) -> str:
+    def respond_to(self, message: str | list[dict]) -> str:
+        cache = get_response_cache()
+        cached = cache.get(self.service, self.model, message)
+        if cached is not None:
+            return cached
         if self.service == "openai":
-            return self.openai_respond_to(message)
+            response = self.openai_respond_to(message)
         elif self.service == "openrouter":
-            return self.openrouter_respond_to(message)
+            response = self.openrouter_respond_to(message)
         else:
             raise ValueError("Invalid service")
+        cache.put(self.service, self.model, message, response)
+        return response
 
-    def openai_respond_to(self, message: str) -> str:
-        client = OpenAI(api_key=os.environ.get("OPENAI_API_KEY"))
+    def openai_respond_to(self, message: str | list[dict]) -> str:
+        return self._respond_with(get_client("openai"), message)
+
+    def openrouter_respond_to(self, message: str | list[dict]) -> str:
+        return self._respond_with(get_client("openrouter"), message)
+
+    def _respond_with(self, client, message: str | list[dict]) -> str:
         response = client.chat.completions.create(
-            model=get_config("INDIVIDUAL_AI_MODEL"),
-            messages=[
-                {"role": "user", "content": message}
-            ]
+            model=self.model,
+            messages=as_messages(message)
         )
+        token_usage.record(response.usage)
         return response.choices[0].message.content
 
-    def openrouter_respond_to(self, message: str) -> str:
-        client = OpenAI(
-            base_url="https://openrouter.ai/api/v1",
-            api_key=os.environ.get("OPENROUTER_API_KEY"),
+    async def arespond_to(self, message: str | list[dict]) -> str:
+        cache = get_response_cache()
+        cached = await cache.aget(self.service, self.model, message)
+        if cached is not None:
+            return cached
+        async with provider_slot(self.service):
+            if self.service == "openai":
+                response = await self.aopenai_respond_to(message)
+            elif self.service == "openrouter":
+                response = await self.aopenrouter_respond_to(message)
+            else:
+                raise ValueError("Invalid service")
+        await cache.aput(self.service, self.model, message, response)
+        return response
+
+    async def aopenai_respond_to(self, message: str | list[dict]) -> str:
+        client = get_async_client("openai")
+        response = await client.chat.completions.create(
+            model=self.model,
+            messages=as_messages(message)
         )
-        response = client.chat.completions.create(
-            model=get_config("INDIVIDUAL_AI_MODEL"),
-            messages=[
-                {"role": "user", "content": message}
-            ]
+        token_usage.record(response.usage)
+        return response.choices[0].message.content
+
+    async def aopenrouter_respond_to(self, message: str | list[dict]) -> str:
+        client = get_async_client("openrouter")
+        response = await client.chat.completions.create(
+            model=self.model,
+            messages=as_messages(message)
         )
+        token_usage.record(response.usage)
         return response.choices[0].message.content
 
+    async def astream_respond_to(self, message: str | list[dict]) -> AsyncIterator[str]:
+        """
+        Same as arespond_to, but yields the response text piece by piece as it is generated.
+        """
+        cache = get_response_cache()
+        cached = await cache.aget(self.service, self.model, message)
+        if cached is not None:
+            yield cached
+            return
+        if self.service in ("openai", "openrouter"):
+            client = get_async_client(self.service)
+        else:
+            raise ValueError("Invalid service")
+        parts = []
+        async with provider_slot(self.service):
+            stream = await client.chat.completions.create(
+                model=self.model,
+                messages=as_messages(message),
+                stream=True,
+                # the last chunk then carries the usage, including cached prompt tokens
+                stream_options={"include_usage": True},
+            )
+            async for chunk in stream:
+                if chunk.usage is not None:
+                    token_usage.record(chunk.usage)
+                if chunk.choices and chunk.choices[0].delta.content:
+                    parts.append(chunk.choices[0].delta.content)
+                    yield chunk.choices[0].delta.content
+        # only a stream that ran to the end is worth caching
+        await cache.aput(self.service, self.model, message, "".join(parts))
+
 
 if __name__ == "__main__":
     responder = Responder()
     print(responder.respond_to("Hello, how are you?"))
-
-
-
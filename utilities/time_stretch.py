@@ -0,0 +1,106 @@
+import numpy as np
+
+"""
+This file speeds up (or slows down) speech without changing its pitch, chunk by chunk, so
+it can sit between a streaming TTS response and the playback queue without adding latency.
+
+It uses WSOLA (waveform similarity overlap-add): the output is built from Hann-windowed
+frames overlapping by half. Each frame is taken from the input near where the playback rate
+says it should be, shifted by up to tolerance_seconds to the spot that best continues the
+previous frame, which keeps the waveform (and so the pitch) intact where a plain resample
+would raise it.
+"""
+
+
+class TimeStretcher:
+    def __init__(self, rate: float, samplerate: int = 24000, frame_seconds: float = 0.03, tolerance_seconds: float = 0.01):
+        """
+        Args:
+            rate (float): Playback speed, 2.0 plays twice as fast, 1.0 passes audio through untouched
+            samplerate (int): Sample rate of the audio
+            frame_seconds (float): Length of the overlapping frames
+            tolerance_seconds (float): How far a frame may move to line up with the previous one
+        """
+        if rate <= 0:
+            raise ValueError("rate has to be positive")
+        self.rate = rate
+        self.frame = int(frame_seconds * samplerate) // 2 * 2
+        self.hop = self.frame // 2
+        self.tolerance = int(tolerance_seconds * samplerate)
+        # periodic Hann windows at half overlap add up to exactly one
+        self.window = (0.5 - 0.5 * np.cos(2 * np.pi * np.arange(self.frame) / self.frame)).astype(np.float32)
+        # input not consumed yet, starting at absolute sample _offset
+        self._input = np.zeros(0, dtype=np.float32)
+        self._offset = 0
+        # where the next frame should come from, and where the previous one did
+        self._position = 0.0
+        self._previous = None
+        # second half of the previous frame, waiting for the next one to be added on top
+        self._tail = np.zeros(self.hop, dtype=np.float32)
+
+    def process(self, samples: np.ndarray) -> np.ndarray:
+        """
+        Stretch the next piece of a stream.
+
+        Returns:
+            np.ndarray: float32 output shaped like the input, as much as can be produced so far
+        """
+        shape = samples.shape[1:]
+        samples = np.asarray(samples, dtype=np.float32).reshape(-1)
+        if self.rate == 1.0:
+            return samples.reshape(-1, *shape)
+        self._input = np.concatenate([self._input, samples])
+        return self._run(final=False).reshape(-1, *shape)
+
+    def flush(self) -> np.ndarray:
+        """
+        Returns:
+            np.ndarray: The rest of the output once the stream has ended, shaped (n, 1)
+        """
+        if self.rate == 1.0:
+            return np.zeros((0, 1), dtype=np.float32)
+        output = [self._run(final=True), self._tail]
+        self._tail = np.zeros(self.hop, dtype=np.float32)
+        return np.concatenate(output).reshape(-1, 1)
+
+    def _run(self, final: bool) -> np.ndarray:
+        output = []
+        end = received = self._offset + len(self._input)
+        while True:
+            nominal = int(round(self._position))
+            if final and nominal >= received:
+                break
+            lowest = max(0, nominal - self.tolerance)
+            highest = nominal + self.tolerance
+            needed = highest + self.frame
+            if self._previous is not None:
+                needed = max(needed, self._previous + self.hop + self.frame)
+            if needed > end:
+                if not final:
+                    break
+                # pad the end of the stream with silence
+                self._input = np.concatenate([self._input, np.zeros(needed - end, dtype=np.float32)])
+                end = needed
+            if self._previous is None:
+                start = nominal
+            else:
+                # the stretch of input that would naturally follow the previous frame
+                natural = self._slice(self._previous + self.hop, self.frame)
+                candidates = self._slice(lowest, highest - lowest + self.frame)
+                start = lowest + int(np.argmax(np.correlate(candidates, natural, mode="valid")))
+            frame = self._slice(start, self.frame) * self.window
+            output.append(self._tail + frame[:self.hop])
+            self._tail = frame[self.hop:]
+            self._previous = start
+            self._position += self.hop * self.rate
+            # drop input no later frame can reach
+            keep_from = min(int(round(self._position)) - self.tolerance, self._previous + self.hop)
+            if keep_from > self._offset:
+                self._input = self._input[keep_from - self._offset:]
+                self._offset = keep_from
+        if not output:
+            return np.zeros(0, dtype=np.float32)
+        return np.concatenate(output)
+
+    def _slice(self, start: int, length: int) -> np.ndarray:
+        return self._input[start - self._offset:start - self._offset + length]